@@ -0,0 +1,193 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import sys
+import data_store
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import profilage
+
+FENETRE_ATV = 63
+FICHIER_INDEX = 'atv_3m.npz'
+
+class IndexATV:
+    """
+    Panel des Average Traded Volumes glissants sur toutes les dates, calculé une seule fois par
+    version du magasin de données et indexé par date pour des accès en O(1).
+
+    Les dernières lignes de volumes (fenêtre - 1) sont conservées pour prolonger le panel
+    lorsque de nouvelles séances sont ajoutées, sans recalculer l'historique.
+    """
+
+    def __init__(self, dates, tickers, atv, queue, version=(), fenetre=FENETRE_ATV):
+        """
+        :param dates: Les dates du panel (pd.DatetimeIndex).
+        :param tickers: Les tickers, dans l'ordre des colonnes du panel.
+        :param atv: La matrice (dates x tickers) des ATV, tronqués à l'entier.
+        :param queue: Les volumes des (fenêtre - 1) dernières séances nettoyées, pour les mises à jour.
+        :param version: La version du magasin de données à partir de laquelle le panel a été calculé.
+        :param fenetre: La taille de la fenêtre glissante, en séances.
+        """
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.atv = np.asarray(atv, dtype=np.int64)
+        self.queue = np.asarray(queue, dtype=np.int64).reshape(-1, len(self.tickers))
+        self.version = tuple(tuple(v) for v in version)
+        self.fenetre = fenetre
+        self._positions = {date: i for i, date in enumerate(self.dates)}
+
+    @staticmethod
+    def _nettoyer(volumes: pd.DataFrame, tickers: list) -> pd.DataFrame:
+        """
+        Supprime les séances dont un volume est nul ou manquant (même règle que nettoyer_donnees).
+        """
+        data = volumes[['Date'] + [f'{ticker}_Volume' for ticker in tickers]]
+        return data[(data != 0).all(axis=1)].dropna()
+
+    @staticmethod
+    def _moyennes_glissantes(volumes: np.ndarray, fenetre: int) -> np.ndarray:
+        """
+        Moyennes glissantes exactes : les sommes de volumes entiers sont calculées en entiers
+        avant la division, puis tronquées à l'entier.
+        """
+        cumul = np.cumsum(np.vstack([np.zeros((1, volumes.shape[1]), dtype=np.int64), volumes]), axis=0)
+        sommes = cumul[fenetre:] - cumul[:-fenetre]
+        return (sommes / fenetre).astype(np.int64)
+
+    @classmethod
+    def construire(cls, volumes: pd.DataFrame, tickers: list, version=(), fenetre=FENETRE_ATV):
+        """
+        Calcule le panel complet à partir des volumes bruts (colonne 'Date' et colonnes '<ticker>_Volume').
+        """
+        data = cls._nettoyer(volumes, tickers)
+        valeurs = data.drop(columns='Date').to_numpy(dtype=np.int64)
+        atv = cls._moyennes_glissantes(valeurs, fenetre) if len(valeurs) >= fenetre else np.empty((0, len(tickers)))
+        dates = pd.DatetimeIndex(data['Date']).to_numpy()[fenetre - 1:]
+        return cls(dates, tickers, atv, valeurs[len(valeurs) - (fenetre - 1):], version, fenetre)
+
+    def ajouter(self, volumes: pd.DataFrame, version=()):
+        """
+        Prolonge le panel avec de nouvelles séances (postérieures à la dernière date indexée),
+        en ne calculant que les nouvelles moyennes glissantes.
+        """
+        data = self._nettoyer(volumes, self.tickers)
+        if len(self.dates):
+            data = data[data['Date'] > self.dates[-1]]
+        if not data.empty:
+            nouvelles = data.drop(columns='Date').to_numpy(dtype=np.int64)
+            valeurs = np.vstack([self.queue, nouvelles])
+            nouvelles_dates = pd.DatetimeIndex(data['Date']).to_numpy()
+            if len(valeurs) >= self.fenetre:
+                atv = self._moyennes_glissantes(valeurs, self.fenetre)
+                nouvelles_dates = nouvelles_dates[len(nouvelles_dates) - len(atv):]
+                debut = len(self.dates)
+                self.dates = self.dates.append(pd.DatetimeIndex(nouvelles_dates))
+                self.atv = np.vstack([self.atv, atv])
+                self._positions.update({date: debut + i for i, date in enumerate(pd.DatetimeIndex(nouvelles_dates))})
+            self.queue = valeurs[len(valeurs) - (self.fenetre - 1):]
+        self.version = tuple(tuple(v) for v in version)
+        return self
+
+    def ligne(self, date) -> np.ndarray:
+        """
+        Retourne le vecteur des ATV (un par ticker) pour une date donnée.
+        """
+        position = self._positions.get(pd.Timestamp(date))
+        if position is None:
+            raise KeyError(f"Aucun ATV disponible pour la date {date}.")
+        return self.atv[position]
+
+    def tableau(self, date, noms: dict = None) -> pd.DataFrame:
+        """
+        Retourne le tableau des ATV d'une date, au format de creer_tableau_atv.
+
+        :param date: La date recherchée.
+        :param noms: Un dictionnaire ticker -> nom affiché (par défaut, les tickers).
+        """
+        index = [noms[ticker] for ticker in self.tickers] if noms else self.tickers
+        return pd.DataFrame({'Average Traded Volume 3 mois': self.ligne(date)}, index=index)
+
+    def sauvegarder(self, chemin: str):
+        """
+        Enregistre le panel au format .npz.
+        """
+        np.savez(chemin, dates=self.dates.to_numpy().astype('datetime64[ns]').astype(np.int64),
+                 tickers=np.array(self.tickers), atv=self.atv, queue=self.queue,
+                 version=json.dumps(self.version), fenetre=self.fenetre)
+
+    @classmethod
+    def charger(cls, chemin: str):
+        """
+        Recharge un panel enregistré par sauvegarder.
+        """
+        with np.load(chemin) as f:
+            return cls(pd.to_datetime(f['dates']), f['tickers'].tolist(), f['atv'], f['queue'],
+                       json.loads(str(f['version'])), int(f['fenetre']))
+
+def construire_par_annee(tickers: list, dossier: str = data_store.DOSSIER_DONNEES, version=(),
+                         fenetre=FENETRE_ATV) -> IndexATV:
+    """
+    Calcule le panel complet en lisant les volumes année par année : le panel est prolongé avec
+    chaque nouvelle année, si bien qu'une seule année de volumes bruts est en mémoire à la fois.
+    """
+    colonnes = [f'{ticker}_Volume' for ticker in tickers]
+    index = None
+    for _, volumes in data_store.iterer_par_annee(colonnes, dossier):
+        if index is None:
+            index = IndexATV.construire(volumes, tickers, version, fenetre)
+        else:
+            index.ajouter(volumes, version)
+    if index is None:
+        index = IndexATV.construire(pd.DataFrame(columns=['Date'] + colonnes), tickers, version, fenetre)
+    return index
+
+_INDEX_EN_MEMOIRE = {}
+
+def obtenir_index_atv(tickers: list, dossier: str = data_store.DOSSIER_DONNEES) -> IndexATV:
+    """
+    Retourne le panel des ATV à jour pour la version courante du magasin de données.
+
+    Le panel est d'abord cherché en mémoire, puis dans le fichier enregistré à côté des données.
+    Si le magasin a seulement reçu de nouvelles parties depuis, le panel est prolongé avec les
+    nouvelles séances ; sinon il est recalculé entièrement. Le panel à jour est réenregistré.
+    """
+    with profilage.etape('index_atv', tickers=len(tickers)) as etape:
+        index, mode = _index_a_jour(tickers, dossier)
+        etape.definir(mode=mode)
+        etape.compter('lignes', len(index.dates))
+    return index
+
+def _index_a_jour(tickers: list, dossier: str) -> tuple:
+    """
+    Retourne le panel des ATV à jour (voir obtenir_index_atv) et la manière dont il a été obtenu :
+    'memoire', 'fichier', 'prolongement' ou 'reconstruction'.
+    """
+    data_store.charger_donnees(['Date'], dossier)  # initialise le magasin s'il est absent
+    version = data_store.version_magasin(dossier)
+    cle = (os.path.abspath(dossier), tuple(tickers))
+    index = _INDEX_EN_MEMOIRE.get(cle)
+    if index is not None and index.version == version:
+        return index, 'memoire'
+
+    chemin = os.path.join(dossier, FICHIER_INDEX)
+    if index is None and os.path.exists(chemin):
+        index = IndexATV.charger(chemin)
+        if index.tickers != list(tickers):
+            index = None
+
+    colonnes = [f'{ticker}_Volume' for ticker in tickers]
+    if index is not None and index.version == version:
+        mode = 'fichier'
+    elif index is not None and version[:len(index.version)] == index.version and len(index.dates):
+        # Magasin en ajout seul : seules les séances postérieures au panel sont lues
+        index.ajouter(data_store.charger_donnees(colonnes, dossier, apres=index.dates[-1]), version)
+        index.sauvegarder(chemin)
+        mode = 'prolongement'
+    else:
+        index = construire_par_annee(tickers, dossier, version)
+        index.sauvegarder(chemin)
+        mode = 'reconstruction'
+
+    _INDEX_EN_MEMOIRE[cle] = index
+    return index, mode
@@ -0,0 +1,356 @@
+import functools
+import json
+import os
+import sys
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import schema
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import profilage
+
+FICHIER_EXCEL = os.path.join(os.path.dirname(__file__), 'data.xlsx')
+DOSSIER_DONNEES = os.path.join(os.path.dirname(__file__), 'data')
+# Clé des métadonnées Parquet donnant, pour chaque colonne d'une partie, la dernière date renseignée
+CLE_DERNIERES_DATES = b'dernieres_dates'
+
+def lister_parties(dossier: str = DOSSIER_DONNEES) -> list:
+    """
+    Liste les fichiers Parquet du magasin, dans l'ordre d'écriture.
+
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: La liste triée des chemins des fichiers Parquet.
+    """
+    if not os.path.isdir(dossier):
+        return []
+    fichiers = [f for f in os.listdir(dossier) if f.startswith('part-') and f.endswith('.parquet')]
+    return [os.path.join(dossier, f) for f in sorted(fichiers)]
+
+def ecrire_partie(df: pd.DataFrame, dossier: str = DOSSIER_DONNEES) -> str:
+    """
+    Écrit un DataFrame (dates en index ou en colonne 'Date') comme une nouvelle partie du magasin.
+    Les parties existantes ne sont jamais réécrites.
+
+    Chaque année est écrite dans un groupe de lignes distinct : les lectures filtrées par date
+    (voir iterer_par_annee) ne décompressent que les années demandées. Les colonnes sont stockées
+    avec les types compacts de schema.compacter (volumes uint32, prix float32 sans perte de précision).
+    La dernière date renseignée de chaque colonne est enregistrée dans les métadonnées du fichier
+    (voir derniere_date_par_ticker).
+
+    :param df: Le DataFrame à écrire, avec des colonnes préfixées par le ticker (ex: "AIR.PA_Close").
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: Le chemin du fichier écrit.
+    """
+    os.makedirs(dossier, exist_ok=True)
+    if 'Date' not in df.columns:
+        df = df.rename_axis('Date').reset_index()
+    df = schema.compacter(df.assign(Date=pd.to_datetime(df['Date'])).sort_values('Date', kind='stable'))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    dernieres = {col: date.isoformat() for col, date in _dernieres_dates(df).items()}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           CLE_DERNIERES_DATES: json.dumps(dernieres).encode()})
+    chemin = os.path.join(dossier, f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet")
+
+    annees = df['Date'].dt.year.to_numpy()
+    debuts = [0] + [i for i in range(1, len(annees)) if annees[i] != annees[i - 1]] + [len(annees)]
+    with pq.ParquetWriter(chemin, table.schema) as writer:
+        for debut, fin in zip(debuts[:-1], debuts[1:]):
+            writer.write_table(table.slice(debut, fin - debut))
+        if len(annees) == 0:
+            writer.write_table(table)
+    return chemin
+
+def _dernieres_dates(df: pd.DataFrame) -> dict:
+    """
+    Retourne la dernière date renseignée (valeur non manquante) de chaque colonne d'un DataFrame
+    à colonne 'Date'. Les colonnes entièrement vides sont omises.
+    """
+    dates = df['Date'].to_numpy()
+    valides = df.drop(columns='Date').notna().to_numpy()
+    if not len(dates):
+        return {}
+    # Indice de la dernière ligne renseignée de chaque colonne (les dates sont triées)
+    derniers = len(dates) - 1 - np.argmax(valides[::-1], axis=0)
+    colonnes = df.columns.drop('Date')
+    return {col: pd.Timestamp(dates[i]) for col, i, ok in zip(colonnes, derniers, valides.any(axis=0)) if ok}
+
+def ecrire_flux(morceaux, dossier: str = DOSSIER_DONNEES) -> list:
+    """
+    Écrit un flux de DataFrames (par exemple un ticker ou une année à la fois) comme autant de
+    parties du magasin. Un seul morceau est en mémoire à la fois.
+
+    :param morceaux: Un itérable (typiquement un générateur) de DataFrames au format de ecrire_partie.
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: La liste des chemins des fichiers écrits.
+    """
+    return [ecrire_partie(morceau, dossier) for morceau in morceaux if not morceau.empty]
+
+def remplacer_magasin(df: pd.DataFrame, dossier: str = DOSSIER_DONNEES) -> str:
+    """
+    Remplace tout le contenu du magasin par un DataFrame (rechargement complet).
+    La nouvelle partie est écrite avant la suppression des anciennes : le magasin n'est jamais vide.
+
+    :param df: Le DataFrame à écrire, au format de ecrire_partie.
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: Le chemin du fichier écrit.
+    """
+    anciennes = lister_parties(dossier)
+    chemin = ecrire_partie(df, dossier)
+    for fichier in anciennes:
+        os.remove(fichier)
+    return chemin
+
+def compacter_magasin(dossier: str = DOSSIER_DONNEES) -> str:
+    """
+    Fusionne toutes les parties du magasin en une seule (les parties portant sur les mêmes dates sont
+    fusionnées comme à la lecture). Les ajouts incrémentaux multiplient les parties, et donc les fichiers
+    ouverts à chaque lecture : le magasin est à compacter périodiquement.
+
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: Le chemin de la partie écrite, ou None si le magasin compte au plus une partie.
+    """
+    if len(lister_parties(dossier)) <= 1:
+        return None
+    return remplacer_magasin(_lire(dossier), dossier)
+
+def convertir_excel(chemin_excel: str = FICHIER_EXCEL, dossier: str = DOSSIER_DONNEES) -> str:
+    """
+    Convertit le classeur Excel en magasin Parquet. Le contenu existant du magasin est remplacé.
+
+    :param chemin_excel: Le chemin du fichier Excel à convertir.
+    :param dossier: Le dossier du magasin Parquet à créer.
+    :return: Le chemin du fichier Parquet écrit.
+    """
+    with profilage.etape('read_excel') as etape:
+        df = pd.read_excel(chemin_excel)
+        etape.compter('lignes', len(df))
+    return remplacer_magasin(df, dossier)
+
+def synchroniser_excel(chemin_excel: str = FICHIER_EXCEL, dossier: str = DOSSIER_DONNEES) -> bool:
+    """
+    Reconvertit le classeur Excel si le magasin est absent ou si le classeur a été modifié après
+    l'écriture de la dernière partie (par exemple par un rechargement complet hors du magasin).
+
+    :param chemin_excel: Le chemin du fichier Excel.
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: True si le magasin a été (re)créé à partir du classeur.
+    """
+    parties = lister_parties(dossier)
+    if parties and not (os.path.exists(chemin_excel)
+                        and os.path.getmtime(chemin_excel) > max(os.path.getmtime(f) for f in parties)):
+        return False
+    convertir_excel(chemin_excel, dossier)
+    return True
+
+@functools.lru_cache(maxsize=4)
+def _schemas_parties(dossier: str, version: tuple) -> tuple:
+    """
+    Lit une seule fois par version du magasin le schéma de chaque partie.
+    """
+    return tuple((f, pq.read_schema(f).remove_metadata()) for f in lister_parties(dossier))
+
+def schema_magasin(dossier: str = DOSSIER_DONNEES) -> pa.Schema:
+    """
+    Retourne le schéma unifié de toutes les parties du magasin (seules les métadonnées sont lues).
+    Les types divergents entre parties (ex: volumes entiers ou flottants) sont promus vers un type commun.
+    """
+    schemas = [s for _, s in _schemas_parties(os.path.abspath(dossier), version_magasin(dossier))]
+    return pa.unify_schemas(schemas, promote_options='permissive')
+
+def colonnes_disponibles(dossier: str = DOSSIER_DONNEES) -> list:
+    """
+    Retourne la liste des colonnes présentes dans le magasin, sans lire les données.
+    """
+    return schema_magasin(dossier).names
+
+def version_magasin(dossier: str = DOSSIER_DONNEES) -> tuple:
+    """
+    Retourne une empreinte du contenu du magasin (noms et dates de modification des parties).
+    Elle change à chaque ajout de partie et sert de clé de cache.
+    """
+    return tuple((os.path.basename(f), os.path.getmtime(f)) for f in lister_parties(dossier))
+
+def _lire(dossier: str, colonnes: tuple = None, filtre=None) -> pd.DataFrame:
+    """
+    Lit les colonnes demandées des lignes vérifiant le filtre, triées par date, en fusionnant
+    les parties portant sur les mêmes dates. Seules les parties contenant au moins une des
+    colonnes demandées sont ouvertes.
+    """
+    schema = schema_magasin(dossier)
+    parties = _schemas_parties(os.path.abspath(dossier), version_magasin(dossier))
+    if colonnes is not None:
+        manquantes = [col for col in colonnes if col not in schema.names]
+        if manquantes:
+            raise KeyError(f"Colonnes absentes du magasin de données : {manquantes}")
+        donnees = [col for col in colonnes if col != 'Date']
+        if donnees:
+            parties = [(f, s) for f, s in parties if any(col in s.names for col in donnees)]
+
+    dataset = ds.dataset([f for f, _ in parties], schema=schema, format='parquet')
+    df = dataset.to_table(columns=None if colonnes is None else list(colonnes), filter=filtre).to_pandas()
+
+    # Plusieurs parties peuvent porter sur les mêmes dates (ajouts incrémentaux) : on les fusionne
+    if df['Date'].duplicated().any():
+        df = df.groupby('Date', sort=True).first().reset_index()
+    else:
+        df = df.sort_values('Date').reset_index(drop=True)
+    return df
+
+def _filtre_dates(apres: pd.Timestamp = None, debut: pd.Timestamp = None, fin: pd.Timestamp = None,
+                  date: pd.Timestamp = None):
+    """
+    Construit le filtre de lecture : Date > apres, debut <= Date < fin, Date == date (critères facultatifs).
+    """
+    criteres = []
+    if apres is not None:
+        criteres.append(ds.field('Date') > pa.scalar(apres.to_datetime64()))
+    if debut is not None:
+        criteres.append(ds.field('Date') >= pa.scalar(debut.to_datetime64()))
+    if fin is not None:
+        criteres.append(ds.field('Date') < pa.scalar(fin.to_datetime64()))
+    if date is not None:
+        criteres.append(ds.field('Date') == pa.scalar(date.to_datetime64()))
+    filtre = None
+    for critere in criteres:
+        filtre = critere if filtre is None else filtre & critere
+    return filtre
+
+@functools.lru_cache(maxsize=16)
+def _charger_version(dossier: str, colonnes: tuple, version: tuple, apres: pd.Timestamp = None,
+                     date: pd.Timestamp = None) -> pd.DataFrame:
+    """
+    Lit les colonnes demandées pour une version donnée du magasin. Le résultat est mis en cache
+    tant que le magasin n'est pas modifié.
+    """
+    return _lire(dossier, colonnes, _filtre_dates(apres, date=date))
+
+def charger_donnees(colonnes: list = None, dossier: str = DOSSIER_DONNEES,
+                    chemin_excel: str = FICHIER_EXCEL, apres=None, date=None) -> pd.DataFrame:
+    """
+    Charge les données du magasin en ne lisant que les colonnes demandées.
+    Si le magasin n'existe pas encore, ou si le fichier Excel est plus récent, il est (re)créé à partir
+    du fichier Excel (voir synchroniser_excel).
+    Les lectures sont mises en cache en mémoire tant que le magasin n'est pas modifié.
+
+    :param colonnes: Les colonnes à charger (la colonne 'Date' est toujours incluse). None pour tout charger.
+    :param dossier: Le dossier contenant le magasin de données.
+    :param chemin_excel: Le fichier Excel utilisé pour initialiser le magasin s'il est absent ou périmé.
+    :param apres: Si fourni, seules les dates strictement postérieures sont lues (filtre appliqué à la lecture).
+    :param date: Si fourni, seule cette date est lue (seuls les groupes de lignes de son année sont décompressés).
+    :return: Un DataFrame trié par date avec une colonne 'Date', au même format que pd.read_excel.
+    """
+    synchroniser_excel(chemin_excel, dossier)
+
+    if colonnes is not None:
+        colonnes = tuple(['Date'] + [col for col in colonnes if col != 'Date'])
+    apres = None if apres is None else pd.Timestamp(apres)
+    date = None if date is None else pd.Timestamp(date)
+    with profilage.etape('charger_donnees') as etape:
+        df = _charger_version(os.path.abspath(dossier), colonnes, version_magasin(dossier), apres, date).copy()
+        etape.compter('lignes', len(df))
+        etape.compter('colonnes', df.shape[1])
+    return df
+
+@functools.lru_cache(maxsize=256)
+def _dernieres_dates_partie(chemin: str, date_modification: float) -> dict:
+    """
+    Lit une seule fois par fichier les dernières dates renseignées d'une partie, dans ses métadonnées.
+    Les parties écrites sans ces métadonnées sont lues une fois.
+    """
+    metadonnees = pq.read_schema(chemin).metadata or {}
+    if CLE_DERNIERES_DATES in metadonnees:
+        return {col: pd.Timestamp(date) for col, date in json.loads(metadonnees[CLE_DERNIERES_DATES]).items()}
+    return _dernieres_dates(pq.read_table(chemin).to_pandas())
+
+def derniere_date_par_ticker(tickers: list, dossier: str = DOSSIER_DONNEES) -> dict:
+    """
+    Retourne, pour chaque ticker, la dernière date pour laquelle un prix de clôture est stocké.
+    Seules les métadonnées des parties sont lues (voir ecrire_partie), pas l'historique des prix.
+
+    :param tickers: La liste des tickers à examiner.
+    :param dossier: Le dossier contenant le magasin de données.
+    :return: Un dictionnaire ticker -> pd.Timestamp, ou None si le ticker est absent du magasin.
+    """
+    dernieres = {ticker: None for ticker in tickers}
+    for chemin in lister_parties(dossier):
+        dates = _dernieres_dates_partie(chemin, os.path.getmtime(chemin))
+        for ticker in tickers:
+            date = dates.get(f'{ticker}_Close')
+            if date is not None and (dernieres[ticker] is None or date > dernieres[ticker]):
+                dernieres[ticker] = date
+    return dernieres
+
+def iterer_par_annee(colonnes: list = None, dossier: str = DOSSIER_DONNEES, chemin_excel: str = FICHIER_EXCEL,
+                     apres=None):
+    """
+    Lit le magasin année par année, sans jamais charger plus d'une année en mémoire.
+    Les lectures ne sont pas mises en cache.
+
+    :param colonnes: Les colonnes à lire (la colonne 'Date' est toujours incluse). None pour toutes.
+    :param dossier: Le dossier contenant le magasin de données.
+    :param chemin_excel: Le fichier Excel utilisé pour initialiser le magasin s'il est absent.
+    :param apres: Si fourni, seules les dates strictement postérieures sont lues.
+    :return: Un générateur de couples (année, DataFrame trié par date au format de charger_donnees).
+    """
+    dates = charger_donnees(['Date'], dossier, chemin_excel, apres=apres)['Date']
+    if colonnes is not None:
+        colonnes = tuple(['Date'] + [col for col in colonnes if col != 'Date'])
+    apres = None if apres is None else pd.Timestamp(apres)
+    for annee in sorted(dates.dt.year.unique()):
+        debut = pd.Timestamp(year=annee, month=1, day=1)
+        fin = pd.Timestamp(year=annee + 1, month=1, day=1)
+        yield int(annee), _lire(dossier, colonnes, _filtre_dates(apres, debut, fin))
+
+def iterer_par_ticker(tickers: list, champs: list = None, dossier: str = DOSSIER_DONNEES,
+                      chemin_excel: str = FICHIER_EXCEL):
+    """
+    Lit le magasin ticker par ticker : seules les colonnes d'un ticker sont en mémoire à la fois.
+    Les lectures ne sont pas mises en cache.
+
+    :param tickers: Les tickers à lire.
+    :param champs: Les champs à lire pour chaque ticker (ex: ['Close', 'Volume']). None pour tous ceux présents.
+    :param dossier: Le dossier contenant le magasin de données.
+    :param chemin_excel: Le fichier Excel utilisé pour initialiser le magasin s'il est absent.
+    :return: Un générateur de couples (ticker, DataFrame avec la colonne 'Date' et les colonnes du ticker),
+             limité aux dates où le ticker a au moins une valeur.
+    """
+    synchroniser_excel(chemin_excel, dossier)
+    disponibles = colonnes_disponibles(dossier)
+    for ticker in tickers:
+        if champs is None:
+            colonnes = [col for col in disponibles if col.startswith(f'{ticker}_')]
+        else:
+            colonnes = [f'{ticker}_{champ}' for champ in champs if f'{ticker}_{champ}' in disponibles]
+        if not colonnes:
+            continue
+        df = _lire(dossier, tuple(['Date'] + colonnes))
+        yield ticker, df.dropna(subset=colonnes, how='all').reset_index(drop=True)
+
+def charger_long(tickers: list, champs: list = None, dossier: str = DOSSIER_DONNEES,
+                 chemin_excel: str = FICHIER_EXCEL, index: bool = False) -> pd.DataFrame:
+    """
+    Charge les données de plusieurs tickers au format long compact (voir schema.vers_format_long) :
+    une ligne par (date, ticker), tickers catégoriels, volumes uint32 et prix float32.
+    Les tickers sont lus et convertis un par un.
+
+    :param tickers: Les tickers à charger.
+    :param champs: Les champs à charger (ex: ['Close', 'Volume']). None pour tous ceux présents.
+    :param dossier: Le dossier contenant le magasin de données.
+    :param chemin_excel: Le fichier Excel utilisé pour initialiser le magasin s'il est absent.
+    :param index: Si True, le résultat est indexé par un MultiIndex (Date, Ticker).
+    :return: Un DataFrame au format long.
+    """
+    lus, morceaux = [], []
+    for ticker, df in iterer_par_ticker(tickers, champs, dossier, chemin_excel):
+        lus.append(ticker)
+        morceaux.append(schema.vers_format_long(df))
+    if not morceaux:
+        return pd.DataFrame(columns=['Date', 'Ticker'])
+    long = schema.compacter(pd.concat(morceaux, ignore_index=True))
+    long['Ticker'] = pd.Categorical(long['Ticker'].astype(str), categories=lus)
+    return long.set_index(['Date', 'Ticker']) if index else long
@@ -1,54 +1,164 @@
-import yfinance as yf
+import os
+import sys
 import pandas as pd
+import data_store
+import schema
 
-def extract_stock_data(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import fetcher, univers
+
+# Les actions suivies et l'indice CAC 40 (univers "cac40" de common/univers.py)
+TICKERS_CAC40 = univers.obtenir_univers('cac40').tickers
+
+def extract_stock_data(ticker: str, start_date: str, end_date: str, source=fetcher.source_yfinance) -> pd.DataFrame:
     """
     Extrait toutes les données boursières pour un ticker donné à partir de Yahoo Finance.
     
     :param ticker: Le symbole du ticker (ex: "AAPL" pour Apple).
     :param start_date: La date de début au format "YYYY-MM-DD".
     :param end_date: La date de fin au format "YYYY-MM-DD".
-    :return: Un DataFrame contenant toutes les données disponibles (Open, High, Low, Close, Volume, Adj Close).
+    :param source: La source de données (ticker, start_date, end_date, interval) -> DataFrame.
+    :return: Un DataFrame contenant toutes les données disponibles (Open, High, Low, Close, Volume).
     """
     try:
-        data = yf.download(ticker, start=start_date, end=end_date)
+        data = fetcher.avec_reessais(source, ticker, start_date, end_date, "1d")
         if data.empty:
             print(f"Aucune donnée trouvée pour le ticker {ticker} entre {start_date} et {end_date}.")
             return pd.DataFrame()
         # Ajouter un préfixe au nom des colonnes pour identifier le ticker
-        data = data.add_prefix(f"{ticker}_")
-        # Réinitialiser l'index pour avoir une seule colonne d'index
-        data = data.reset_index()
-        data.columns = data.columns.droplevel(1)
-        data = data.set_index('Date')
-        return data
+        return data.add_prefix(f"{ticker}_")
     except Exception as e:
         print(f"Erreur lors de l'extraction des données pour {ticker} : {e}")
         return pd.DataFrame()
 
-def merge_cac40_data(start_date: str, end_date: str) -> pd.DataFrame:
+def merge_cac40_data(start_date: str, end_date: str, incremental: bool = False,
+                     fetch=extract_stock_data, dossier: str = data_store.DOSSIER_DONNEES,
+                     en_flux: bool = False, chemin_excel: str = data_store.FICHIER_EXCEL) -> pd.DataFrame:
     """
     Fusionne les données des actions du CAC40 en un DataFrame.
     
     :param start_date: La date de début au format "YYYY-MM-DD".
     :param end_date: La date de fin au format "YYYY-MM-DD".
+    :param incremental: Si True, seules les dates manquantes du magasin de données sont téléchargées
+                        et ajoutées (voir actualiser_cac40_data).
+    :param fetch: La fonction de téléchargement (ticker, start_date, end_date) -> DataFrame,
+                  remplaçable par un fournisseur local pour les tests.
+    :param dossier: Le dossier du magasin de données. Un rechargement complet en remplace le contenu.
+    :param en_flux: Si True, les tickers sont écrits un par un dans le magasin de données au lieu
+                    d'être fusionnés en mémoire (voir ingerer_cac40_data).
+    :param chemin_excel: Le fichier Excel où est aussi enregistré un rechargement complet.
     :return: Un DataFrame fusionné avec toutes les données (Open, High, Low, Close, Volume, etc.) 
-             pour chaque action, et les dates en index.
+             pour chaque action, et les dates en index. En mode incrémental, seules les lignes ajoutées ;
+             en flux, le bilan de l'ingestion.
     """
-    tickers = ["AIR.PA", "MC.PA", "BNP.PA", "SAN.PA", "ENGI.PA", 
-               "OR.PA", "DG.PA", "HO.PA", "VIV.PA", "RI.PA", "^FCHI"]
-    all_data = []
+    if incremental:
+        return actualiser_cac40_data(end_date, start_date, fetch=fetch, dossier=dossier)
+    if en_flux:
+        return ingerer_cac40_data(start_date, end_date, fetch=fetch, dossier=dossier)
 
-    for ticker in tickers:
-        stock_data = extract_stock_data(ticker, start_date, end_date)
-        if not stock_data.empty:
-            all_data.append(stock_data)
+    # Téléchargement simultané des tickers (les réessais sont gérés par extract_stock_data)
+    all_data = fetcher.telecharger(TICKERS_CAC40, start_date, end_date,
+                                   source=lambda ticker, start, end, interval: fetch(ticker, start, end),
+                                   tentatives=1)
 
-    # Fusionner les DataFrames sur l'index (les dates)
-    merged_data = pd.concat(all_data, axis=1)
+    # Aligner les DataFrames sur l'index (les dates) en une seule passe
+    merged_data = fetcher.aligner(all_data, how='outer')
 
-    # Télécharger en excel
-    merged_data.to_excel("Liquidity\data.xlsx")
+    # Télécharger en excel, puis remplacer le contenu du magasin de données, lu par les applications
+    merged_data.to_excel(chemin_excel)
+    data_store.remplacer_magasin(merged_data, dossier)
     return merged_data
 
+def actualiser_cac40_data(end_date: str, start_date: str = None, tickers: list = None,
+                          fetch=extract_stock_data, dossier: str = data_store.DOSSIER_DONNEES,
+                          max_parties: int = 20) -> pd.DataFrame:
+    """
+    Met à jour le magasin de données de manière incrémentale : pour chaque ticker, seules les séances
+    postérieures à la dernière date stockée (lue dans les métadonnées des parties) sont téléchargées.
+    Les tickers partageant la même date de reprise sont téléchargés simultanément (fetcher.telecharger),
+    et toutes les lignes ajoutées sont écrites comme une seule nouvelle partie du magasin.
+    Les données déjà stockées ne sont ni relues ni réécrites, sauf lorsque le magasin dépasse max_parties
+    parties : il est alors compacté (data_store.compacter_magasin).
+
+    :param end_date: La date de fin au format "YYYY-MM-DD" (exclue, comme pour yf.download).
+    :param start_date: La date de début utilisée pour les tickers absents du magasin.
+    :param tickers: Les tickers à mettre à jour (par défaut, ceux du CAC40 suivis).
+    :param fetch: La fonction de téléchargement (ticker, start_date, end_date) -> DataFrame.
+    :param dossier: Le dossier du magasin de données.
+    :param max_parties: Le nombre de parties au-delà duquel le magasin est compacté. None pour ne jamais compacter.
+    :return: Un DataFrame indiquant, pour chaque ticker, la date de reprise et le nombre de lignes ajoutées.
+    """
+    tickers = TICKERS_CAC40 if tickers is None else tickers
+    dernieres_dates = data_store.derniere_date_par_ticker(tickers, dossier)
+    fin = pd.Timestamp(end_date)
+
+    # Date de reprise de chaque ticker, puis regroupement des tickers par date de reprise
+    debuts = {}
+    for ticker in tickers:
+        derniere = dernieres_dates[ticker]
+        if derniere is None:
+            if start_date is None:
+                print(f"Aucune donnée stockée pour {ticker} et aucune date de début fournie.")
+                continue
+            debuts[ticker] = pd.Timestamp(start_date)
+        else:
+            debuts[ticker] = derniere + pd.Timedelta(days=1)
+    groupes = {}
+    for ticker, debut in debuts.items():
+        if debut < fin:
+            groupes.setdefault(debut, []).append(ticker)
+
+    ajouts = {}
+    for debut, groupe in groupes.items():
+        telecharges = fetcher.telecharger(groupe, debut.strftime("%Y-%m-%d"), fin.strftime("%Y-%m-%d"),
+                                          source=lambda ticker, start, end, interval: fetch(ticker, start, end),
+                                          tentatives=1)
+        for ticker, stock_data in telecharges.items():
+            derniere = dernieres_dates[ticker]
+            if derniere is not None:
+                stock_data = stock_data[stock_data.index > derniere]
+            if not stock_data.empty:
+                ajouts[ticker] = stock_data
+
+    if ajouts:
+        data_store.ecrire_partie(fetcher.aligner(ajouts, how='outer'), dossier)
+        if max_parties is not None and len(data_store.lister_parties(dossier)) > max_parties:
+            data_store.compacter_magasin(dossier)
+
+    bilan = [{'Ticker': ticker, 'Début': debut, 'Lignes ajoutées': len(ajouts[ticker]) if ticker in ajouts else 0}
+             for ticker, debut in debuts.items()]
+    return pd.DataFrame(bilan, columns=['Ticker', 'Début', 'Lignes ajoutées'])
+
+def ingerer_cac40_data(start_date: str, end_date: str, tickers: list = None, fetch=extract_stock_data,
+                       dossier: str = data_store.DOSSIER_DONNEES, max_workers: int = 4) -> pd.DataFrame:
+    """
+    Télécharge et écrit les données ticker par ticker dans le magasin de données, sans jamais fusionner
+    l'univers complet en mémoire : au plus max_workers tickers sont en mémoire à la fois, et chaque
+    ticker est écrit comme une partie découpée par année, avec les types compacts de schema.compacter,
+    lisible ensuite à la demande (data_store.iterer_par_annee, data_store.iterer_par_ticker, data_store.charger_long).
+
+    :param start_date: La date de début au format "YYYY-MM-DD".
+    :param end_date: La date de fin au format "YYYY-MM-DD".
+    :param tickers: Les tickers à ingérer (par défaut, ceux du CAC40 suivis).
+    :param fetch: La fonction de téléchargement (ticker, start_date, end_date) -> DataFrame.
+    :param dossier: Le dossier du magasin de données.
+    :param max_workers: Le nombre maximal de téléchargements simultanés.
+    :return: Un DataFrame indiquant, pour chaque ticker écrit, le nombre de lignes et la partie créée.
+    """
+    tickers = TICKERS_CAC40 if tickers is None else tickers
+    flux = fetcher.telecharger_en_flux(tickers, start_date, end_date,
+                                       source=lambda ticker, start, end, interval: fetch(ticker, start, end),
+                                       max_workers=max_workers, tentatives=1)
+    bilan = []
+
+    def morceaux():
+        for ticker, stock_data in flux:
+            bilan.append({'Ticker': ticker, 'Lignes écrites': len(stock_data)})
+            yield schema.compacter(stock_data)
+
+    chemins = data_store.ecrire_flux(morceaux(), dossier)
+    for ligne, chemin in zip(bilan, chemins):
+        ligne['Partie'] = os.path.basename(chemin)
+    return pd.DataFrame(bilan, columns=['Ticker', 'Lignes écrites', 'Partie'])
+
 # merge_cac40_data(start_date = "2022-01-01", end_date = "2024-01-01")
\ No newline at end of file
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import profilage
+
+def calculer_echeancier(quantites, liquidable, prix, deformations=True, horizon=None):
+    """
+    Calcule en une seule passe les matrices (actifs x jours) des quantités liquidées, des valeurs
+    et des poids du portefeuille pendant sa liquidation.
+
+    Avec déformations, chaque actif est liquidé au rythme maximal : la quantité cumulée liquidée
+    au jour i vaut min(i * quantité liquidable, quantité initiale). Sans déformations, chaque actif
+    est liquidé par fractions égales sur le délai de liquidation maximal, ce qui préserve les poids.
+
+    :param quantites: Les quantités initiales du portefeuille (n actifs).
+    :param liquidable: Les quantités liquidables en un jour (n actifs).
+    :param prix: Les prix des actifs (n actifs).
+    :param deformations: True pour une liquidation au rythme maximal, False pour une liquidation à poids constants.
+    :param horizon: Le nombre de jours à calculer (par défaut, le délai de liquidation maximal).
+    :return: Un tuple (quantités liquidées, valeurs, poids) de tableaux de forme (n, horizon).
+    """
+    quantites = np.asarray(quantites, dtype=np.int64)
+    liquidable = np.asarray(liquidable, dtype=np.int64)
+    prix = np.asarray(prix, dtype=float)
+    if horizon is None:
+        horizon = int(np.ceil(quantites / liquidable).max()) if len(quantites) else 0
+    jours = np.arange(1, horizon + 1)
+
+    if deformations:
+        cumul = np.minimum(liquidable[:, None] * jours[None, :], quantites[:, None])
+        liquidees = np.diff(cumul, axis=1, prepend=0)
+    else:
+        liquidees = np.repeat((quantites / horizon)[:, None], horizon, axis=1)
+        # Somme cumulée séquentielle, identique à l'addition jour par jour des quantités liquidées
+        cumul = np.cumsum(liquidees, axis=1)
+
+    valeurs = np.trunc((quantites[:, None] - cumul) * prix[:, None]).astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        poids = valeurs / valeurs.sum(axis=0, keepdims=True)
+    poids = np.round(np.nan_to_num(poids, nan=0.0), 2)
+    return liquidees, valeurs, poids
+
+def echeancier_vers_dataframe(df, liquidees, valeurs, poids):
+    """
+    Construit la vue large historique de l'échéancier : pour chaque jour i, les colonnes
+    'Quantité liquidée jour i', 'Valeur portefeuille jour i' et 'Poids portefeuille jour i'
+    sont ajoutées au DataFrame du portefeuille.
+
+    :param df: Le DataFrame du portefeuille (une ligne par actif).
+    :param liquidees: La matrice (actifs x jours) des quantités liquidées.
+    :param valeurs: La matrice (actifs x jours) des valeurs du portefeuille.
+    :param poids: La matrice (actifs x jours) des poids du portefeuille.
+    :return: Une copie de df complétée des colonnes journalières.
+    """
+    colonnes = {}
+    for i in range(liquidees.shape[1]):
+        colonnes[f'Quantité liquidée jour {i+1}'] = liquidees[:, i]
+        colonnes[f'Valeur portefeuille jour {i+1}'] = valeurs[:, i]
+        colonnes[f'Poids portefeuille jour {i+1}'] = poids[:, i]
+    return pd.concat([df, pd.DataFrame(colonnes, index=df.index)], axis=1)
+
+@dataclass
+class LiquidationSchedule:
+    """
+    Échéancier de liquidation d'un portefeuille, stocké sous forme de tableaux NumPy contigus
+    indexés par (actif, jour). Le jour j correspond à la colonne j-1 des matrices.
+
+    :param portefeuille: Le DataFrame du portefeuille (une ligne par actif), tel que produit par pretraitement.
+    :param quantites_liquidees: La matrice (actifs x jours) des quantités liquidées.
+    :param valeurs: La matrice (actifs x jours) des valeurs du portefeuille.
+    :param poids: La matrice (actifs x jours) des poids du portefeuille.
+    :param deformations: True si la liquidation se fait au rythme maximal, False à poids constants.
+    """
+    portefeuille: pd.DataFrame
+    quantites_liquidees: np.ndarray
+    valeurs: np.ndarray
+    poids: np.ndarray
+    deformations: bool = None
+
+    @classmethod
+    def calculer(cls, portefeuille, deformations=True):
+        """
+        Calcule l'échéancier d'un portefeuille issu de pretraitement.
+        """
+        with profilage.etape('echeancier', deformations=deformations) as etape:
+            liquidees, valeurs, poids = calculer_echeancier(
+                portefeuille['Quantité initiale portefeuille'], portefeuille['Quantité liquidable 1 jour'],
+                portefeuille['Prix'], deformations=deformations,
+                horizon=portefeuille['Délai de liquidation'].max()
+            )
+            etape.compter('lignes', len(portefeuille))
+            etape.compter('jours', liquidees.shape[1])
+        return cls(portefeuille, liquidees, valeurs, poids, deformations)
+
+    @classmethod
+    def from_frame(cls, data):
+        """
+        Reconstruit un échéancier à partir de la vue large historique (colonnes 'Quantité liquidée jour i', ...).
+        """
+        horizon = data['Délai de liquidation'].max()
+        jours = range(1, horizon + 1)
+        base = [col for col in data.columns if not re.search(r' jour \d+$', col)]
+        return cls(
+            data[base],
+            data[[f'Quantité liquidée jour {i}' for i in jours]].to_numpy(),
+            data[[f'Valeur portefeuille jour {i}' for i in jours]].to_numpy(),
+            data[[f'Poids portefeuille jour {i}' for i in jours]].to_numpy(),
+        )
+
+    @property
+    def actifs(self) -> pd.Index:
+        return self.portefeuille.index
+
+    @property
+    def horizon(self) -> int:
+        return self.quantites_liquidees.shape[1]
+
+    @property
+    def delais(self) -> np.ndarray:
+        return self.portefeuille['Délai de liquidation'].to_numpy()
+
+    @property
+    def quantites_initiales(self) -> np.ndarray:
+        return self.portefeuille['Quantité initiale portefeuille'].to_numpy()
+
+    @property
+    def valeurs_initiales(self) -> np.ndarray:
+        return self.portefeuille['Valeur initiale portefeuille'].to_numpy()
+
+    @property
+    def poids_initiaux(self) -> np.ndarray:
+        return self.portefeuille['Poids initiaux portefeuille'].to_numpy()
+
+    def valeurs_avec_initiales(self) -> np.ndarray:
+        """
+        Retourne la matrice (actifs x (1 + jours)) des valeurs, précédée des valeurs initiales.
+        """
+        return np.column_stack([self.valeurs_initiales, self.valeurs])
+
+    def poids_avec_initiaux(self) -> np.ndarray:
+        """
+        Retourne la matrice (actifs x (1 + jours)) des poids, précédée des poids initiaux.
+        """
+        return np.column_stack([self.poids_initiaux, self.poids])
+
+    def vue(self, champ: str) -> pd.DataFrame:
+        """
+        Retourne une vue DataFrame (actifs x jours numérotés à partir de 1) de 'quantites', 'valeurs' ou 'poids'.
+        """
+        matrices = {'quantites': self.quantites_liquidees, 'valeurs': self.valeurs, 'poids': self.poids}
+        if champ not in matrices:
+            raise ValueError(f"Champ inconnu : {champ}. Valeurs possibles : {list(matrices)}")
+        return pd.DataFrame(matrices[champ], index=self.actifs, columns=pd.RangeIndex(1, self.horizon + 1, name='Jour'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Retourne la vue large historique, avec trois colonnes nommées par jour.
+        """
+        return echeancier_vers_dataframe(self.portefeuille, self.quantites_liquidees, self.valeurs, self.poids)
+
+def comme_echeancier(data) -> LiquidationSchedule:
+    """
+    Accepte un LiquidationSchedule ou la vue large historique et retourne un LiquidationSchedule.
+    """
+    return data if isinstance(data, LiquidationSchedule) else LiquidationSchedule.from_frame(data)
@@ -1,54 +1,61 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import os
+import atv_index
+import data_store
+import echeancier
+import sous_echantillonnage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import profilage, univers
+
+# L'univers d'actifs du portefeuille est défini dans common/univers.py (remplaçable par un fichier CSV,
+# voir univers.obtenir_univers) ; NOMS_ACTIFS et TICKERS sont conservés pour les modules existants
+UNIVERS = univers.obtenir_univers('liquidite')
+NOMS_ACTIFS = UNIVERS.noms_par_ticker
+TICKERS = UNIVERS.tickers
 
-def nettoyer_donnees(df):
+def nettoyer_donnees(df, univers_actifs=None):
     """
     Filtre les données en supprimant les valeurs nulles ou égales à zéro.
+
+    :param univers_actifs: L'univers dont les volumes sont conservés (par défaut, UNIVERS).
     """
-    colonnes_a_conserver = ['Date', 'AIR.PA_Volume', 'MC.PA_Volume', 'BNP.PA_Volume', 'SAN.PA_Volume', 'ENGI.PA_Volume', 'OR.PA_Volume', 'DG.PA_Volume', 'HO.PA_Volume', 'VIV.PA_Volume', 'RI.PA_Volume']
+    univers_actifs = univers_actifs or UNIVERS
+    colonnes_a_conserver = ['Date'] + univers_actifs.colonnes('Volume')
     data = df[colonnes_a_conserver]
     data = data[(data != 0).all(axis=1)].dropna()
     data['Date'] = pd.to_datetime(data['Date'])
     return data
 
-def calculer_atv(data):
+def calculer_atv(data, univers_actifs=None):
     """
     Calcule l'Average Traded Volume (ATV) sur une période donnée.
+
+    :param univers_actifs: L'univers dont les ATV sont calculés (par défaut, UNIVERS).
     """
-    actions = ['AIR.PA_Volume', 'MC.PA_Volume', 'BNP.PA_Volume', 'SAN.PA_Volume', 
-            'ENGI.PA_Volume', 'OR.PA_Volume', 'DG.PA_Volume', 'HO.PA_Volume', 
-            'VIV.PA_Volume', 'RI.PA_Volume']
-    
-    for action in actions:
-        data[f'{action}_ATV_3M'] = data[action].rolling(window=63).mean()
-    data = data.dropna()
-    for action in actions:
-        data.loc[:, f'{action}_ATV_3M'] = data[f'{action}_ATV_3M'].astype(int)
-    return data
+    univers_actifs = univers_actifs or UNIVERS
+    actions = univers_actifs.colonnes('Volume')
+    colonnes_atv = univers_actifs.colonnes('Volume_ATV_3M')
+
+    atv = data[actions].rolling(window=63).mean()
+    atv.columns = colonnes_atv
+    data = pd.concat([data, atv], axis=1).dropna()
+    return data.astype({colonne: int for colonne in colonnes_atv})
 
-def creer_tableau_atv(df, date):
+def creer_tableau_atv(df, date, univers_actifs=None):
     """
     Extrait et formate les données ATV pour une date donnée.
+
+    :param univers_actifs: L'univers dont les ATV sont extraits (par défaut, UNIVERS).
     """
-    mapping_noms = {
-        'AIR.PA_Volume_ATV_3M': 'Airbus',
-        'MC.PA_Volume_ATV_3M': 'L\'Oréal',
-        'BNP.PA_Volume_ATV_3M': 'BNP Paribas',
-        'SAN.PA_Volume_ATV_3M': 'Sanofi',
-        'ENGI.PA_Volume_ATV_3M': 'Engie',
-        'OR.PA_Volume_ATV_3M': 'LVMH',
-        'DG.PA_Volume_ATV_3M': 'Danone',
-        'HO.PA_Volume_ATV_3M': 'TotalEnergies',
-        'VIV.PA_Volume_ATV_3M': 'Vivendi',
-        'RI.PA_Volume_ATV_3M': 'Roche'
-    }
+    univers_actifs = univers_actifs or UNIVERS
     data = df.loc[df['Date'] == date]
-    colonnes_atv = [col for col in data.columns if 'ATV_3M' in col]
-    data = data[colonnes_atv].T
+    data = data.iloc[:, univers_actifs.positions(data.columns, 'Volume_ATV_3M')].T
     data.columns = ['Average Traded Volume 3 mois']
-    data.index = data.index.map(mapping_noms)
+    data.index = univers_actifs.noms
     return data
 
 def generer_statistiques_liquidite(data, seuil_atv, seuil_quantite):
@@ -61,29 +68,19 @@ def generer_statistiques_liquidite(data, seuil_atv, seuil_quantite):
     data['Délai de liquidation'] = np.ceil(data['Quantité initiale portefeuille'] / data['Quantité liquidable 1 jour']).astype(int)
     return data
 
-def recuperer_prix(df, date):
+def recuperer_prix(df, date, univers_actifs=None):
     """
     Récupère et formate les prix de clôture pour une date donnée.
+
+    :param univers_actifs: L'univers dont les prix sont extraits (par défaut, UNIVERS).
     """
-    colonnes_prix = ['Date', 'AIR.PA_Close', 'MC.PA_Close', 'BNP.PA_Close', 'SAN.PA_Close', 'ENGI.PA_Close', 'OR.PA_Close', 'DG.PA_Close', 'HO.PA_Close', 'VIV.PA_Close', 'RI.PA_Close'] 
-    prices = round(df[colonnes_prix], 2)
-    prices = prices.loc[prices['Date'] == date]
-    colonnes_close = [col for col in prices.columns if 'Close' in col]
-    prices = prices[colonnes_close].T
+    univers_actifs = univers_actifs or UNIVERS
+    colonnes_close = univers_actifs.colonnes('Close')
+    prices = df.loc[df['Date'] == date]
+    # Les prix peuvent être stockés en float32 (voir schema.compacter) : ils sont arrondis en float64
+    prices = round(prices.iloc[:, univers_actifs.positions(prices.columns, 'Close')].astype('float64'), 2).T
     prices.columns = ['Prix']
-    mapping_noms = {
-        'AIR.PA_Close': 'Airbus',
-        'MC.PA_Close': 'L\'Oréal',
-        'BNP.PA_Close': 'BNP Paribas',
-        'SAN.PA_Close': 'Sanofi',
-        'ENGI.PA_Close': 'Engie',
-        'OR.PA_Close': 'LVMH',
-        'DG.PA_Close': 'Danone',
-        'HO.PA_Close': 'TotalEnergies',
-        'VIV.PA_Close': 'Vivendi',
-        'RI.PA_Close': 'Roche'
-    }
-    prices.index = prices.index.map(mapping_noms)
+    prices.index = univers_actifs.noms
     return prices
 
 def fusionner_donnees(prices, data):
@@ -96,113 +93,108 @@ def fusionner_donnees(prices, data):
     merged_data['Poids initiaux portefeuille'] = round((merged_data['Valeur initiale portefeuille'] / total_valeur), 2)
     return merged_data
 
-def pretraitement(date, seuil_atv, seuil_quantite):
+def pretraitement(date, seuil_atv, seuil_quantite, univers_actifs=None, dossier=data_store.DOSSIER_DONNEES):
     """
     Effectue le prétraitement des données de volumes et de prix pour analyser la liquidité d'un portefeuille.
+
+    :param univers_actifs: L'univers d'actifs du portefeuille (par défaut, UNIVERS).
+    :param dossier: Le dossier du magasin de données.
     """  
-    file_path = os.path.join(os.path.dirname(__file__), 'data.xlsx')
-    df = pd.read_excel(file_path)
-    data = nettoyer_donnees(df)
-    data = calculer_atv(data)
-    data = creer_tableau_atv(data, date)
-    data = generer_statistiques_liquidite(data, seuil_atv, seuil_quantite)
-    
-    prices = recuperer_prix(df, date)
-    return fusionner_donnees(prices, data)
+    univers_actifs = univers_actifs or UNIVERS
+    with profilage.etape('pretraitement', date=str(date)) as etape:
+        # Les ATV sont lus dans le panel précalculé pour la version courante des données
+        data = atv_index.obtenir_index_atv(univers_actifs.tickers, dossier).tableau(date, univers_actifs.noms_par_ticker)
+        data = generer_statistiques_liquidite(data, seuil_atv, seuil_quantite)
+
+        # Seules les colonnes de prix de clôture de la date demandée sont lues depuis le magasin de données
+        df = data_store.charger_donnees(univers_actifs.colonnes('Close'), dossier, date=date)
+        prices = recuperer_prix(df, date, univers_actifs)
+        merged_data = fusionner_donnees(prices, data)
+        etape.compter('lignes', len(merged_data))
+    return merged_data
 
 def avec_deformations(df):
     """
     Calcule les quantités liquidées, la valeur du portefeuille et les poids de chaque position 
     pour chaque jour de liquidation dans un portefeuille, en tenant compte des déformations des 
     quantités liquidées au fil du temps.
+    Le résultat est un LiquidationSchedule ; la vue large historique s'obtient avec to_frame().
     """
-    data = df.copy()
-    for i in range(1, max(data['Délai de liquidation'])+1): 
-        # Calculer la quantité liquidée
-        if i == 1:
-            data[f'Quantité liquidée jour {i}'] = np.minimum(
-                data['Quantité initiale portefeuille'],
-                data['Quantité liquidable 1 jour']
-            ).astype(int)
-        else:
-            previous_liquidated_quantity = data[[f'Quantité liquidée jour {j}' for j in range(1, i)]].sum(axis=1)
-            data[f'Quantité liquidée jour {i}'] = np.minimum(
-                data['Quantité initiale portefeuille'] - previous_liquidated_quantity,
-                data['Quantité liquidable 1 jour']
-            ).astype(int)
-
-        # Calculer la valeur du portefeuille
-        data[f'Valeur portefeuille jour {i}'] = (
-            (data['Quantité initiale portefeuille'] - data[[f'Quantité liquidée jour {j}' for j in range(1, i+1)]].sum(axis=1)) * data['Prix']
-        ).astype(int)
-
-        # Calcul des poids
-        data[f'Poids portefeuille jour {i}'] = round((
-            data[f'Valeur portefeuille jour {i}'] / data[f'Valeur portefeuille jour {i}'].sum(axis=0)
-        ).fillna(0).astype(float), 2)
-    return data
+    return echeancier.LiquidationSchedule.calculer(df, deformations=True)
 
 def sans_deformations(df):
     """
     Calcule les quantités liquidées, la valeur du portefeuille et les poids de chaque position 
     pour chaque jour de liquidation dans un portefeuille, sans déformations des poids des actifs du portefeuille
     au fil du temps.
+    Le résultat est un LiquidationSchedule ; la vue large historique s'obtient avec to_frame().
     """
-    data = df.copy()
-    delai_liquidation_max = data['Délai de liquidation'].max()
-
-    for i in range(1, delai_liquidation_max + 1):
-        # Calculer les quantités liquidés
-        data[f'Quantité liquidée jour {i}'] = data['Quantité initiale portefeuille'] / delai_liquidation_max
-
-        # Calculer la valeur du portefeuille
-        data[f'Valeur portefeuille jour {i}'] = (
-            (data['Quantité initiale portefeuille'] - data[[f'Quantité liquidée jour {j}' for j in range(1, i+1)]].sum(axis=1)) * data['Prix']
-        ).astype(int)
-
-        # Calcul des poids
-        data[f'Poids portefeuille jour {i}'] = round((
-            data[f'Valeur portefeuille jour {i}'] / data[f'Valeur portefeuille jour {i}'].sum(axis=0)
-        ).fillna(0).astype(float), 2)
-    return data
+    return echeancier.LiquidationSchedule.calculer(df, deformations=False)
 
-def plot_poids_temps_courbe(data):
+def _tracer_courbes(ax, actifs, series, max_points):
     """
-    Trace l'évolution des poids des entreprises dans le portefeuille au fil du temps.
+    Trace une courbe par actif, sous-échantillonnée par LTTB au-delà de max_points points
+    (les marqueurs ne sont affichés que si tous les points sont tracés).
     """
-    weight_columns = ['Poids initiaux portefeuille'] + [f'Poids portefeuille jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
+    for stock, values in zip(actifs, series):
+        indices = sous_echantillonnage.lttb(values, max_points)
+        ax.plot(indices, values[indices], marker='o' if len(indices) == len(values) else None, label=stock)
 
-    # Créer un DataFrame pour suivre les poids, en incluant les poids initiaux
-    weight_evolution = data[weight_columns].T
-    weight_evolution.columns = data.index 
-    weight_evolution.index = ['Poids initiaux'] + [f'Jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
+def _graduer(ax, periods, rotation):
+    """
+    Affiche les étiquettes des périodes sur l'axe des abscisses, en n'en conservant qu'une partie
+    régulièrement espacée lorsque l'horizon est long.
+    """
+    positions = sous_echantillonnage.graduations(len(periods))
+    ax.set_xticks(positions)
+    ax.set_xticklabels([periods[i] for i in positions], rotation=rotation)
+
+def plot_poids_temps_courbe(data, max_actifs=sous_echantillonnage.MAX_ACTIFS, max_points=sous_echantillonnage.MAX_POINTS):
+    """
+    Trace l'évolution des poids des entreprises dans le portefeuille au fil du temps.
+    Au-delà de max_actifs actifs, les plus petites positions initiales sont regroupées en "Autres",
+    et au-delà de max_points jours, les courbes sont sous-échantillonnées.
+    """
+    schedule = echeancier.comme_echeancier(data)
+    actifs, weight_evolution = sous_echantillonnage.principaux_actifs(
+        schedule.poids_avec_initiaux(), schedule.actifs, max_actifs, critere=schedule.valeurs_initiales)
+    periods = ['Poids initiaux'] + [f'Jour {i}' for i in range(1, schedule.horizon+1)]
 
     # Visualisation de l'évolution des poids
     fig, ax = plt.subplots(figsize=(12, 6))
-    for stock in weight_evolution.columns:
-        ax.plot(weight_evolution.index, weight_evolution[stock], marker='o', label=stock)
+    _tracer_courbes(ax, actifs, weight_evolution, max_points)
 
     ax.set_title("Évolution des poids du portefeuille")
     ax.set_xlabel("Jour")
     ax.set_ylabel("Poids")
-    ax.set_xticks(range(len(weight_evolution.index)))
-    ax.set_xticklabels(weight_evolution.index, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
+    _graduer(ax, periods, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
     ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1))
     ax.grid(True)
     fig.tight_layout()
     
     return fig
 
-def plot_poids_temps_hist(data):
+def plot_poids_temps_hist(data, max_actifs=sous_echantillonnage.MAX_ACTIFS, max_barres=sous_echantillonnage.MAX_BARRES):
     """
     Trace un histogramme empilé de la répartition des poids des entreprises au fil du temps.
+    Au-delà de max_actifs actifs, les plus petites positions initiales sont regroupées en "Autres",
+    et au-delà de max_barres périodes, chaque barre représente les poids moyens d'un bloc de jours consécutifs.
     """
-    weight_columns = ['Poids initiaux portefeuille'] + [f'Poids portefeuille jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
-    weights = data[weight_columns].transpose()  # Transpose pour que les entreprises soient en colonnes
+    schedule = echeancier.comme_echeancier(data)
+    actifs, weights = sous_echantillonnage.principaux_actifs(
+        schedule.poids_avec_initiaux(), schedule.actifs, max_actifs, critere=schedule.valeurs_initiales)
+    periods = ['Poids initiaux'] + [f'Jour {i}' for i in range(1, schedule.horizon+1)]
+    debuts, tailles, weights = sous_echantillonnage.agreger_par_blocs(weights, max_barres)
+    centres = debuts + (tailles - 1) / 2
     
     # Créer un graphique en histogramme empilé
     fig, ax = plt.subplots(figsize=(12, 7))
-    weights.plot(kind='bar', stacked=True, ax=ax, colormap='tab20', width=0.8)
+    colors = plt.get_cmap('tab20')(np.linspace(0, 1, len(actifs)))
+    bottom = np.zeros(len(debuts))
+    for stock, stock_weights, color in zip(actifs, weights, colors):
+        ax.bar(centres, stock_weights, bottom=bottom, width=0.8 * tailles, label=stock, color=color)
+        bottom += stock_weights
+    _graduer(ax, periods, rotation=90)
     
     # Ajouter un titre et des labels
     ax.set_title('Répartition des poids des entreprises au fil du temps')
@@ -213,92 +205,87 @@ def plot_poids_temps_hist(data):
     
     return fig
 
-def plot_valeur_temps_courbe(data):
+def plot_valeur_temps_courbe(data, max_actifs=sous_echantillonnage.MAX_ACTIFS, max_points=sous_echantillonnage.MAX_POINTS):
     """
     Trace l'évolution des valeurs individuelles du portefeuille au fil du temps.
+    Au-delà de max_actifs actifs, les plus petites positions initiales sont regroupées en "Autres",
+    et au-delà de max_points jours, les courbes sont sous-échantillonnées.
     """
-    weight_columns = ['Valeur initiale portefeuille'] + [f'Valeur portefeuille jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
-
-    # Créer un DataFrame pour suivre les valeurs, en incluant la valeur initiale
-    weight_evolution = data[weight_columns].T
-    weight_evolution.columns = data.index 
-    weight_evolution.index = ['Valeur initiale'] + [f'Jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
+    schedule = echeancier.comme_echeancier(data)
+    actifs, value_evolution = sous_echantillonnage.principaux_actifs(
+        schedule.valeurs_avec_initiales(), schedule.actifs, max_actifs)
+    periods = ['Valeur initiale'] + [f'Jour {i}' for i in range(1, schedule.horizon+1)]
 
     # Visualisation de l'évolution des valeurs
     fig, ax = plt.subplots(figsize=(12, 6))
-    for stock in weight_evolution.columns:
-        ax.plot(weight_evolution.index, weight_evolution[stock], marker='o', label=stock)
+    _tracer_courbes(ax, actifs, value_evolution, max_points)
 
     ax.set_title("Évolution des valeurs du portefeuille")
     ax.set_xlabel("Jour")
     ax.set_ylabel("Valeur")
-    ax.set_xticks(range(len(weight_evolution.index)))
-    ax.set_xticklabels(weight_evolution.index, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
+    _graduer(ax, periods, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
     ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1))
     ax.grid(True)
     fig.tight_layout()  # Ajuster automatiquement la disposition pour éviter le chevauchement
     
     return fig
 
-def plot_valeur_totale_temps_courbe(data):
+def plot_valeur_totale_temps_courbe(data, max_points=sous_echantillonnage.MAX_POINTS):
     """
     Trace l'évolution de la valeur totale du portefeuille au fil du temps.
+    Au-delà de max_points jours, la courbe est sous-échantillonnée.
     """
-    # Liste des colonnes de valeurs, incluant la valeur initiale et les valeurs des jours
-    value_columns = ['Valeur initiale portefeuille'] + [f'Valeur portefeuille jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
-    
-    # Calcul de la valeur totale du portefeuille pour chaque période
-    total_value_evolution = data[value_columns].sum(axis=0)
-    # Ajouter les périodes à l'index (Valeur initiale, Jour 1, Jour 2, etc.)
-    periods = ['Valeur initiale'] + [f'Jour {i}' for i in range(1, data['Délai de liquidation'].max()+1)]
+    schedule = echeancier.comme_echeancier(data)
+
+    # Calcul de la valeur totale du portefeuille pour chaque période (valeur initiale, puis chaque jour)
+    total_value_evolution = schedule.valeurs_avec_initiales().sum(axis=0)
+    periods = ['Valeur initiale'] + [f'Jour {i}' for i in range(1, schedule.horizon+1)]
     
     # Visualisation de l'évolution de la valeur totale du portefeuille
     fig, ax = plt.subplots(figsize=(12, 6))
-    ax.plot(periods, total_value_evolution, marker='o', label='Valeur totale portefeuille', color='b')
+    indices = sous_echantillonnage.lttb(total_value_evolution, max_points)
+    ax.plot(indices, total_value_evolution[indices], marker='o' if len(indices) == len(periods) else None,
+            label='Valeur totale portefeuille', color='b')
 
     ax.set_title("Évolution de la valeur totale du portefeuille")
     ax.set_xlabel("Jour")
     ax.set_ylabel("Valeur totale")
-    ax.set_xticks(range(len(periods)))
-    ax.set_xticklabels(periods, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
+    _graduer(ax, periods, rotation=45)  # Incliner les étiquettes pour une meilleure lisibilité
     ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1))
     ax.grid(True)
     fig.tight_layout()  # Ajuster automatiquement la disposition pour éviter le chevauchement
     
     return fig
 
-def plot_cumulative_liquidated_quantities(data):
+def plot_cumulative_liquidated_quantities(data, max_barres=sous_echantillonnage.MAX_BARRES):
     """
     Trace un histogramme de la proportion cumulée de la quantité liquidée par jour,
     par rapport à la quantité totale liquidée sur l'ensemble des jours.
+    Au-delà de max_barres jours, chaque barre représente la proportion atteinte à la fin d'un bloc de jours.
     """
-    # Calcul de la quantité liquidée totale pour chaque jour
-    total_liquidated_quantities = [data[f'Quantité liquidée jour {day}'].sum() for day in range(1, data['Délai de liquidation'].max()+1)]
-
-    # Calcul de la quantité liquidée totale sur tous les jours
-    total_liquidated_all_days = sum(total_liquidated_quantities)
+    schedule = echeancier.comme_echeancier(data)
 
-    # Calcul de la quantité liquidée cumulée pour chaque jour
-    cumulative_liquidated_quantities = []
-    cumulative_sum = 0
-    for liquidated_quantity in total_liquidated_quantities:
-        cumulative_sum += liquidated_quantity
-        cumulative_liquidated_quantities.append(cumulative_sum)
+    # Calcul de la quantité liquidée totale pour chaque jour, puis de la quantité cumulée
+    total_liquidated_quantities = schedule.quantites_liquidees.sum(axis=0)
+    cumulative_liquidated_quantities = np.cumsum(total_liquidated_quantities)
 
     # Calcul de la proportion liquidée cumulée pour chaque jour par rapport au total
-    cumulative_proportions = [quantity / total_liquidated_all_days * 100 for quantity in cumulative_liquidated_quantities]
+    cumulative_proportions = cumulative_liquidated_quantities / total_liquidated_quantities.sum() * 100
+    debuts, tailles, cumulative_proportions = sous_echantillonnage.agreger_par_blocs(
+        cumulative_proportions, max_barres, agregation='last')
+    days = debuts + 1 + (tailles - 1) / 2
     
     # Créer un histogramme pour la proportion cumulée de la quantité liquidée par jour
     fig, ax = plt.subplots(figsize=(10, 6))
 
     # Tracer l'histogramme de la proportion liquidée cumulée par jour
-    ax.bar(range(1, data['Délai de liquidation'].max()+1), cumulative_proportions, color='green', alpha=0.7)
+    ax.bar(days, cumulative_proportions, width=0.8 * tailles, color='green', alpha=0.7)
 
     # Ajouter des éléments de mise en forme
     ax.set_title("Proportion Cumulée de la Quantité Liquidée par Jour (par rapport au total liquidé)")
     ax.set_xlabel("Jours")
     ax.set_ylabel("Proportion Liquidée Cumulée (%)")
-    ax.set_xticks(range(1, data['Délai de liquidation'].max()+1))
+    ax.set_xticks(sous_echantillonnage.graduations(schedule.horizon) + 1)
     ax.grid(True, axis='y', linestyle='--', alpha=0.7)
 
     # Ajouter une ligne horizontale pour 100% (objectif théorique)
@@ -306,4 +293,4 @@ def plot_cumulative_liquidated_quantities(data):
     ax.legend()
     fig.tight_layout()
 
-    return fig
\ No newline at end of file
+    return fig
@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import atv_index
+from liquidity_management import TICKERS
+
+@dataclass
+class ResultatScenarios:
+    """
+    Résultats d'une grille de scénarios (dates x seuils ATV x diviseurs de quantité).
+
+    :param dates: Les dates évaluées (D).
+    :param seuils_atv: Les proportions de l'ATV liquidables par jour (S).
+    :param seuils_quantite: Les diviseurs de la quantité détenue (K).
+    :param actifs: Les tickers du portefeuille (n).
+    :param delais: Le tenseur (D, S, K, n) des délais de liquidation de chaque actif, en jours.
+    :param horizons: Le tenseur (D, S, K) des délais de liquidation du portefeuille (maximum sur les actifs).
+    :param profils: Le tenseur (D, S, K, T) de la proportion cumulée liquidée à la fin de chaque jour 1..T,
+                    T étant l'horizon maximal de la grille (la proportion vaut 1 au-delà de l'horizon).
+    """
+    dates: pd.DatetimeIndex
+    seuils_atv: np.ndarray
+    seuils_quantite: np.ndarray
+    actifs: list
+    delais: np.ndarray
+    horizons: np.ndarray
+    profils: np.ndarray
+
+    def horizons_frame(self) -> pd.DataFrame:
+        """
+        Retourne les horizons de liquidation au format long, indexés par (Date, Seuil ATV, Diviseur).
+        """
+        index = pd.MultiIndex.from_product([self.dates, self.seuils_atv, self.seuils_quantite],
+                                           names=['Date', 'Seuil ATV', 'Diviseur'])
+        return pd.DataFrame({'Délai de liquidation': self.horizons.ravel()}, index=index)
+
+def quantites_scenarios(atv, seuils_atv, seuils_quantite, graine=42):
+    """
+    Calcule par diffusion (broadcasting) les quantités initiales, les quantités liquidables en un jour
+    et les délais de liquidation, selon les mêmes règles que generer_statistiques_liquidite.
+
+    :param atv: La matrice (D, n) des ATV des actifs pour chaque date.
+    :param seuils_atv: Les S proportions de l'ATV liquidables par jour.
+    :param seuils_quantite: Les K diviseurs de la quantité détenue.
+    :param graine: La graine du tirage des quantités initiales (42 dans generer_statistiques_liquidite).
+    :return: Un tuple (quantités (D, 1, K, n), liquidables (D, S, 1, n), délais (D, S, K, n)).
+    """
+    atv = np.asarray(atv, dtype=float)[:, None, None, :]
+    seuils_atv = np.asarray(seuils_atv, dtype=float)[None, :, None, None]
+    seuils_quantite = np.asarray(seuils_quantite, dtype=float)[None, None, :, None]
+    tirage = np.random.RandomState(graine).rand(atv.shape[-1])
+
+    quantites = (np.floor(1.5 * tirage * atv) / seuils_quantite).astype(np.int64)
+    liquidables = np.floor(seuils_atv * atv).astype(np.int64)
+    delais = np.ceil(quantites / liquidables).astype(np.int64)
+    return quantites, liquidables, delais
+
+def _profils_bloc(quantites, liquidables, delais, horizon, deformations):
+    """
+    Calcule les profils cumulés liquidés (D, S, K, T) d'un bloc de dates.
+    """
+    jours = np.arange(1, horizon + 1)
+    if deformations:
+        totaux = quantites.sum(axis=-1)[..., None]
+        profils = np.zeros(np.broadcast_shapes(quantites.shape, liquidables.shape)[:-1] + (horizon,))
+        # Accumulation actif par actif pour borner la mémoire à (D, S, K, T)
+        for a in range(quantites.shape[-1]):
+            profils += np.minimum(liquidables[..., a, None] * jours, quantites[..., a, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profils = np.nan_to_num(profils / totaux, nan=1.0)
+    else:
+        horizons = delais.max(axis=-1)[..., None]
+        profils = np.minimum(jours / horizons, 1.0)
+    return profils
+
+def evaluer_scenarios(dates, seuils_atv, seuils_quantite, deformations=True, index=None,
+                      n_jobs=None, taille_bloc=64):
+    """
+    Évalue en un seul appel toutes les combinaisons (date, seuil ATV, diviseur de quantité) :
+    délais de liquidation par actif, horizon du portefeuille et profil cumulé liquidé.
+
+    :param dates: Les dates à évaluer.
+    :param seuils_atv: Les proportions de l'ATV liquidables par jour (ex: [0.2, 0.1]).
+    :param seuils_quantite: Les diviseurs de la quantité détenue.
+    :param deformations: True pour une liquidation au rythme maximal, False à poids constants.
+    :param index: Le panel IndexATV à utiliser (par défaut, celui du magasin de données).
+    :param n_jobs: Le nombre de processus pour le calcul des profils (None pour un calcul dans le processus courant).
+    :param taille_bloc: Le nombre de dates traitées par bloc, pour borner la mémoire.
+    :return: Un ResultatScenarios.
+    """
+    if index is None:
+        index = atv_index.obtenir_index_atv(TICKERS)
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    seuils_atv = np.atleast_1d(np.asarray(seuils_atv, dtype=float))
+    seuils_quantite = np.atleast_1d(np.asarray(seuils_quantite, dtype=float))
+    atv = np.vstack([index.ligne(date) for date in dates]) if len(dates) else np.empty((0, len(index.tickers)))
+
+    quantites, liquidables, delais = quantites_scenarios(atv, seuils_atv, seuils_quantite)
+    horizons = delais.max(axis=-1)
+    horizon_max = int(horizons.max()) if horizons.size else 0
+
+    blocs = [slice(debut, debut + taille_bloc) for debut in range(0, len(dates), taille_bloc)]
+    arguments = [(quantites[b], liquidables[b], delais[b], horizon_max, deformations) for b in blocs]
+    if n_jobs is not None and n_jobs > 1 and len(blocs) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            resultats = list(executor.map(_profils_bloc, *zip(*arguments)))
+    else:
+        resultats = [_profils_bloc(*args) for args in arguments]
+    profils = np.concatenate(resultats, axis=0) if resultats else np.empty(horizons.shape + (horizon_max,))
+
+    return ResultatScenarios(dates, seuils_atv, seuils_quantite, list(index.tickers),
+                             delais, horizons, profils)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+CHAMPS_PRIX = ('Open', 'High', 'Low', 'Close', 'Adj Close')
+CHAMP_VOLUME = 'Volume'
+DECIMALES_PRIX = 2
+
+def separer_colonne(colonne: str) -> tuple:
+    """
+    Sépare une colonne préfixée par le ticker en (ticker, champ), ex: "AIR.PA_Close" -> ("AIR.PA", "Close").
+    """
+    ticker, _, champ = colonne.rpartition('_')
+    return ticker, champ
+
+def type_volumes(valeurs) -> str:
+    """
+    Choisit le type le plus compact pour des volumes : uint32 s'ils sont entiers, positifs et inférieurs à 2^32,
+    int64 s'ils sont entiers mais hors de cette plage, None sinon (volumes fractionnaires : type inchangé).
+    Les types nullables de pandas (UInt32, Int64) sont utilisés si des valeurs manquent.
+
+    :param valeurs: Les volumes (pd.Series ou tableau).
+    :return: Le nom du type pandas, ou None.
+    """
+    valeurs = pd.Series(valeurs)
+    presentes = valeurs.dropna().to_numpy(dtype=float)
+    if len(presentes) and not np.all(presentes == np.floor(presentes)):
+        return None
+    manquantes = len(presentes) < len(valeurs)
+    if not len(presentes) or (presentes.min() >= 0 and presentes.max() < 2 ** 32):
+        return 'UInt32' if manquantes else 'uint32'
+    return 'Int64' if manquantes else 'int64'
+
+def prix_float32_sans_perte(valeurs, decimales: int = DECIMALES_PRIX) -> bool:
+    """
+    Vérifie que des prix peuvent être stockés en float32 : une fois relus en float64 et arrondis
+    à `decimales` décimales, ils doivent donner exactement les mêmes valeurs que les prix d'origine.
+
+    :param valeurs: Les prix (pd.Series ou tableau).
+    :param decimales: La précision à préserver (None pour exiger un aller-retour exact).
+    :return: True si la conversion en float32 ne modifie aucun prix arrondi.
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    relues = valeurs.astype(np.float32).astype(float)
+    if decimales is not None:
+        valeurs, relues = np.round(valeurs, decimales), np.round(relues, decimales)
+    return bool(np.all((valeurs == relues) | (np.isnan(valeurs) & np.isnan(relues))))
+
+def compacter(df: pd.DataFrame, decimales: int = DECIMALES_PRIX) -> pd.DataFrame:
+    """
+    Applique la politique de types compacts à un DataFrame de marché, au format large (colonnes
+    préfixées par le ticker) ou long (colonnes Open, Close, Volume, ...) :
+    volumes en uint32 ou int64, prix en float32 lorsque la précision demandée est préservée.
+
+    :param df: Le DataFrame à compacter.
+    :param decimales: Le nombre de décimales des prix à préserver exactement (voir prix_float32_sans_perte).
+    :return: Un nouveau DataFrame aux types compacts.
+    """
+    types = {}
+    for colonne in df.columns:
+        if colonne in ('Date', 'Ticker') or not pd.api.types.is_numeric_dtype(df[colonne]):
+            continue
+        champ = separer_colonne(colonne)[1] if '_' in colonne else colonne
+        if champ == CHAMP_VOLUME:
+            type_volume = type_volumes(df[colonne])
+            if type_volume is not None:
+                types[colonne] = type_volume
+        elif champ in CHAMPS_PRIX and df[colonne].dtype != np.float32:
+            if prix_float32_sans_perte(df[colonne], decimales):
+                types[colonne] = np.float32
+    return df.astype(types) if types else df
+
+def vers_format_long(df: pd.DataFrame, index: bool = False, decimales: int = DECIMALES_PRIX) -> pd.DataFrame:
+    """
+    Convertit un DataFrame au format large (colonne 'Date' ou dates en index, colonnes "<ticker>_<champ>")
+    en format long : une ligne par (date, ticker), les tickers étant catégoriels, avec les types compacts.
+    Les couples (date, ticker) sans aucune valeur sont supprimés.
+
+    :param df: Le DataFrame au format large.
+    :param index: Si True, le résultat est indexé par un MultiIndex (Date, Ticker).
+    :param decimales: La précision des prix à préserver (voir compacter).
+    :return: Un DataFrame avec les colonnes Date, Ticker et une colonne par champ.
+    """
+    if 'Date' not in df.columns:
+        df = df.rename_axis('Date').reset_index()
+    colonnes_par_ticker = {}
+    for colonne in df.columns.drop('Date'):
+        ticker, champ = separer_colonne(colonne)
+        colonnes_par_ticker.setdefault(ticker, {})[champ] = colonne
+
+    tickers = list(colonnes_par_ticker)
+    morceaux = []
+    for ticker, colonnes in colonnes_par_ticker.items():
+        morceau = df[['Date'] + list(colonnes.values())].rename(columns={v: k for k, v in colonnes.items()})
+        morceau = morceau.dropna(subset=list(colonnes), how='all')
+        morceau.insert(1, 'Ticker', pd.Categorical([ticker] * len(morceau), categories=tickers))
+        morceaux.append(compacter(morceau, decimales))
+    long = pd.concat(morceaux, ignore_index=True) if morceaux else pd.DataFrame(columns=['Date', 'Ticker'])
+    long = compacter(long, decimales)
+    return long.set_index(['Date', 'Ticker']) if index else long
+
+def vers_format_large(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convertit un DataFrame au format long (colonnes ou MultiIndex Date, Ticker) vers le format large
+    historique : colonne 'Date' et une colonne "<ticker>_<champ>" par ticker et par champ.
+    """
+    if isinstance(long.index, pd.MultiIndex):
+        long = long.reset_index()
+    large = long.pivot(index='Date', columns='Ticker')
+    large = large.swaplevel(axis=1)
+    tickers = [t for t in (long['Ticker'].cat.categories if hasattr(long['Ticker'], 'cat') else long['Ticker'].unique())
+               if t in large.columns.get_level_values(0)]
+    champs = [c for c in long.columns if c not in ('Date', 'Ticker')]
+    large = large.reindex(columns=pd.MultiIndex.from_product([tickers, champs]))
+    large.columns = [f'{ticker}_{champ}' for ticker, champ in large.columns]
+    return large.reset_index()
@@ -0,0 +1,96 @@
+import numpy as np
+
+# Limites des graphiques : au-delà, les actifs sont regroupés et les jours sous-échantillonnés,
+# de sorte que le temps de rendu ne dépend plus de la taille de l'univers ni de l'horizon de liquidation
+MAX_ACTIFS = 10
+MAX_POINTS = 250
+MAX_BARRES = 60
+MAX_ETIQUETTES = 30
+
+def principaux_actifs(valeurs, actifs, max_actifs: int = MAX_ACTIFS, critere=None, nom_autres: str = 'Autres'):
+    """
+    Conserve les max_actifs actifs les plus importants et regroupe les autres en une ligne "Autres"
+    (somme de leurs valeurs). Si l'univers est assez petit, les données sont retournées inchangées.
+
+    :param valeurs: La matrice (actifs x périodes) à tracer (poids, valeurs, ...).
+    :param actifs: Les noms des actifs, dans l'ordre des lignes de valeurs.
+    :param max_actifs: Le nombre maximal de courbes (y compris "Autres") ; None pour ne rien regrouper.
+    :param critere: Le critère de classement des actifs (par défaut, la première période de valeurs).
+    :param nom_autres: Le nom de la ligne regroupant les autres actifs.
+    :return: Un tuple (noms des actifs, matrice des valeurs).
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    if max_actifs is None or len(actifs) <= max_actifs:
+        return list(actifs), valeurs
+    critere = valeurs[:, 0] if critere is None else np.asarray(critere, dtype=float)
+    ordre = np.argsort(-np.abs(critere), kind='stable')
+    principaux, autres = ordre[:max_actifs - 1], ordre[max_actifs - 1:]
+    noms = [actifs[i] for i in principaux] + [nom_autres]
+    return noms, np.vstack([valeurs[principaux], valeurs[autres].sum(axis=0)])
+
+def lttb(y, max_points: int = MAX_POINTS, x=None) -> np.ndarray:
+    """
+    Sous-échantillonne une courbe par l'algorithme Largest-Triangle-Three-Buckets : le premier et le dernier
+    point sont conservés, puis, dans chaque intervalle, le point formant le plus grand triangle avec le point
+    retenu précédemment et la moyenne de l'intervalle suivant. Les pics et creux de la courbe sont préservés.
+
+    :param y: Les ordonnées de la courbe.
+    :param max_points: Le nombre de points à conserver ; None pour conserver tous les points.
+    :param x: Les abscisses (par défaut, 0, 1, 2, ...).
+    :return: Les indices des points retenus, croissants.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points is None or n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bornes des max_points - 2 intervalles couvrant les points intérieurs
+    bornes = np.linspace(1, n - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    precedent = 0
+    for i in range(max_points - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        suivant_debut, suivant_fin = fin, bornes[i + 2] if i + 2 < len(bornes) else n
+        x_moyen = x[suivant_debut:suivant_fin].mean()
+        y_moyen = y[suivant_debut:suivant_fin].mean()
+        aires = np.abs((x[precedent] - x_moyen) * (y[debut:fin] - y[precedent])
+                       - (x[precedent] - x[debut:fin]) * (y_moyen - y[precedent]))
+        precedent = debut + int(np.argmax(aires))
+        indices[i + 1] = precedent
+    return indices
+
+def agreger_par_blocs(valeurs, max_blocs: int = MAX_BARRES, agregation: str = 'mean'):
+    """
+    Regroupe les périodes (dernier axe) en au plus max_blocs blocs de périodes consécutives.
+
+    :param valeurs: Un vecteur ou une matrice (actifs x périodes).
+    :param max_blocs: Le nombre maximal de blocs ; None pour ne rien regrouper.
+    :param agregation: 'mean' (moyenne du bloc, qui préserve par exemple une somme des poids égale à 1),
+                       'max' ou 'last' (dernière période du bloc, pour des grandeurs cumulées).
+    :return: Un tuple (indice de la première période de chaque bloc, taille des blocs, valeurs agrégées).
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    n = valeurs.shape[-1]
+    if max_blocs is None or n <= max_blocs:
+        return np.arange(n), np.ones(n, dtype=int), valeurs
+    debuts = np.unique(np.linspace(0, n, max_blocs + 1).astype(int))[:-1]
+    tailles = np.diff(np.append(debuts, n))
+    if agregation == 'mean':
+        agregees = np.add.reduceat(valeurs, debuts, axis=-1) / tailles
+    elif agregation == 'max':
+        agregees = np.maximum.reduceat(valeurs, debuts, axis=-1)
+    elif agregation == 'last':
+        agregees = valeurs[..., debuts + tailles - 1]
+    else:
+        raise ValueError("Le paramètre 'agregation' doit valoir 'mean', 'max' ou 'last'.")
+    return debuts, tailles, agregees
+
+def graduations(nb_periodes: int, max_etiquettes: int = MAX_ETIQUETTES) -> np.ndarray:
+    """
+    Retourne les positions des graduations d'un axe de nb_periodes périodes, espacées régulièrement
+    pour afficher au plus max_etiquettes étiquettes.
+    """
+    pas = max(1, int(np.ceil(nb_periodes / max_etiquettes)))
+    return np.arange(0, nb_periodes, pas)
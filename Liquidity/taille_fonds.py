@@ -0,0 +1,222 @@
+from dataclasses import dataclass, field
+import numpy as np
+import pandas as pd
+import data_store
+import liquidity_management
+
+def part_liquidee(quantites, liquidable, prix, jours: int, deformations: bool = True) -> np.ndarray:
+    """
+    Calcule, pour un lot de portefeuilles, la part de la valeur initiale liquidée après `jours` jours,
+    selon les règles de echeancier.calculer_echeancier.
+
+    Avec déformations, chaque actif est liquidé au rythme maximal : min(quantité, jours * quantité liquidable).
+    Sans déformations, tous les actifs sont liquidés par fractions égales sur le délai de liquidation maximal H,
+    soit une part min(jours / H, 1) de chaque position.
+
+    :param quantites: La matrice (portefeuilles x actifs) des quantités initiales.
+    :param liquidable: Les quantités liquidables en un jour (n actifs).
+    :param prix: Les prix des actifs (n actifs).
+    :param jours: Le nombre de jours de liquidation.
+    :param deformations: True pour une liquidation au rythme maximal, False pour une liquidation à poids constants.
+    :return: La part liquidée de chaque portefeuille (1 pour un portefeuille vide).
+    """
+    quantites = np.atleast_2d(quantites)
+    valeur_totale = quantites @ prix
+    if deformations:
+        valeur_liquidee = np.minimum(quantites, jours * liquidable[None, :]) @ prix
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(valeur_totale > 0, valeur_liquidee / valeur_totale, 1.0)
+    horizon = delai_maximal(quantites, liquidable)
+    with np.errstate(divide='ignore'):
+        return np.where(horizon > 0, np.minimum(jours / horizon, 1.0), 1.0)
+
+def delai_maximal(quantites, liquidable) -> np.ndarray:
+    """
+    Calcule, pour un lot de portefeuilles, le délai de liquidation maximal (en jours) de leurs positions
+    (infini si une position non nulle n'est pas liquidable).
+    """
+    quantites = np.atleast_2d(quantites)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delais = np.where(quantites > 0, np.ceil(quantites / liquidable[None, :]), 0.0)
+    return delais.max(axis=1) if delais.shape[1] else np.zeros(len(quantites))
+
+@dataclass
+class PartLiquidable:
+    """
+    Contrainte : au moins `part` de la valeur du portefeuille doit être liquidable en `jours` jours.
+
+    :param part: La part minimale de la valeur liquidable (ex: 0.2 pour 20 %).
+    :param jours: Le nombre de jours de liquidation.
+    :param deformations: True pour une liquidation au rythme maximal, False pour une liquidation à poids constants.
+    """
+    part: float
+    jours: int = 1
+    deformations: bool = True
+
+    def mesurer(self, quantites, liquidable, prix) -> np.ndarray:
+        return part_liquidee(quantites, liquidable, prix, self.jours, self.deformations)
+
+    def respectee(self, quantites, liquidable, prix) -> np.ndarray:
+        return self.mesurer(quantites, liquidable, prix) >= self.part - 1e-12
+
+    def decrire(self) -> str:
+        mode = "avec" if self.deformations else "sans"
+        return f"{self.part:.0%} de la valeur liquidable en {self.jours} jour(s) ({mode} déformations)"
+
+@dataclass
+class RachatClients:
+    """
+    Contrainte : le rachat simultané des parts des `nb_clients` plus grands clients doit pouvoir être servi
+    en `jours` jours. Sans déformations (par défaut), les actifs sont cédés au prorata, de sorte que les
+    clients restants conservent un portefeuille de même composition.
+
+    :param parts_clients: Les parts du fonds détenues par chaque client (ex: [0.15, 0.1, 0.08, ...]).
+    :param nb_clients: Le nombre de plus grands clients dont le rachat est simulé.
+    :param jours: Le délai de rachat, en jours.
+    :param deformations: True pour une liquidation au rythme maximal, False pour une liquidation à poids constants.
+    """
+    parts_clients: list
+    nb_clients: int = 3
+    jours: int = 1
+    deformations: bool = False
+
+    @property
+    def part(self) -> float:
+        return float(sum(sorted(self.parts_clients, reverse=True)[:self.nb_clients]))
+
+    def mesurer(self, quantites, liquidable, prix) -> np.ndarray:
+        return part_liquidee(quantites, liquidable, prix, self.jours, self.deformations)
+
+    def respectee(self, quantites, liquidable, prix) -> np.ndarray:
+        return self.mesurer(quantites, liquidable, prix) >= self.part - 1e-12
+
+    def decrire(self) -> str:
+        return f"rachat des {self.nb_clients} plus grands clients ({self.part:.0%} du fonds) en {self.jours} jour(s)"
+
+@dataclass
+class DelaiMaximal:
+    """
+    Contrainte : toutes les positions doivent être liquidables en au plus `jours` jours.
+    """
+    jours: int
+
+    def mesurer(self, quantites, liquidable, prix) -> np.ndarray:
+        return delai_maximal(quantites, liquidable)
+
+    def respectee(self, quantites, liquidable, prix) -> np.ndarray:
+        return self.mesurer(quantites, liquidable, prix) <= self.jours
+
+    def decrire(self) -> str:
+        return f"toutes les positions liquidables en {self.jours} jour(s)"
+
+@dataclass
+class ResultatTaille:
+    """
+    Résultat de la recherche de la taille maximale du fonds.
+
+    :param diviseur: Le plus petit facteur diviseur de la quantité détenue respectant les contraintes
+                     (le seuil_quantite de pretraitement).
+    :param portefeuille: Le portefeuille correspondant, au format de pretraitement.
+    :param mesures: La valeur de l'indicateur de chaque contrainte pour ce portefeuille.
+    :param evaluations: Le nombre de tailles de portefeuille évaluées.
+    """
+    diviseur: float
+    portefeuille: pd.DataFrame
+    mesures: dict = field(default_factory=dict)
+    evaluations: int = 0
+
+    @property
+    def valeur(self) -> float:
+        return float(self.portefeuille['Valeur initiale portefeuille'].sum())
+
+def quantites_a_l_echelle(quantites_base, diviseurs) -> np.ndarray:
+    """
+    Calcule les quantités détenues pour un lot de facteurs diviseurs, comme generer_statistiques_liquidite :
+    la quantité de base divisée par le facteur, tronquée à l'entier.
+
+    :return: La matrice (diviseurs x actifs) des quantités.
+    """
+    diviseurs = np.atleast_1d(np.asarray(diviseurs, dtype=float))
+    return (np.asarray(quantites_base, dtype=float)[None, :] / diviseurs[:, None]).astype(np.int64)
+
+def mettre_a_l_echelle(portefeuille_base: pd.DataFrame, diviseur: float) -> pd.DataFrame:
+    """
+    Retourne le portefeuille de pretraitement(date, seuil_atv, diviseur) à partir du portefeuille de base
+    (pretraitement avec un facteur diviseur de 1), sans relire les données.
+    """
+    data = portefeuille_base.drop(columns=['Prix', 'Valeur initiale portefeuille', 'Poids initiaux portefeuille'])
+    quantites = quantites_a_l_echelle(data['Quantité initiale portefeuille'], diviseur)[0]
+    data['Quantité initiale portefeuille'] = quantites
+    data['Délai de liquidation'] = np.ceil(quantites / data['Quantité liquidable 1 jour']).astype(int)
+    return liquidity_management.fusionner_donnees(portefeuille_base[['Prix']], data)
+
+def taille_maximale(portefeuille_base: pd.DataFrame, contraintes: list, diviseur_min: float = 1e-3,
+                    diviseur_max: float = 1e9, nb_candidats: int = 64, tolerance: float = 1e-6) -> ResultatTaille:
+    """
+    Cherche le plus petit facteur diviseur de la quantité détenue (donc le plus grand fonds) pour lequel
+    toutes les contraintes sont respectées.
+
+    Les contraintes se resserrent lorsque le fonds grossit : la recherche est une dichotomie par lots,
+    qui évalue à chaque itération nb_candidats facteurs répartis géométriquement dans l'intervalle courant
+    en une seule opération vectorisée, puis conserve l'intervalle où les contraintes deviennent respectées.
+    Quelques itérations suffisent, sans relancer le prétraitement ni les échéanciers.
+
+    :param portefeuille_base: Le portefeuille issu de pretraitement avec un facteur diviseur de 1.
+    :param contraintes: Les contraintes (PartLiquidable, RachatClients, DelaiMaximal, ou tout objet
+                        fournissant respectee(quantites, liquidable, prix) et mesurer(...)).
+    :param diviseur_min: Le plus petit facteur diviseur envisagé.
+    :param diviseur_max: Le plus grand facteur diviseur envisagé.
+    :param nb_candidats: Le nombre de facteurs évalués par itération.
+    :param tolerance: La précision relative sur le facteur diviseur.
+    :return: Un ResultatTaille.
+    :raises ValueError: Si les contraintes ne sont pas respectées même pour le plus grand facteur diviseur.
+    """
+    quantites_base = portefeuille_base['Quantité initiale portefeuille'].to_numpy(dtype=float)
+    liquidable = portefeuille_base['Quantité liquidable 1 jour'].to_numpy(dtype=float)
+    prix = portefeuille_base['Prix'].to_numpy(dtype=float)
+    evaluations = 0
+
+    def respectees(diviseurs):
+        nonlocal evaluations
+        evaluations += len(diviseurs)
+        quantites = quantites_a_l_echelle(quantites_base, diviseurs)
+        masque = np.ones(len(diviseurs), dtype=bool)
+        for contrainte in contraintes:
+            masque &= contrainte.respectee(quantites, liquidable, prix)
+        return masque
+
+    bornes = respectees(np.array([diviseur_min, diviseur_max]))
+    if not bornes[1]:
+        raise ValueError("Les contraintes de liquidité ne peuvent pas être respectées, même pour le plus petit fonds envisagé.")
+    if bornes[0]:
+        bas = haut = diviseur_min
+    else:
+        # bas : contraintes non respectées, haut : contraintes respectées
+        bas, haut = diviseur_min, diviseur_max
+    while haut / bas - 1 > tolerance:
+        candidats = np.geomspace(bas, haut, nb_candidats)
+        masque = respectees(candidats[1:-1])
+        premier = int(np.argmax(masque)) + 1 if masque.any() else nb_candidats - 1
+        bas, haut = candidats[premier - 1], candidats[premier]
+
+    portefeuille = mettre_a_l_echelle(portefeuille_base, haut)
+    quantites = portefeuille['Quantité initiale portefeuille'].to_numpy(dtype=float)[None, :]
+    mesures = {contrainte.decrire() if hasattr(contrainte, 'decrire') else repr(contrainte):
+               float(contrainte.mesurer(quantites, liquidable, prix)[0]) for contrainte in contraintes}
+    return ResultatTaille(float(haut), portefeuille, mesures, evaluations)
+
+def taille_maximale_pour_date(date, seuil_atv: float, contraintes: list, univers_actifs=None,
+                              dossier: str = data_store.DOSSIER_DONNEES, **options) -> ResultatTaille:
+    """
+    Cherche la taille maximale du fonds à une date (voir taille_maximale). Le portefeuille de base est
+    construit une seule fois à partir du panel des ATV précalculé.
+
+    :param date: La date d'analyse.
+    :param seuil_atv: La part de l'ATV liquidable en un jour (0.2 en situation normale, 0.1 en situation stressée).
+    :param contraintes: Les contraintes de liquidité.
+    :param univers_actifs: L'univers d'actifs du portefeuille (par défaut, celui de liquidity_management).
+    :param dossier: Le dossier du magasin de données.
+    :param options: Options de recherche transmises à taille_maximale.
+    """
+    portefeuille_base = liquidity_management.pretraitement(date, seuil_atv, 1.0, univers_actifs, dossier)
+    return taille_maximale(portefeuille_base, contraintes, **options)
@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import covariance
+import frontiere
+
+class FenetreGlissante:
+    """
+    Moyenne actualisée et covariance des rendements d'une fenêtre glissante, mises à jour par
+    ajouts et retraits de rang un (algorithme de Welford) au lieu d'être recalculées à chaque pas.
+
+    Les estimations sont identiques à celles de calcul_rendements_annuels_actualises et de
+    rendements.cov() * 12 sur la même fenêtre, aux erreurs d'arrondi près.
+    """
+
+    def __init__(self, valeurs, taux_actualisation):
+        """
+        Args:
+            valeurs (np.ndarray): Matrice (mois x actifs) des rendements de la fenêtre initiale.
+            taux_actualisation (float): Taux d'actualisation annuel des rendements moyens.
+        """
+        valeurs = np.asarray(valeurs, dtype=float)
+        self.taille = len(valeurs)
+        self.moyenne = valeurs.mean(axis=0)
+        ecarts = valeurs - self.moyenne
+        self.m2 = ecarts.T @ ecarts
+        # Somme actualisée Σ f_t x_t, f_t = (1 + taux)^(-t/12) pour la position t = 1..taille de la fenêtre
+        self.decalage = (1 + taux_actualisation) ** (1 / 12)
+        self.facteur_premier = 1 / self.decalage
+        self.facteur_dernier = self.decalage ** -self.taille
+        self.somme_actualisee = ((1 + taux_actualisation) ** (-np.arange(1, self.taille + 1) / 12)) @ valeurs
+
+    def glisser(self, sortant, entrant):
+        """
+        Retire la plus ancienne observation de la fenêtre et ajoute la nouvelle, en O(n²).
+        """
+        sortant = np.asarray(sortant, dtype=float)
+        entrant = np.asarray(entrant, dtype=float)
+
+        # Retrait de rang un
+        ecart = sortant - self.moyenne
+        self.moyenne = self.moyenne - ecart / (self.taille - 1)
+        self.m2 -= np.outer(ecart, sortant - self.moyenne)
+        # Ajout de rang un
+        ecart = entrant - self.moyenne
+        self.moyenne = self.moyenne + ecart / self.taille
+        self.m2 += np.outer(ecart, entrant - self.moyenne)
+
+        # Chaque rendement restant recule d'une position dans la fenêtre
+        self.somme_actualisee = (self.somme_actualisee - self.facteur_premier * sortant) * self.decalage \
+            + self.facteur_dernier * entrant
+
+    def rendements_annuels(self):
+        return (1 + self.somme_actualisee / self.taille) ** 12 - 1
+
+    def covariance(self):
+        m2 = (self.m2 + self.m2.T) / 2
+        return m2 / (self.taille - 1) * 12
+
+@dataclass
+class ResultatBacktest:
+    """
+    Résultat d'un backtest glissant.
+
+    Attributes:
+        poids (pd.DataFrame): Poids cibles fixés à chaque date de rebalancement (dates x actifs).
+        rotation (pd.Series): Rotation du portefeuille à chaque rebalancement (somme des |variations de poids|).
+        rendements (pd.Series): Rendements réalisés du portefeuille, nets des frais, sur chaque mois hors échantillon.
+        echecs (list): Dates de rebalancement où aucun portefeuille tangent n'a été trouvé (poids précédents conservés).
+    """
+    poids: pd.DataFrame
+    rotation: pd.Series
+    rendements: pd.Series
+    echecs: list
+
+    @property
+    def valeur(self) -> pd.Series:
+        """
+        Valeur du portefeuille (base 1) après chaque mois.
+        """
+        return (1 + self.rendements).cumprod()
+
+    def statistiques(self, risk_free_rate=0.0) -> pd.Series:
+        """
+        Rendement et volatilité annualisés, ratio de Sharpe, perte maximale et rotation moyenne.
+        """
+        valeur = self.valeur
+        rendement = valeur.iloc[-1] ** (12 / len(valeur)) - 1 if len(valeur) else np.nan
+        volatilite = self.rendements.std() * np.sqrt(12)
+        return pd.Series({
+            'Rendement annualisé': rendement,
+            'Volatilité annualisée': volatilite,
+            'Ratio de Sharpe': (rendement - risk_free_rate) / volatilite,
+            'Perte maximale': (valeur / valeur.cummax() - 1).min(),
+            'Rotation moyenne': self.rotation.mean(),
+        })
+
+def backtest_glissant(rendements, risk_free_rate, fenetre=60, pas=1, contraintes=True, estimateur='echantillon', frais=0.0):
+    """
+    Backtest hors échantillon du portefeuille tangent de Markowitz, réestimé sur une fenêtre glissante.
+
+    À chaque date de rebalancement, les rendements attendus et la covariance sont estimés sur les `fenetre`
+    mois précédents (mis à jour par ajout/retrait de rang un), puis le portefeuille tangent est calculé en
+    repartant des poids précédents. Entre deux rebalancements, les poids dérivent avec les rendements des actifs.
+
+    Args:
+        rendements (pd.DataFrame): Rendements mensuels des actifs, de préférence indexés par date
+                                   (extract_rendements(..., conserver_dates=True)).
+        risk_free_rate (float): Le taux sans risque.
+        fenetre (int): Nombre de mois de la fenêtre d'estimation.
+        pas (int): Nombre de mois entre deux rebalancements.
+        contraintes (bool): Si True, poids entre 0 et 1, sinon entre -1 et 1 (comme calculate_efficient_frontier).
+        estimateur: Estimateur de covariance ; seule la covariance empirique ('echantillon') est mise à jour
+                    incrémentalement, les autres sont réestimées sur chaque fenêtre.
+        frais (float): Coût de transaction proportionnel à la rotation (ex: 0.001 pour 10 points de base).
+
+    Returns:
+        ResultatBacktest: Poids, rotation et performance réalisée.
+    """
+    valeurs = rendements.to_numpy(dtype=float)
+    nb_mois, num_assets = valeurs.shape
+    if fenetre < 2 or fenetre >= nb_mois:
+        raise ValueError("La fenêtre d'estimation doit comporter au moins 2 mois et moins que l'historique disponible.")
+    bounds = [(0, 1)] * num_assets if contraintes else [(-1, 1)] * num_assets
+
+    estimation = FenetreGlissante(valeurs[:fenetre], risk_free_rate)
+    poids = np.ones(num_assets) / num_assets
+    poids_courants = None  # Poids dérivés du portefeuille détenu
+    dates_rebalancement, historique_poids, rotations, echecs = [], [], [], []
+    rendements_realises = np.empty(nb_mois - fenetre)
+
+    for t in range(fenetre, nb_mois):
+        if t > fenetre:
+            estimation.glisser(valeurs[t - fenetre - 1], valeurs[t - 1])
+
+        if (t - fenetre) % pas == 0:
+            annual_returns = estimation.rendements_annuels()
+            if estimateur == 'echantillon':
+                cov_matrix = estimation.covariance()
+            else:
+                cov_matrix = covariance.estimer_covariance(rendements.iloc[t - fenetre:t], estimateur)
+            try:
+                poids, _, _ = frontiere.portefeuille_tangent(annual_returns, cov_matrix, risk_free_rate, bounds, x0=poids)
+            except ValueError:
+                echecs.append(rendements.index[t])
+            rotation = np.abs(poids - (np.zeros(num_assets) if poids_courants is None else poids_courants)).sum()
+            dates_rebalancement.append(rendements.index[t])
+            historique_poids.append(poids)
+            rotations.append(rotation)
+            poids_courants = poids
+        else:
+            rotation = 0.0
+
+        rendement = poids_courants @ valeurs[t]
+        rendements_realises[t - fenetre] = rendement - frais * rotation
+        poids_courants = poids_courants * (1 + valeurs[t]) / (1 + rendement)
+
+    return ResultatBacktest(
+        pd.DataFrame(historique_poids, index=dates_rebalancement, columns=rendements.columns),
+        pd.Series(rotations, index=dates_rebalancement, name='Rotation'),
+        pd.Series(rendements_realises, index=rendements.index[fenetre:], name='Rendement'),
+        echecs,
+    )
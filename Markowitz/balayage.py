@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import covariance
+import frontiere
+import markowitz
+
+@dataclass
+class ConfigurationFrontiere:
+    """
+    Une configuration de frontière à évaluer.
+
+    Attributes:
+        actifs (list): Les colonnes de rendements à utiliser (None pour toutes).
+        bounds (tuple): Les bornes (min, max) des poids, communes à tous les actifs.
+        risk_free_rate (float): Le taux sans risque.
+    """
+    actifs: list = None
+    bounds: tuple = (0, 1)
+    risk_free_rate: float = 0.04
+
+@dataclass
+class ResultatBalayage:
+    """
+    Résultat d'une configuration : frontière efficiente et portefeuille tangent.
+
+    Attributes:
+        configuration (ConfigurationFrontiere): La configuration évaluée.
+        actifs (list): Les actifs effectivement utilisés.
+        frontiere (frontiere.Frontiere): Les points de la frontière efficiente.
+        poids_tangent (np.ndarray): Les poids du portefeuille tangent (None s'il n'existe pas).
+        rendement_tangent (float): Le rendement du portefeuille tangent.
+        volatilite_tangent (float): La volatilité du portefeuille tangent.
+    """
+    configuration: ConfigurationFrontiere
+    actifs: list
+    frontiere: frontiere.Frontiere
+    poids_tangent: np.ndarray = None
+    rendement_tangent: float = None
+    volatilite_tangent: float = None
+
+# Données en lecture seule des processus de calcul, transmises une seule fois à leur démarrage
+_DONNEES_PARTAGEES = {}
+
+def _initialiser_processus(donnees):
+    global _DONNEES_PARTAGEES
+    _DONNEES_PARTAGEES = donnees
+
+def _resoudre_bloc(indice, target_returns):
+    annual_returns, cov_matrix, bounds = _DONNEES_PARTAGEES[indice]
+    return indice, frontiere.frontiere_numerique(annual_returns, cov_matrix, bounds, target_returns)
+
+def balayer_frontieres(rendements, configurations, num_portfolios=100, methode='exacte', n_jobs=None, taille_bloc=25,
+                       estimateur='echantillon'):
+    """
+    Calcule les frontières efficientes et les portefeuilles tangents d'un ensemble de configurations
+    (sous-ensemble d'actifs, bornes, taux sans risque).
+
+    Les frontières sont d'abord calculées de manière exacte ; les configurations pour lesquelles ce calcul
+    échoue (ou toutes si methode='numerique') sont découpées en blocs de rendements cibles, résolus
+    indépendamment par un pool de processus qui reçoit une seule fois les rendements et covariances.
+
+    Args:
+        rendements (pd.DataFrame): Les rendements mensuels des actifs.
+        configurations (list): Liste de ConfigurationFrontiere.
+        num_portfolios (int): Nombre de rendements cibles par frontière.
+        methode (str): 'exacte' (avec repli numérique) ou 'numerique'.
+        n_jobs (int): Nombre de processus (None pour tout calculer dans le processus courant).
+        taille_bloc (int): Nombre de rendements cibles par tâche numérique.
+        estimateur: L'estimateur de covariance (voir covariance.ESTIMATEURS).
+
+    Returns:
+        list: Un ResultatBalayage par configuration, dans le même ordre.
+    """
+    donnees, resultats, taches = {}, {}, []
+    for indice, configuration in enumerate(configurations):
+        actifs = list(rendements.columns) if configuration.actifs is None else list(configuration.actifs)
+        sous_rendements = rendements[actifs]
+        annual_returns = np.array(markowitz.calcul_rendements_annuels_actualises(sous_rendements, configuration.risk_free_rate))
+        cov_matrix = covariance.estimer_covariance(sous_rendements, estimateur)
+        bounds = [tuple(configuration.bounds)] * len(actifs)
+        donnees[indice] = (annual_returns, cov_matrix, bounds)
+        target_returns = np.linspace(annual_returns.min(), annual_returns.max(), num_portfolios)
+
+        resultats[indice] = None
+        if methode == 'exacte':
+            try:
+                resultats[indice] = frontiere.frontiere_exacte(annual_returns, cov_matrix, bounds, target_returns)
+            except ValueError:
+                pass
+        if resultats[indice] is None:
+            taches += [(indice, target_returns[debut:debut + taille_bloc]) for debut in range(0, num_portfolios, taille_bloc)]
+
+    # Résolution numérique des blocs de rendements cibles, éventuellement en parallèle
+    if n_jobs is not None and n_jobs > 1 and len(taches) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_initialiser_processus, initargs=(donnees,)) as executor:
+            blocs = list(executor.map(_resoudre_bloc, *zip(*taches)))
+    else:
+        _initialiser_processus(donnees)
+        blocs = [_resoudre_bloc(*tache) for tache in taches]
+
+    for indice in {indice for indice, _ in blocs}:
+        parties = [bloc for i, bloc in blocs if i == indice]
+        resultats[indice] = frontiere.Frontiere(
+            np.concatenate([p.rendements for p in parties]),
+            np.concatenate([p.volatilites for p in parties]),
+            np.vstack([p.poids for p in parties]),
+        )
+
+    sortie = []
+    for indice, configuration in enumerate(configurations):
+        annual_returns, cov_matrix, bounds = donnees[indice]
+        actifs = list(rendements.columns) if configuration.actifs is None else list(configuration.actifs)
+        resultat = ResultatBalayage(configuration, actifs, resultats[indice])
+        try:
+            resultat.poids_tangent, resultat.rendement_tangent, resultat.volatilite_tangent = frontiere.portefeuille_tangent(
+                annual_returns, cov_matrix, configuration.risk_free_rate, bounds
+            )
+        except ValueError:
+            pass
+        sortie.append(resultat)
+    return sortie
@@ -0,0 +1,177 @@
+import numpy as np
+
+def _centrer(rendements):
+    valeurs = np.asarray(rendements, dtype=float)
+    return valeurs - valeurs.mean(axis=0)
+
+def covariance_echantillon(rendements, periodes=12):
+    """
+    Matrice de covariance empirique annualisée (estimateur utilisé jusqu'ici par calculate_efficient_frontier).
+
+    Args:
+        rendements (pd.DataFrame): Rendements périodiques des actifs.
+        periodes (int): Nombre de périodes par an (12 pour des rendements mensuels).
+
+    Returns:
+        np.ndarray: Matrice de covariance annualisée.
+    """
+    return np.array(rendements.cov() * periodes)
+
+def ledoit_wolf(rendements, periodes=12):
+    """
+    Covariance de Ledoit-Wolf : combinaison optimale de la covariance empirique et d'une cible
+    diagonale de variance moyenne, toujours bien conditionnée.
+
+    Args:
+        rendements (pd.DataFrame): Rendements périodiques des actifs.
+        periodes (int): Nombre de périodes par an.
+
+    Returns:
+        np.ndarray: Matrice de covariance annualisée.
+    """
+    x = _centrer(rendements)
+    t, n = x.shape
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    cible = mu * np.eye(n)
+
+    delta = np.sum((sample - cible) ** 2) / n
+    beta = (np.sum(np.sum(x ** 2, axis=1) ** 2) - t * np.sum(sample ** 2)) / (t ** 2 * n)
+    intensite = 0.0 if delta == 0 else min(beta, delta) / delta
+    return (intensite * cible + (1 - intensite) * sample) * periodes
+
+def correlation_constante(rendements, periodes=12):
+    """
+    Covariance rétrécie vers un modèle à corrélation constante (Ledoit et Wolf, 2003) :
+    les variances empiriques sont conservées et toutes les corrélations sont rapprochées de leur moyenne.
+
+    Args:
+        rendements (pd.DataFrame): Rendements périodiques des actifs.
+        periodes (int): Nombre de périodes par an.
+
+    Returns:
+        np.ndarray: Matrice de covariance annualisée.
+    """
+    y = _centrer(rendements)
+    t, n = y.shape
+    sample = y.T @ y / t
+    var = np.diag(sample)
+    sqrtvar = np.sqrt(var)
+
+    r_bar = (np.sum(sample / np.outer(sqrtvar, sqrtvar)) - n) / (n * (n - 1))
+    cible = r_bar * np.outer(sqrtvar, sqrtvar)
+    np.fill_diagonal(cible, var)
+
+    # Estimation de l'intensité optimale de rétrécissement
+    y2 = y ** 2
+    phi_mat = y2.T @ y2 / t - sample ** 2
+    phi = phi_mat.sum()
+    theta_mat = (y ** 3).T @ y / t - var[:, None] * sample
+    np.fill_diagonal(theta_mat, 0)
+    rho = np.trace(phi_mat) + r_bar * np.sum(np.outer(1 / sqrtvar, sqrtvar) * theta_mat)
+    gamma = np.sum((sample - cible) ** 2)
+    intensite = 0.0 if gamma == 0 else max(0.0, min(1.0, (phi - rho) / gamma / t))
+    return (intensite * cible + (1 - intensite) * sample) * periodes
+
+class CovarianceFactorielle:
+    """
+    Covariance d'un modèle à k facteurs, stockée sous forme factorisée : Σ = B Bᵀ + diag(d).
+
+    Les produits Σw et les variances de portefeuille coûtent O(n·k) au lieu de O(n²), et les systèmes
+    Σx = b sont résolus par la formule de Woodbury en O(n·k²). L'objet s'utilise comme une matrice
+    dans les solveurs de frontière (opérateur @, méthodes resoudre et diagonale), sans former Σ ;
+    la conversion np.asarray reste possible mais coûte O(n²·k).
+    """
+
+    def __init__(self, chargements, variances_specifiques):
+        """
+        Args:
+            chargements (np.ndarray): Matrice B (n x k) des expositions aux facteurs.
+            variances_specifiques (np.ndarray): Vecteur d (n) des variances idiosyncratiques, strictement positives.
+        """
+        self.chargements = np.asarray(chargements, dtype=float)
+        self.variances_specifiques = np.asarray(variances_specifiques, dtype=float)
+        self.shape = (len(self.variances_specifiques),) * 2
+
+    def __matmul__(self, w):
+        w = np.asarray(w, dtype=float)
+        d = self.variances_specifiques if w.ndim == 1 else self.variances_specifiques[:, None]
+        return self.chargements @ (self.chargements.T @ w) + d * w
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.chargements @ self.chargements.T + np.diag(self.variances_specifiques)
+        return dense if dtype is None else dense.astype(dtype)
+
+    def diagonale(self):
+        """
+        Variances des actifs (diagonale de Σ), en O(n·k).
+        """
+        return np.sum(self.chargements ** 2, axis=1) + self.variances_specifiques
+
+    def variance(self, w):
+        """
+        Variance du portefeuille de poids w, en O(n·k).
+        """
+        w = np.asarray(w, dtype=float)
+        expositions = self.chargements.T @ w
+        return expositions @ expositions + np.sum(self.variances_specifiques * w ** 2)
+
+    def resoudre(self, b):
+        """
+        Résout Σx = b par la formule de Woodbury, sans former Σ.
+        """
+        b = np.asarray(b, dtype=float)
+        d = self.variances_specifiques if b.ndim == 1 else self.variances_specifiques[:, None]
+        d_inv_b = b / d
+        d_inv_chargements = self.chargements / self.variances_specifiques[:, None]
+        noyau = np.eye(self.chargements.shape[1]) + self.chargements.T @ d_inv_chargements
+        return d_inv_b - d_inv_chargements @ np.linalg.solve(noyau, self.chargements.T @ d_inv_b)
+
+def modele_factoriel(rendements, k=3, periodes=12):
+    """
+    Modèle à k facteurs statistiques (composantes principales) : les k premiers vecteurs propres de la
+    covariance empirique forment les chargements, le reste de la variance est supposé idiosyncratique.
+
+    Args:
+        rendements (pd.DataFrame): Rendements périodiques des actifs.
+        k (int): Nombre de facteurs.
+        periodes (int): Nombre de périodes par an.
+
+    Returns:
+        CovarianceFactorielle: La covariance annualisée sous forme factorisée.
+    """
+    x = _centrer(rendements)
+    t, n = x.shape
+    k = min(k, n - 1, t - 1)
+
+    # Décomposition en valeurs singulières des rendements centrés : O(t·n·min(t, n)), sans former Σ
+    _, valeurs_singulieres, vecteurs = np.linalg.svd(x / np.sqrt(t - 1), full_matrices=False)
+    chargements = vecteurs[:k].T * valeurs_singulieres[:k]
+    variances_totales = np.sum(x ** 2, axis=0) / (t - 1)
+    specifiques = np.maximum(variances_totales - np.sum(chargements ** 2, axis=1), 1e-4 * variances_totales.mean())
+    return CovarianceFactorielle(chargements * np.sqrt(periodes), specifiques * periodes)
+
+ESTIMATEURS = {
+    'echantillon': covariance_echantillon,
+    'ledoit_wolf': ledoit_wolf,
+    'correlation_constante': correlation_constante,
+    'factoriel': modele_factoriel,
+}
+
+def estimer_covariance(rendements, estimateur='echantillon', **kwargs):
+    """
+    Estime la covariance annualisée avec l'estimateur choisi.
+
+    Args:
+        rendements (pd.DataFrame): Rendements mensuels des actifs.
+        estimateur: Nom d'un estimateur de ESTIMATEURS, ou fonction (rendements, **kwargs) -> covariance.
+        **kwargs: Paramètres de l'estimateur (ex: k pour 'factoriel').
+
+    Returns:
+        np.ndarray | CovarianceFactorielle: La covariance annualisée.
+    """
+    if callable(estimateur):
+        return estimateur(rendements, **kwargs)
+    if estimateur not in ESTIMATEURS:
+        raise ValueError(f"Estimateur de covariance inconnu : {estimateur}. Valeurs possibles : {list(ESTIMATEURS)}")
+    return ESTIMATEURS[estimateur](rendements, **kwargs)
@@ -0,0 +1,615 @@
+from dataclasses import dataclass
+import os
+import sys
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import profilage
+
+@dataclass
+class Frontiere:
+    """
+    Points d'une frontière efficiente.
+
+    Attributes:
+        rendements (np.ndarray): Rendements cibles des points de la frontière.
+        volatilites (np.ndarray): Volatilités minimales associées.
+        poids (np.ndarray): Matrice (points x actifs) des poids des portefeuilles.
+    """
+    rendements: np.ndarray
+    volatilites: np.ndarray
+    poids: np.ndarray
+
+def _variance(weights, cov_matrix):
+    return weights @ (cov_matrix @ weights)
+
+def _gradient_variance(weights, cov_matrix):
+    return 2 * (cov_matrix @ weights)
+
+def _resoudre(cov_matrix, b):
+    """
+    Résout Σx = b : par la méthode de la covariance si elle en fournit une (forme factorisée),
+    sinon par une factorisation de Cholesky.
+    """
+    if hasattr(cov_matrix, 'resoudre'):
+        return cov_matrix.resoudre(b)
+    return cho_solve(cho_factor(cov_matrix), b)
+
+def _diagonale(cov_matrix):
+    return cov_matrix.diagonale() if hasattr(cov_matrix, 'diagonale') else np.diag(cov_matrix).copy()
+
+def _ligne(cov_matrix, k):
+    """
+    Ligne k de la covariance : extraite d'une matrice dense, ou obtenue par un produit Σe_k pour une forme factorisée.
+    """
+    if isinstance(cov_matrix, np.ndarray):
+        return cov_matrix[k]
+    unitaire = np.zeros(cov_matrix.shape[0])
+    unitaire[k] = 1.0
+    return cov_matrix @ unitaire
+
+def _volatilites(poids, cov_matrix):
+    return evaluer_portefeuilles(poids, np.zeros(np.shape(poids)[1]), cov_matrix)[1]
+
+def _contrainte_budget(weights):
+    return np.sum(weights) - 1
+
+def _jacobien_budget(weights):
+    return np.ones_like(weights)
+
+def _contrainte_rendement(weights, annual_returns, target):
+    return weights @ annual_returns - target
+
+def _jacobien_rendement(weights, annual_returns, target):
+    return annual_returns
+
+def minimiser_variance(annual_returns, cov_matrix, bounds, target, x0=None, egalite=False, ftol=1e-12):
+    """
+    Minimise la variance du portefeuille sous contrainte de budget et de rendement cible (SLSQP),
+    avec gradients et jacobiens analytiques.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix (np.ndarray): Matrice de covariance annualisée.
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+        target (float): Rendement cible.
+        x0 (np.ndarray): Point de départ (par défaut, poids égaux).
+        egalite (bool): Si True, le rendement doit valoir exactement la cible, sinon au moins la cible.
+        ftol (float): Précision demandée sur la variance.
+
+    Returns:
+        scipy.optimize.OptimizeResult: Le résultat de l'optimisation (result.fun est la variance).
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    num_assets = len(annual_returns)
+    constraints = [
+        {'type': 'eq', 'fun': _contrainte_budget, 'jac': _jacobien_budget},  # Somme des poids = 1
+        {'type': 'eq' if egalite else 'ineq', 'fun': _contrainte_rendement, 'jac': _jacobien_rendement,
+         'args': (annual_returns, target)},
+    ]
+    result = minimize(
+        _variance,
+        x0=np.ones(num_assets) / num_assets if x0 is None else x0,
+        args=(cov_matrix,),
+        jac=_gradient_variance,
+        constraints=constraints,
+        bounds=bounds,
+        method='SLSQP',
+        options={'ftol': ftol, 'maxiter': 500}
+    )
+    profilage.compter('iterations_slsqp', result.nit)
+    profilage.compter('echecs_slsqp', int(not result.success))
+    return result
+
+def frontiere_numerique(annual_returns, cov_matrix, bounds, target_returns):
+    """
+    Calcule la frontière efficiente point par point. Chaque rendement cible repart de la solution
+    du précédent (démarrage à chaud), ce qui réduit fortement le nombre d'itérations.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix (np.ndarray): Matrice de covariance annualisée.
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+        target_returns (np.ndarray): Rendements cibles, de préférence croissants.
+
+    Returns:
+        Frontiere: Les points pour lesquels l'optimisation a convergé.
+    """
+    num_assets = len(annual_returns)
+    x0 = np.ones(num_assets) / num_assets
+    efficient_rets, efficient_vols, efficient_weights = [], [], []
+
+    for target in target_returns:
+        result = minimiser_variance(annual_returns, cov_matrix, bounds, target, x0=x0)
+        if result.success:
+            efficient_rets.append(target)  # Rendement cible
+            efficient_vols.append(np.sqrt(max(result.fun, 0.0)))  # Volatilité minimale
+            efficient_weights.append(result.x)
+            x0 = result.x
+
+    return Frontiere(np.array(efficient_rets), np.array(efficient_vols),
+                     np.array(efficient_weights).reshape(-1, num_assets))
+
+def _respecte_bornes(poids, bounds, tol=1e-9):
+    lower = np.array([b[0] for b in bounds], dtype=float)
+    upper = np.array([b[1] for b in bounds], dtype=float)
+    poids = np.atleast_2d(poids)
+    return bool(np.all(poids >= lower - tol) and np.all(poids <= upper + tol)
+                and np.allclose(poids.sum(axis=1), 1, atol=1e-9))
+
+def frontiere_analytique(annual_returns, cov_matrix, target_returns):
+    """
+    Frontière efficiente exacte sous la seule contrainte de budget (solution à deux fonds),
+    obtenue à partir d'une unique résolution de système par la matrice de covariance.
+    Comme pour la contrainte de rendement minimal, les cibles inférieures au rendement du
+    portefeuille de variance minimale donnent ce portefeuille.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix: Matrice de covariance annualisée (définie positive), dense ou factorisée.
+        target_returns (np.ndarray): Rendements cibles.
+
+    Returns:
+        Frontiere: Les points de la frontière pour chaque rendement cible.
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    target_returns = np.asarray(target_returns, dtype=float)
+    inv_ones, inv_mu = _resoudre(cov_matrix, np.column_stack([np.ones_like(annual_returns), annual_returns])).T
+
+    a = inv_ones.sum()
+    b = inv_mu.sum()
+    c = annual_returns @ inv_mu
+    d = a * c - b ** 2
+
+    rendements_effectifs = np.maximum(target_returns, b / a)
+    poids = (np.outer(c - b * rendements_effectifs, inv_ones) + np.outer(a * rendements_effectifs - b, inv_mu)) / d
+    volatilites = _volatilites(poids, cov_matrix)
+    return Frontiere(target_returns, volatilites, poids)
+
+class _InverseLibre:
+    """
+    Inverse de la covariance des actifs libres Σ_FF (algorithme de la ligne critique), tenue à jour par
+    des mises à jour de rang un (matrice bordée) lorsqu'un actif entre dans l'ensemble libre ou en sort,
+    au lieu d'une inversion à chaque événement. Les produits Q = Σ_FF⁻¹ Σ_F· sont tenus à jour de même :
+    ils donnent en une passe les compléments de Schur de tous les actifs candidats à l'entrée.
+    """
+
+    def __init__(self, covar):
+        self.covar = covar
+        self.diagonale = _diagonale(covar)
+        self.indices = []
+        self.inverse = np.empty((0, 0))
+        self.lignes = np.empty((0, len(self.diagonale)))  # Σ_F·
+        self.produits = np.empty((0, len(self.diagonale)))  # Q = Σ_FF⁻¹ Σ_F·
+
+    def resoudre(self, b):
+        return self.inverse @ b
+
+    def schur(self, candidats):
+        """
+        Compléments de Schur s_i - Σ_iF Σ_FF⁻¹ Σ_Fi des actifs candidats.
+        """
+        return self.diagonale[candidats] - np.einsum('ij,ij->j', self.lignes[:, candidats], self.produits[:, candidats])
+
+    def ajouter(self, k):
+        ligne = _ligne(self.covar, k)
+        u = self.produits[:, k]
+        schur = self.diagonale[k] - self.lignes[:, k] @ u
+        if not schur > 1e-12 * self.diagonale[k]:
+            raise np.linalg.LinAlgError("La covariance des actifs libres n'est pas inversible.")
+        r = (ligne - self.lignes[:, k] @ self.produits) / schur
+        m = len(self.indices)
+        inverse = np.empty((m + 1, m + 1))
+        inverse[:m, :m] = self.inverse + np.outer(u, u) / schur
+        inverse[:m, m] = inverse[m, :m] = -u / schur
+        inverse[m, m] = 1 / schur
+        self.inverse = inverse
+        self.produits = np.vstack([self.produits - np.outer(u, r), r])
+        self.lignes = np.vstack([self.lignes, ligne])
+        self.indices.append(k)
+
+    def retirer(self, k):
+        p = self.indices.index(k)
+        gardes = np.arange(len(self.indices)) != p
+        e = self.inverse[gardes, p] / self.inverse[p, p]
+        self.inverse = self.inverse[np.ix_(gardes, gardes)] - np.outer(e, self.inverse[p, gardes])
+        self.produits = self.produits[gardes] - np.outer(e, self.produits[p])
+        self.lignes = self.lignes[gardes]
+        del self.indices[p]
+
+def points_critiques(annual_returns, cov_matrix, bounds):
+    """
+    Calcule les portefeuilles critiques (turning points) de la frontière efficiente sous contraintes
+    de bornes par l'algorithme de la ligne critique de Markowitz. Entre deux points critiques
+    consécutifs, les poids varient linéairement avec le rendement.
+
+    L'inverse de la covariance des actifs libres est mise à jour à chaque entrée ou sortie d'un actif
+    (rang un), et tous les actifs candidats à l'entrée sont évalués en une passe vectorisée :
+    chaque point critique coûte O(n²) au lieu d'une inversion par candidat. Une covariance factorisée
+    n'est jamais formée : seuls ses produits Σw et ses lignes sont utilisés.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix: Matrice de covariance annualisée, dense ou factorisée (covariance.CovarianceFactorielle).
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+
+    Returns:
+        np.ndarray: Matrice (points x actifs) des portefeuilles critiques, par rendement décroissant,
+                    le dernier étant le portefeuille de variance minimale.
+    """
+    mean = np.asarray(annual_returns, dtype=float)
+    covar = cov_matrix if hasattr(cov_matrix, 'resoudre') else np.asarray(cov_matrix, dtype=float)
+    lower = np.array([b[0] for b in bounds], dtype=float)
+    upper = np.array([b[1] for b in bounds], dtype=float)
+    num_assets = len(mean)
+    if lower.sum() > 1 or upper.sum() < 1:
+        raise ValueError("Les bornes des poids ne permettent pas de respecter la contrainte de budget.")
+
+    # Point de départ : les actifs les plus rentables sont portés à leur borne haute
+    w = lower.copy()
+    for i in np.argsort(mean)[::-1]:
+        w[i] = upper[i]
+        if w.sum() >= 1:
+            break
+    w[i] += 1 - w.sum()
+    libres = _InverseLibre(covar)
+    libres.ajouter(i)
+    est_libre = np.zeros(num_assets, dtype=bool)
+    est_libre[i] = True
+
+    def etat():
+        # Avec F les actifs libres et B les actifs bornés : g1 = Σ_FF⁻¹ 1, gmu = Σ_FF⁻¹ μ_F, l3 = Σ_FF⁻¹ Σ_FB w_B
+        f = np.array(libres.indices)
+        w_b = np.where(est_libre, 0.0, w)
+        h = libres.lignes @ w_b
+        g1, gmu, l3 = libres.resoudre(np.column_stack([np.ones(len(f)), mean[f], h])).T
+        return f, w_b, h, g1, gmu, l3
+
+    points, lambdas = [w.copy()], [None]
+    f, w_b, h, g1, gmu, l3 = etat()
+    for _ in range(4 * num_assets + 10):
+        s1, smu, s3, somme_b = g1.sum(), gmu.sum(), l3.sum(), w_b.sum()
+
+        # 1) Un poids libre atteint une borne
+        l_in = None
+        if len(f) > 1:
+            c = -s1 * gmu + smu * g1
+            bornes = np.where(c > 0, upper[f], lower[f])
+            valides = np.abs(c) >= 1e-16
+            with np.errstate(divide='ignore', invalid='ignore'):
+                lam = ((1 - somme_b + s3) * g1 - s1 * (bornes + l3)) / c
+            if valides.any():
+                j = np.flatnonzero(valides)[np.argmax(lam[valides])]
+                l_in, i_in, borne_in = lam[j], f[j], bornes[j]
+
+        # 2) Un poids borné devient libre : l'ensemble libre augmenté de chaque candidat i est traité
+        # par la formule de la matrice bordée, à partir du complément de Schur de i
+        l_out = None
+        b = np.flatnonzero(~est_libre)
+        if len(b):
+            q = libres.produits[:, b]
+            q1, qmu, qh = q.sum(axis=0), mean[f] @ q, h @ q
+            schur = libres.schur(b)
+            sigma_w = (covar @ w_b)[b]
+            t1, tmu = 1 - q1, mean[b] - qmu
+            with np.errstate(divide='ignore', invalid='ignore'):
+                c1 = s1 + t1 ** 2 / schur
+                c4 = t1 / schur
+                c = -c1 * tmu / schur + (smu + tmu * t1 / schur) * c4
+                l3_i = (sigma_w - qh) / schur - w[b]
+                l2 = s3 - w[b] * q1 + l3_i * t1
+                lam = ((1 - somme_b + w[b] + l2) * c4 - c1 * (w[b] + l3_i)) / c
+            valides = (schur > 0) & (np.abs(c) >= 1e-16)
+            if lambdas[-1] is not None:
+                # Tolérance relative : un actif qui vient d'atteindre sa borne ne doit pas redevenir libre
+                # au même lambda à cause des erreurs d'arrondi
+                valides &= lam < lambdas[-1] - 1e-9 * abs(lambdas[-1])
+            if valides.any():
+                j = np.flatnonzero(valides)[np.argmax(lam[valides])]
+                l_out, i_out = lam[j], b[j]
+
+        if (l_in is None or l_in < 0) and (l_out is None or l_out < 0):
+            # 3) Portefeuille de variance minimale
+            lam = 0.0
+        else:
+            # 4) Choix de l'événement le plus proche
+            if l_out is None or (l_in is not None and l_in > l_out):
+                lam = l_in
+                libres.retirer(i_in)
+                est_libre[i_in] = False
+                w[i_in] = borne_in
+            else:
+                lam = l_out
+                libres.ajouter(i_out)
+                est_libre[i_out] = True
+            f, w_b, h, g1, gmu, l3 = etat()
+
+        # 5) Poids des actifs libres
+        g = (-lam * gmu.sum() + 1 - w_b.sum() + l3.sum()) / g1.sum()
+        w[f] = -l3 + g * g1 + lam * gmu
+        points.append(w.copy())
+        lambdas.append(lam)
+        if lam == 0:
+            break
+    else:
+        raise ValueError("L'algorithme de la ligne critique n'a pas convergé.")
+    profilage.compter('iterations_cla', len(lambdas))
+
+    # Suppression des points numériquement invalides, puis de ceux dont le rendement n'est pas décroissant
+    points = [p for p in points if _respecte_bornes(p, bounds)]
+    retenus = []
+    for p in reversed(points):
+        if not retenus or p @ mean > retenus[-1] @ mean + 1e-14:
+            retenus.append(p)
+    return np.array(retenus[::-1])
+
+def frontiere_cla(annual_returns, cov_matrix, bounds, target_returns, points=None):
+    """
+    Frontière efficiente exacte sous contraintes de bornes, par interpolation entre les portefeuilles
+    critiques de l'algorithme de la ligne critique (sans optimiseur itératif).
+    Les cibles supérieures au rendement maximal atteignable sont ignorées, comme les échecs du
+    solveur numérique ; les cibles inférieures au portefeuille de variance minimale donnent ce portefeuille.
+    Les portefeuilles critiques déjà calculés par points_critiques peuvent être fournis via `points`.
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    target_returns = np.asarray(target_returns, dtype=float)
+    if points is None:
+        points = points_critiques(annual_returns, cov_matrix, bounds)
+    rendements_points = points @ annual_returns  # décroissants
+    r_max, r_min = rendements_points[0], rendements_points[-1]
+
+    tol = 1e-10 * max(1.0, abs(r_max))
+    cibles = target_returns[target_returns <= r_max + tol]
+    rendements_effectifs = np.clip(cibles, r_min, r_max)
+
+    # Interpolation linéaire des poids entre les deux points critiques encadrant chaque cible
+    croissants = rendements_points[::-1]
+    segment = np.clip(np.searchsorted(croissants, rendements_effectifs) - 1, 0, max(len(points) - 2, 0))
+    bas, haut = points[::-1][segment], points[::-1][np.minimum(segment + 1, len(points) - 1)]
+    ecart = croissants[np.minimum(segment + 1, len(points) - 1)] - croissants[segment]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(ecart > 0, (rendements_effectifs - croissants[segment]) / ecart, 0.0)
+    poids = bas + t[:, None] * (haut - bas)
+    volatilites = _volatilites(poids, cov_matrix)
+    return Frontiere(cibles, volatilites, poids)
+
+def frontiere_exacte(annual_returns, cov_matrix, bounds, target_returns):
+    """
+    Frontière efficiente exacte : solution analytique si aucune borne n'est active,
+    sinon algorithme de la ligne critique.
+
+    Raises:
+        ValueError: Si le calcul exact échoue (matrice non inversible, résultat incohérent),
+                    auquel cas il faut recourir à frontiere_numerique.
+    """
+    try:
+        resultat = frontiere_analytique(annual_returns, cov_matrix, target_returns)
+        if _respecte_bornes(resultat.poids, bounds):
+            return resultat
+        resultat = frontiere_cla(annual_returns, cov_matrix, bounds, target_returns)
+    except np.linalg.LinAlgError as e:
+        raise ValueError(f"Calcul exact de la frontière impossible : {e}")
+    if len(resultat.rendements) == 0 or not _respecte_bornes(resultat.poids, bounds, tol=1e-7):
+        raise ValueError("Calcul exact de la frontière impossible : portefeuilles critiques incohérents.")
+    return resultat
+
+def _normaliser_bornes(bounds, num_assets):
+    """
+    Accepte None (pas de bornes), un couple (min, max) commun ou une liste de couples par actif.
+    """
+    if bounds is None:
+        return None
+    if len(bounds) == 2 and np.isscalar(bounds[0]):
+        return [tuple(bounds)] * num_assets
+    return [tuple(b) for b in bounds]
+
+def tangent_ligne_critique(annual_returns, cov_matrix, risk_free_rate, bounds, points=None):
+    """
+    Portefeuille tangent sous contraintes de bornes, à partir des portefeuilles critiques : le portefeuille
+    tangent est sur la frontière efficiente, dont les poids varient linéairement entre deux portefeuilles
+    critiques consécutifs. Sur chaque segment w(t) = w0 + t·d, la condition du premier ordre du ratio
+    de Sharpe est linéaire en t : le maximum de chaque segment est obtenu en forme close, sans optimiseur.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix: Matrice de covariance annualisée, dense ou factorisée (covariance.CovarianceFactorielle).
+        risk_free_rate (float): Le taux sans risque.
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+        points (np.ndarray): Portefeuilles critiques déjà calculés par points_critiques.
+
+    Returns:
+        np.ndarray: Les poids du portefeuille tangent, ou None si aucun portefeuille de la frontière
+                    n'a un rendement supérieur au taux sans risque.
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    if points is None:
+        points = points_critiques(annual_returns, cov_matrix, bounds)
+    excess = annual_returns - risk_free_rate
+    if len(points) == 1:
+        return points[0] if points[0] @ excess > 0 else None
+
+    # Segments entre portefeuilles critiques consécutifs : excès de rendement e0 + t·ed, variance a + 2bt + ct²
+    debuts, directions = points[:-1], np.diff(points, axis=0)
+    produits_debuts = (cov_matrix @ debuts.T).T
+    produits_directions = (cov_matrix @ directions.T).T
+    e0, ed = debuts @ excess, directions @ excess
+    a = np.einsum('ij,ij->i', debuts, produits_debuts)
+    b = np.einsum('ij,ij->i', debuts, produits_directions)
+    c = np.einsum('ij,ij->i', directions, produits_directions)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_etoile = np.clip(np.nan_to_num((e0 * b - ed * a) / (ed * b - e0 * c)), 0.0, 1.0)
+    t = np.column_stack([np.zeros(len(debuts)), t_etoile, np.ones(len(debuts))])
+    excedents = e0[:, None] + ed[:, None] * t
+    variances = a[:, None] + 2 * b[:, None] * t + c[:, None] * t ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where((excedents > 0) & (variances > 0), excedents / np.sqrt(np.maximum(variances, 0.0)), -np.inf)
+    segment, position = np.unravel_index(np.argmax(sharpe), sharpe.shape)
+    if not np.isfinite(sharpe[segment, position]):
+        return None
+    return debuts[segment] + t[segment, position] * directions[segment]
+
+def portefeuille_tangent(annual_returns, cov_matrix, risk_free_rate, bounds=None, x0=None):
+    """
+    Calcule directement le portefeuille de ratio de Sharpe maximal (portefeuille tangent).
+
+    Sans bornes actives, la solution est analytique : w proportionnel à Σ⁻¹(μ - r_f).
+    Sinon, il est obtenu à partir des portefeuilles critiques (voir tangent_ligne_critique) ; en cas d'échec,
+    le problème est reformulé en programme quadratique convexe (changement de variables
+    y = κ w avec (μ - r_f)ᵀ y = 1) et résolu en une seule optimisation.
+
+    Args:
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix: Matrice de covariance annualisée, dense ou factorisée (covariance.CovarianceFactorielle).
+        risk_free_rate (float): Le taux sans risque.
+        bounds: None, un couple (min, max) commun ou une liste de bornes par actif.
+        x0 (np.ndarray): Poids de départ pour la résolution numérique (démarrage à chaud).
+
+    Returns:
+        tuple: (poids, rendement, volatilité) du portefeuille tangent.
+
+    Raises:
+        ValueError: Si aucun portefeuille n'a un rendement supérieur au taux sans risque, ou si l'optimisation échoue.
+    """
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    if not hasattr(cov_matrix, 'resoudre'):
+        cov_matrix = np.asarray(cov_matrix, dtype=float)
+    num_assets = len(annual_returns)
+    bounds = _normaliser_bornes(bounds, num_assets)
+    excess = annual_returns - risk_free_rate
+
+    weights = None
+    try:
+        direction = _resoudre(cov_matrix, excess)
+        if direction.sum() > 0:
+            candidate = direction / direction.sum()
+            if bounds is None or _respecte_bornes(candidate, bounds):
+                weights = candidate
+    except np.linalg.LinAlgError:
+        pass
+
+    if weights is None and bounds is not None:
+        try:
+            weights = tangent_ligne_critique(annual_returns, cov_matrix, risk_free_rate, bounds)
+        except (ValueError, np.linalg.LinAlgError):
+            weights = None
+
+    if weights is None:
+        if bounds is None:
+            raise ValueError("Le portefeuille tangent n'existe pas : le taux sans risque dépasse le rendement du portefeuille de variance minimale.")
+        lower = np.array([b[0] for b in bounds], dtype=float)
+        upper = np.array([b[1] for b in bounds], dtype=float)
+
+        # Point de départ : poids fournis, ou portefeuille de rendement maximal s'ils ne battent pas le taux sans risque
+        w0 = np.ones(num_assets) / num_assets if x0 is None else np.asarray(x0, dtype=float)
+        if w0 @ excess <= 0:
+            w0 = lower.copy()
+            for i in np.argsort(annual_returns)[::-1]:
+                w0[i] = upper[i]
+                if w0.sum() >= 1:
+                    break
+            w0[i] += 1 - w0.sum()
+            if w0 @ excess <= 0:
+                raise ValueError("Le portefeuille tangent n'existe pas : aucun portefeuille ne bat le taux sans risque.")
+        kappa0 = 1 / (w0 @ excess)
+
+        # Variables z = (y, κ) : minimiser yᵀΣy sous (μ - r_f)ᵀy = 1, Σy = κ, κ·min <= y <= κ·max.
+        # Les bornes nulles deviennent des bornes simples des variables (y_i >= 0 ou y_i <= 0), et les bornes
+        # hautes impliquées par le budget et les bornes basses (max_i >= 1 - Σ_{j≠i} min_j) sont omises :
+        # seules les bornes restantes donnent des lignes de contraintes, avec leur jacobien restreint.
+        contraintes_bas = np.flatnonzero(np.isfinite(lower) & (lower != 0))
+        implicite = upper >= 1 - (lower.sum() - lower) if np.all(np.isfinite(lower)) else np.zeros(num_assets, dtype=bool)
+        contraintes_haut = np.flatnonzero(np.isfinite(upper) & (upper != 0) & ~implicite)
+        bornes_variables = [(0 if l == 0 else None, 0 if u == 0 else None) for l, u in zip(lower, upper)]
+        constraints = [
+            {'type': 'eq', 'fun': lambda z: z[:-1] @ excess - 1,
+             'jac': lambda z: np.append(excess, 0.0)},
+            {'type': 'eq', 'fun': lambda z: z[:-1].sum() - z[-1],
+             'jac': lambda z: np.append(np.ones(num_assets), -1.0)},
+        ]
+        if len(contraintes_bas):
+            jacobien_bas = np.zeros((len(contraintes_bas), num_assets + 1))
+            jacobien_bas[np.arange(len(contraintes_bas)), contraintes_bas] = 1
+            jacobien_bas[:, -1] = -lower[contraintes_bas]
+            constraints.append({'type': 'ineq', 'fun': lambda z: z[contraintes_bas] - z[-1] * lower[contraintes_bas],
+                                'jac': lambda z: jacobien_bas})
+        if len(contraintes_haut):
+            jacobien_haut = np.zeros((len(contraintes_haut), num_assets + 1))
+            jacobien_haut[np.arange(len(contraintes_haut)), contraintes_haut] = -1
+            jacobien_haut[:, -1] = upper[contraintes_haut]
+            constraints.append({'type': 'ineq', 'fun': lambda z: z[-1] * upper[contraintes_haut] - z[contraintes_haut],
+                                'jac': lambda z: jacobien_haut})
+        result = minimize(
+            lambda z: z[:-1] @ (cov_matrix @ z[:-1]),
+            x0=np.append(w0 * kappa0, kappa0),
+            jac=lambda z: np.append(2 * (cov_matrix @ z[:-1]), 0.0),
+            constraints=constraints,
+            bounds=bornes_variables + [(0, None)],
+            method='SLSQP',
+            options={'ftol': 1e-14, 'maxiter': 500}
+        )
+        profilage.compter('iterations_slsqp', result.nit)
+        profilage.compter('echecs_slsqp', int(not result.success))
+        if not result.success or result.x[-1] <= 0:
+            raise ValueError(f"Le calcul du portefeuille tangent a échoué : {result.message}")
+        weights = np.clip(result.x[:-1] / result.x[-1], lower, upper)
+
+    return weights, weights @ annual_returns, np.sqrt(max(weights @ (cov_matrix @ weights), 0.0))
+
+def evaluer_portefeuilles(poids, annual_returns, cov_matrix, risk_free_rate=0.0, taille_bloc=8192):
+    """
+    Calcule en une passe vectorisée les rendements, volatilités et ratios de Sharpe d'un grand nombre
+    de portefeuilles. Les lignes sont traitées par blocs de taille_bloc pour borner la mémoire
+    intermédiaire à (taille_bloc x actifs).
+
+    Args:
+        poids (np.ndarray): Matrice (portefeuilles x actifs) des poids.
+        annual_returns (np.ndarray): Rendements annuels attendus des actifs.
+        cov_matrix: Matrice de covariance annualisée, dense ou factorisée (covariance.CovarianceFactorielle).
+        risk_free_rate (float): Le taux sans risque, pour les ratios de Sharpe.
+        taille_bloc (int): Nombre de portefeuilles évalués par bloc.
+
+    Returns:
+        tuple: (rendements, volatilités, ratios de Sharpe), trois vecteurs d'une valeur par portefeuille.
+    """
+    poids = np.atleast_2d(np.asarray(poids, dtype=float))
+    annual_returns = np.asarray(annual_returns, dtype=float)
+    rendements = poids @ annual_returns
+    variances = np.empty(len(poids))
+    for debut in range(0, len(poids), taille_bloc):
+        bloc = poids[debut:debut + taille_bloc]
+        if isinstance(cov_matrix, np.ndarray):
+            variances[debut:debut + taille_bloc] = np.einsum('ij,jk,ik->i', bloc, cov_matrix, bloc, optimize=True)
+        else:
+            variances[debut:debut + taille_bloc] = np.einsum('ij,ji->i', bloc, cov_matrix @ bloc.T)
+    volatilites = np.sqrt(np.maximum(variances, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (rendements - risk_free_rate) / volatilites
+    return rendements, volatilites, sharpe
+
+def portefeuilles_aleatoires(nb_portefeuilles, bounds, graine=None):
+    """
+    Tire des portefeuilles aléatoires respectant la contrainte de budget et les bornes des poids,
+    par exemple pour tracer un nuage de portefeuilles derrière la frontière efficiente.
+
+    Si toutes les bornes valent (0, 1), les poids suivent une loi de Dirichlet uniforme sur le simplexe ;
+    sinon ils sont tirés uniformément entre les bornes, recentrés pour sommer à 1, et les tirages hors
+    bornes sont écartés (le nombre de portefeuilles retournés peut alors être inférieur à nb_portefeuilles).
+
+    Args:
+        nb_portefeuilles (int): Nombre de portefeuilles à tirer.
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+        graine (int): Graine du générateur aléatoire.
+
+    Returns:
+        np.ndarray: Matrice (portefeuilles x actifs) des poids.
+    """
+    rng = np.random.default_rng(graine)
+    lower = np.array([b[0] for b in bounds], dtype=float)
+    upper = np.array([b[1] for b in bounds], dtype=float)
+    if np.all(lower == 0) and np.all(upper == 1):
+        return rng.dirichlet(np.ones(len(bounds)), size=nb_portefeuilles)
+    poids = rng.uniform(lower, upper, size=(nb_portefeuilles, len(bounds)))
+    poids += (1 - poids.sum(axis=1, keepdims=True)) / len(bounds)
+    return poids[np.all((poids >= lower) & (poids <= upper), axis=1)]
@@ -1,11 +1,21 @@
-import yfinance as yf
+import hashlib
+import os
+import sys
+from collections import OrderedDict
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.optimize import minimize
+import covariance
+import frontiere
+import reechantillonnage
 
-def extract_rendements(assets_dict, start_date, end_date):
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import cache, fetcher, profilage
+
+@profilage.mesurer()
+def extract_rendements(assets_dict, start_date, end_date, source=fetcher.source_yfinance, max_workers=8,
+                       cache_prix=cache.CACHE_PRIX, conserver_dates=False):
     """
     Télécharge les données financières pour une liste de tickers, calcule les rendements mensuels,
     et retourne un DataFrame fusionné contenant les rendements pour chaque ticker.
@@ -14,53 +24,36 @@ def extract_rendements(assets_dict, start_date, end_date):
         assets_dict (dict): Dictionnaire où les clés sont les noms des actifs et les valeurs sont les tickers correspondants.
         start_date (str): Date de début pour récupérer les données au format 'YYYY-MM-DD'.
         end_date (str): Date de fin pour récupérer les données au format 'YYYY-MM-DD'.
+        source (callable): Source de données (ticker, start_date, end_date, interval) -> DataFrame.
+        max_workers (int): Nombre maximal de téléchargements simultanés.
+        cache_prix (CachePrix): Cache des prix consulté avant téléchargement (None pour le désactiver).
+        conserver_dates (bool): Si True, les rendements restent indexés par date (utile pour les backtests).
 
     Returns:
         pd.DataFrame: Un DataFrame fusionné contenant les rendements mensuels pour chaque ticker,
                       aligné sur les dates communes.
     """
-    # Initialisation d'un dictionnaire pour stocker les données individuelles
-    data_dict = {}
-
     # Vérification que le dictionnaire n'est pas vide
     if not assets_dict:
         raise ValueError("Le dictionnaire 'assets_dict' ne doit pas être vide.")
 
-    # Boucle sur les noms et tickers
-    for name, ticker in assets_dict.items():
-        try:
-            # Téléchargement des données pour le ticker donné + Calcul des rendements mensuels (pct_change)
-            data = yf.download(ticker, start=start_date, end=end_date, interval="1mo")['Close'].pct_change()
-            
-            # Réinitialisation de l'index pour une structure tabulaire propre
-            data = data.reset_index()
-
-            # Renommer la colonne 'Close' pour inclure le nom de l'actif
-            data = data.rename(columns={f"{ticker}": f"{name}"})
-
-            # Supprimer les lignes contenant des valeurs manquantes
-            data.dropna(inplace=True)
-
-            # Ajouter au dictionnaire
-            data_dict[name] = data
-
-        except Exception as e:
-            print(f"Erreur lors du téléchargement des données pour {name} ({ticker}): {e}")
+    # Téléchargement simultané de tous les tickers
+    with profilage.etape('telechargement', tickers=len(assets_dict)):
+        donnees = fetcher.telecharger(list(assets_dict.values()), start_date, end_date, interval="1mo",
+                                      source=source, max_workers=max_workers, cache=cache_prix)
 
-    # Initialisation du DataFrame fusionné
-    df_merged = None
+    # Calcul des rendements mensuels (pct_change) en supprimant les valeurs manquantes
+    data_dict = {
+        name: donnees[ticker]['Close'].pct_change().dropna()
+        for name, ticker in assets_dict.items() if ticker in donnees
+    }
 
-    # Fusion des données sur la colonne 'Date'
-    for name, data in data_dict.items():
-        if df_merged is None:
-            df_merged = data[['Date', f"{name}"]]
-        else:
-            df_merged = pd.merge(df_merged, data[['Date', f"{name}"]], on='Date', how='inner')
+    # Alignement de tous les rendements sur les dates communes en une seule passe
+    rendements = fetcher.aligner(data_dict, how='inner')
+    profilage.compter('lignes', len(rendements))
 
     # Sélectionner uniquement les rendements
-    rendements = df_merged.iloc[:, 1:]
-
-    return rendements
+    return rendements if conserver_dates else rendements.reset_index(drop=True)
 
 def plot_matrice_correlation(rendements):
     fig, ax = plt.subplots(figsize=(10, 6))  # Créer une figure
@@ -68,10 +61,28 @@ def plot_matrice_correlation(rendements):
     ax.set_title("Matrice de corrélation des actifs")
     return fig  # Retourner la figure
 
+def empreinte_rendements(rendements):
+    """
+    Calcule une empreinte du contenu d'un DataFrame de rendements (valeurs et noms des colonnes),
+    utilisée comme clé de mémoïsation.
+    """
+    valeurs = np.ascontiguousarray(rendements.to_numpy(dtype=float))
+    empreinte = hashlib.blake2b(valeurs.tobytes(), digest_size=16)
+    empreinte.update(repr((valeurs.shape, tuple(rendements.columns))).encode())
+    return empreinte.hexdigest()
+
+# Rendements annuels actualisés déjà calculés, par (empreinte des rendements, taux)
+_CACHE_RENDEMENTS_ACTUALISES = OrderedDict()
+_TAILLE_CACHE_RENDEMENTS = 32
+
 def calcul_rendements_annuels_actualises(rendements, taux_actualisation):
     """
     Calcule le rendement moyen annuel actualisé pour chaque actif d'un DataFrame.
 
+    Le vecteur des facteurs d'actualisation est calculé une seule fois et appliqué à tous les actifs
+    par un produit matriciel. Le résultat est mémoïsé par (contenu des rendements, taux), ce qui le
+    partage entre le tableau des statistiques et les calculs de frontière.
+
     Args:
         rendements (pd.DataFrame): DataFrame contenant les rendements mensuels (colonnes = actifs, lignes = mois).
         taux_actualisation (float): Taux d'actualisation annuel.
@@ -79,19 +90,30 @@ def calcul_rendements_annuels_actualises(rendements, taux_actualisation):
     Returns:
         pd.Series: Série contenant le rendement moyen annuel actualisé pour chaque actif.
     """
-    # Étape 1 : Actualiser les rendements
-    rendements_actualises = rendements.apply(
-        lambda col: [r / (1 + taux_actualisation)**(t / 12) for t, r in enumerate(col, start=1)],
-        axis=0
-    )
-    
-    # Étape 2 : Calculer la moyenne des rendements actualisés pour chaque actif
-    moyenne_mensuelle_actualisee = rendements_actualises.mean(axis=0)
-    
+    cle = (empreinte_rendements(rendements), float(taux_actualisation))
+    if cle in _CACHE_RENDEMENTS_ACTUALISES:
+        _CACHE_RENDEMENTS_ACTUALISES.move_to_end(cle)
+        return _CACHE_RENDEMENTS_ACTUALISES[cle].copy()
+
+    valeurs = rendements.to_numpy(dtype=float)
+
+    # Étape 1 : Facteurs d'actualisation du mois t = 1..T
+    facteurs = (1 + taux_actualisation) ** (-np.arange(1, len(valeurs) + 1) / 12)
+
+    # Étape 2 : Moyenne des rendements actualisés pour chaque actif (les valeurs manquantes sont ignorées)
+    manquants = np.isnan(valeurs)
+    if manquants.any():
+        moyenne_mensuelle_actualisee = np.nansum(valeurs * facteurs[:, None], axis=0) / (~manquants).sum(axis=0)
+    else:
+        moyenne_mensuelle_actualisee = facteurs @ valeurs / len(valeurs)
+
     # Étape 3 : Convertir en rendement moyen annuel
-    rendements_annuels_actualises = (1 + moyenne_mensuelle_actualisee)**12 - 1
-    
-    return rendements_annuels_actualises
+    rendements_annuels_actualises = pd.Series((1 + moyenne_mensuelle_actualisee)**12 - 1, index=rendements.columns)
+
+    _CACHE_RENDEMENTS_ACTUALISES[cle] = rendements_annuels_actualises
+    while len(_CACHE_RENDEMENTS_ACTUALISES) > _TAILLE_CACHE_RENDEMENTS:
+        _CACHE_RENDEMENTS_ACTUALISES.popitem(last=False)
+    return rendements_annuels_actualises.copy()
 
 def statistiques_rendements(rendements, taux_sans_risque):
     """
@@ -124,7 +146,27 @@ def statistiques_rendements(rendements, taux_sans_risque):
     # Retourner le DataFrame avec les statistiques
     return df_statistiques
 
-def calculate_efficient_frontier(rendements, risk_free_rate, contraintes=True):
+def tangency_portfolio(rendements, risk_free_rate, bounds=None, estimateur='echantillon'):
+    """
+    Calcule directement le portefeuille tangent (ratio de Sharpe maximal), sans calculer la frontière efficiente.
+
+    Args:
+        rendements (pd.DataFrame): Un DataFrame contenant les rendements mensuels des actifs.
+        risk_free_rate (float): Le taux sans risque.
+        bounds: None (aucune borne), un couple (min, max) commun à tous les actifs, ou une liste de bornes par actif.
+        estimateur: L'estimateur de covariance (voir covariance.ESTIMATEURS) ou une fonction rendements -> covariance.
+
+    Returns:
+        tuple: (DataFrame des poids avec les colonnes 'Actif' et 'Poids', rendement, volatilité).
+    """
+    annual_returns = np.array(calcul_rendements_annuels_actualises(rendements, risk_free_rate))
+    cov_matrix = covariance.estimer_covariance(rendements, estimateur)
+    weights, rendement, volatilite = frontiere.portefeuille_tangent(annual_returns, cov_matrix, risk_free_rate, bounds)
+    return pd.DataFrame({'Actif': rendements.columns, 'Poids': weights}), rendement, volatilite
+
+@profilage.mesurer()
+def calculate_efficient_frontier(rendements, risk_free_rate, contraintes=True, methode='exacte', estimateur='echantillon',
+                                 nb_echantillons=2000, n_jobs=None, nb_aleatoires=0, tracer=True):
     """
     Calcule et retourne la frontière efficiente selon la théorie de Markowitz avec la ligne de marché des capitaux.
 
@@ -132,91 +174,148 @@ def calculate_efficient_frontier(rendements, risk_free_rate, contraintes=True):
         rendements (pd.DataFrame): Un DataFrame contenant les rendements historiques des actifs.
         risk_free_rate (float): Le taux sans risque (par défaut, 0.045).
         contraintes (bool): Si True, les poids des actifs sont contraints entre 0 et 1, sinon il n'y a pas de contrainte sur les poids.
+        methode (str): 'exacte' pour la solution analytique (bornes inactives) ou l'algorithme de la ligne critique,
+                       avec repli sur l'optimisation numérique en cas d'échec ; 'numerique' pour l'optimisation SLSQP ;
+                       'reechantillonnee' pour la frontière rééchantillonnée de Michaud (poids moyens par rang sur
+                       des historiques tirés par bootstrap), plus stable face aux erreurs d'estimation.
+        estimateur: L'estimateur de covariance : 'echantillon' (covariance empirique), 'ledoit_wolf',
+                    'correlation_constante' ou 'factoriel' (modèle à facteurs sous forme factorisée, adapté
+                    aux grands univers d'actifs), ou une fonction rendements -> covariance.
+        nb_echantillons (int): Nombre d'historiques tirés pour la méthode 'reechantillonnee'.
+        n_jobs (int): Nombre de processus pour la méthode 'reechantillonnee' (None pour le processus courant).
+        nb_aleatoires (int): Nombre de portefeuilles aléatoires tracés en nuage derrière la frontière (0 pour aucun).
+        tracer (bool): Si False, seule la frontière est calculée, sans créer de figure (fig vaut alors None).
 
     Returns:
         fig (matplotlib.figure.Figure): La figure contenant la frontière efficiente et la ligne de marché des capitaux.
     """
     # Calcul des moyennes et de la matrice de covariance
-    annual_returns = calcul_rendements_annuels_actualises(rendements, risk_free_rate)
-    cov_matrix = np.array(rendements.cov() * 12)
+    profilage.compter('lignes', len(rendements))
+    with profilage.etape('covariance', estimateur=estimateur if isinstance(estimateur, str) else 'personnalise'):
+        annual_returns = np.array(calcul_rendements_annuels_actualises(rendements, risk_free_rate))
+        cov_matrix = covariance.estimer_covariance(rendements, estimateur)
     num_assets = len(annual_returns)
 
     # Nombre de portefeuilles à simuler
     num_portfolios = 100
 
-    # Fonction d'objectif : Minimiser la variance
-    def portfolio_volatility(weights):
-        return np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-
-    # Contraintes
-    def portfolio_return(weights):
-        return np.dot(weights, annual_returns)
-
-    constraints = [{'type': 'eq', 'fun': lambda weights: np.sum(weights) - 1}]  # Somme des poids = 1
     bounds = [(0, 1) for _ in range(num_assets)] if contraintes else [(-1, 1) for _ in range(num_assets)]
 
-    # Initialisation des variables pour la frontière efficiente
-    target_returns = np.linspace(annual_returns.min(), annual_returns.max(), num_portfolios)
-    efficient_vols = []
-    efficient_rets = []
-
-    # Boucle pour calculer la frontière efficiente
-    for target in target_returns:
-        # Contrainte supplémentaire pour atteindre un rendement cible
-        target_constraint = {'type': 'ineq', 'fun': lambda weights: portfolio_return(weights) - target}
-        constraints_with_target = constraints + [target_constraint]
-
-        # Minimisation de la volatilité
-        result = minimize(
-            portfolio_volatility,
-            x0=np.ones(num_assets) / num_assets,  # Poids initiaux égaux
-            constraints=constraints_with_target,
-            bounds=bounds,
-            method='SLSQP'
-        )
-
-        if result.success:
-            efficient_vols.append(result.fun)  # Volatilité minimale
-            efficient_rets.append(target)  # Rendement cible
-
-    # Calcul de la tangente (portefeuille de marché)
-    sharpe_ratios = [(ret - risk_free_rate) / vol for ret, vol in zip(efficient_rets, efficient_vols)]
-    max_sharpe_idx = np.argmax(sharpe_ratios)
-    market_portfolio_return = efficient_rets[max_sharpe_idx]
-    market_portfolio_volatility = efficient_vols[max_sharpe_idx]
-
-    # Création d'un DataFrame avec les poids du portefeuille de marché
-    market_target_constraint = {'type': 'eq', 'fun': lambda weights: portfolio_return(weights) - market_portfolio_return}
-
-    constraints_with_market_target = constraints + [market_target_constraint]
-
-    result = minimize(
-        portfolio_volatility,
-        x0=np.ones(num_assets) / num_assets,  # Poids initiaux égaux
-        constraints=constraints_with_market_target,
-        bounds=bounds,
-        method='SLSQP'
-    )
-
-    if result.success:
-        market_weights = result.x  # Pondérations du portefeuille de marché
+    if methode not in ('exacte', 'numerique', 'reechantillonnee'):
+        raise ValueError("Le paramètre 'methode' doit valoir 'exacte', 'numerique' ou 'reechantillonnee'.")
+
+    # Calcul direct du portefeuille de marché (portefeuille tangent), sans échantillonner la frontière
+    portefeuille_marche = None
+    if methode != 'reechantillonnee':
+        with profilage.etape('portefeuille_marche'):
+            try:
+                portefeuille_marche = frontiere.portefeuille_tangent(annual_returns, cov_matrix, risk_free_rate, bounds)
+            except ValueError:
+                portefeuille_marche = None
+
+    # Calcul de la frontière efficiente : solution exacte si possible, sinon minimisation de la variance
+    # avec gradients analytiques, chaque rendement cible repartant de la solution précédente.
+    # Avec ventes à découvert, le rendement du portefeuille tangent peut dépasser le plus grand rendement
+    # des actifs : la frontière est alors prolongée jusqu'à lui, afin qu'il soit tracé sur la courbe.
+    rendement_max = annual_returns.max()
+    if portefeuille_marche is not None:
+        rendement_max = max(rendement_max, portefeuille_marche[1])
+    target_returns = np.linspace(annual_returns.min(), rendement_max, num_portfolios)
+    frontiere_efficiente = None
+    with profilage.etape('frontiere', methode=methode, contraintes=contraintes) as etape:
+        if methode == 'reechantillonnee':
+            frontiere_efficiente = reechantillonnage.frontiere_reechantillonnee(
+                rendements, risk_free_rate, bounds, nb_echantillons, num_portfolios, n_jobs=n_jobs,
+                estimateur=estimateur
+            ).frontiere
+        elif methode == 'exacte':
+            try:
+                frontiere_efficiente = frontiere.frontiere_exacte(annual_returns, cov_matrix, bounds, target_returns)
+            except ValueError:
+                frontiere_efficiente = None
+        if frontiere_efficiente is None:
+            etape.definir(repli='numerique')
+            frontiere_efficiente = frontiere.frontiere_numerique(annual_returns, cov_matrix, bounds, target_returns)
+        etape.compter('points', len(frontiere_efficiente.rendements))
+    efficient_vols = frontiere_efficiente.volatilites
+    efficient_rets = frontiere_efficiente.rendements
+
+    # Portefeuille de marché : s'il n'existe pas (taux sans risque trop élevé), on retient le point de Sharpe
+    # maximal de la frontière, de même pour la frontière rééchantillonnée dont les portefeuilles moyens
+    # ne sont pas sur la frontière d'origine.
+    if portefeuille_marche is not None:
+        market_weights, market_portfolio_return, market_portfolio_volatility = portefeuille_marche
     else:
-        raise ValueError("La minimisation des poids pour le portefeuille de marché a échoué.")
+        sharpe_ratios = (efficient_rets - risk_free_rate) / efficient_vols
+        max_sharpe_idx = np.argmax(sharpe_ratios)
+        market_portfolio_return = efficient_rets[max_sharpe_idx]
+        market_portfolio_volatility = efficient_vols[max_sharpe_idx]
+        market_weights = frontiere_efficiente.poids[max_sharpe_idx]
 
     market_weights_df = pd.DataFrame({
         'Actif': rendements.columns,
         'Poids': market_weights
     })
 
+    if contraintes:
+        titre = "Frontière Efficiente de Markowitz et Ligne de Marché des Capitaux (sans short)"
+    else: 
+        titre = "Frontière Efficiente de Markowitz et Ligne de Marché des Capitaux (avec short)"
+
+    if not tracer:
+        return None, market_weights_df
+
+    # Nuage de portefeuilles aléatoires, évalués en une passe vectorisée
+    nuage = None
+    if nb_aleatoires > 0:
+        with profilage.etape('nuage', portefeuilles=nb_aleatoires):
+            poids_aleatoires = frontiere.portefeuilles_aleatoires(nb_aleatoires, bounds, graine=42)
+            nuage = frontiere.evaluer_portefeuilles(poids_aleatoires, annual_returns, cov_matrix, risk_free_rate)
+
+    with profilage.etape('trace'):
+        fig = tracer_frontiere(efficient_vols, efficient_rets, market_portfolio_volatility, market_portfolio_return,
+                               risk_free_rate, titre, nuage=nuage)
+    return fig, market_weights_df
+
+def tracer_frontiere(efficient_vols, efficient_rets, market_portfolio_volatility, market_portfolio_return,
+                     risk_free_rate, titre, ax=None, nuage=None):
+    """
+    Trace une frontière efficiente, son portefeuille de marché et la ligne de marché des capitaux.
+
+    Args:
+        efficient_vols (np.ndarray): Volatilités des points de la frontière.
+        efficient_rets (np.ndarray): Rendements des points de la frontière.
+        market_portfolio_volatility (float): Volatilité du portefeuille de marché.
+        market_portfolio_return (float): Rendement du portefeuille de marché.
+        risk_free_rate (float): Le taux sans risque.
+        titre (str): Le titre du graphique.
+        ax (matplotlib.axes.Axes): Axes sur lesquels tracer (par défaut, une nouvelle figure), par exemple
+                                   pour comparer plusieurs configurations dans une grille.
+        nuage (tuple): (rendements, volatilités, ratios de Sharpe) de portefeuilles à tracer en arrière-plan,
+                       tels que retournés par frontiere.evaluer_portefeuilles.
+
+    Returns:
+        fig (matplotlib.figure.Figure): La figure contenant le graphique.
+    """
     # Création de la figure
-    fig, ax = plt.subplots(figsize=(10, 6))
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    else:
+        fig = ax.figure
+
+    # Nuage de portefeuilles en arrière-plan, coloré par ratio de Sharpe
+    if nuage is not None:
+        nuage_rets, nuage_vols, nuage_sharpe = nuage
+        ax.scatter(nuage_vols, nuage_rets, c=nuage_sharpe, cmap="viridis", s=2, alpha=0.3,
+                   rasterized=True, zorder=0, label="Portefeuilles aléatoires")
 
     # Affichage de la frontière efficiente
     ax.plot(efficient_vols, efficient_rets, label="Frontière Efficiente", color="blue")
     ax.scatter(market_portfolio_volatility, market_portfolio_return, color="red", label="Portefeuille de Marché", zorder=5)
 
-    # Ajout de la CML
-    cml_x = np.linspace(0, max(efficient_vols), 100)
+    # Ajout de la CML, prolongée au moins jusqu'au portefeuille de marché
+    vol_max = max(np.max(efficient_vols), market_portfolio_volatility)
+    cml_x = np.linspace(0, vol_max, 100)
     cml_y = risk_free_rate + cml_x * (market_portfolio_return - risk_free_rate) / market_portfolio_volatility
     ax.plot(cml_x, cml_y, label="Ligne de Marché des Capitaux (CML)", color="red", linestyle="--")
 
@@ -224,13 +323,13 @@ def calculate_efficient_frontier(rendements, risk_free_rate, contraintes=True):
     ax.set_xlabel("Volatilité (Risque)")
     ax.set_ylabel("Rendement")
     ax.legend()
-    
-    if contraintes:
-        ax.set_title("Frontière Efficiente de Markowitz et Ligne de Marché des Capitaux (sans short)")  
-    else: 
-        ax.set_title("Frontière Efficiente de Markowitz et Ligne de Marché des Capitaux (avec short)")
+    ax.set_title(titre)
 
-    ax.set_xlim(0, 0.3)
-    ax.set_ylim(0, 0.6)
+    # Limites des axes déduites de la frontière, du portefeuille de marché et de la CML (le nuage peut déborder)
+    rend_min = min(np.min(efficient_rets), market_portfolio_return, risk_free_rate, 0.0)
+    rend_max = max(np.max(efficient_rets), market_portfolio_return, cml_y[-1])
+    marge = 0.05 * (rend_max - rend_min)
+    ax.set_xlim(0, 1.05 * vol_max)
+    ax.set_ylim(rend_min - marge if rend_min < 0 else 0, rend_max + marge)
 
-    return fig, market_weights_df
\ No newline at end of file
+    return fig
@@ -0,0 +1,166 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+import covariance
+import frontiere
+
+@dataclass
+class FrontiereReechantillonnee:
+    """
+    Frontière rééchantillonnée de Michaud.
+
+    Attributes:
+        frontiere (frontiere.Frontiere): Les portefeuilles moyens par rang, évalués avec les estimations d'origine.
+        nb_echantillons (int): Le nombre d'échantillons dont la frontière a pu être calculée.
+        dispersion (np.ndarray): Écart-type des poids de chaque rang entre les échantillons (rangs x actifs).
+    """
+    frontiere: frontiere.Frontiere
+    nb_echantillons: int
+    dispersion: np.ndarray
+
+def tirer_echantillons(valeurs, nb_echantillons, rng, methode='bootstrap'):
+    """
+    Tire en un seul tenseur des historiques de rendements simulés, de même longueur que l'original.
+
+    Args:
+        valeurs (np.ndarray): Matrice (mois x actifs) des rendements mensuels.
+        nb_echantillons (int): Nombre d'historiques à tirer.
+        rng (np.random.Generator): Le générateur aléatoire.
+        methode (str): 'bootstrap' (tirage des mois avec remise) ou 'parametrique' (loi normale de mêmes moments).
+
+    Returns:
+        np.ndarray: Tenseur (échantillons x mois x actifs).
+    """
+    nb_mois, num_assets = valeurs.shape
+    if methode == 'bootstrap':
+        return valeurs[rng.integers(0, nb_mois, size=(nb_echantillons, nb_mois))]
+    if methode == 'parametrique':
+        # Racine carrée de la covariance par décomposition spectrale (robuste aux matrices singulières)
+        valeurs_propres, vecteurs = np.linalg.eigh(np.cov(valeurs, rowvar=False))
+        racine = vecteurs * np.sqrt(np.maximum(valeurs_propres, 0.0))
+        return valeurs.mean(axis=0) + rng.standard_normal((nb_echantillons, nb_mois, num_assets)) @ racine.T
+    raise ValueError("Le paramètre 'methode' doit valoir 'bootstrap' ou 'parametrique'.")
+
+def estimations_echantillons(echantillons, taux_actualisation):
+    """
+    Rendements annuels actualisés et covariances annualisées de tous les échantillons à la fois,
+    selon les mêmes formules que calcul_rendements_annuels_actualises et rendements.cov() * 12.
+
+    Returns:
+        tuple: (rendements (échantillons x actifs), covariances (échantillons x actifs x actifs)).
+    """
+    nb_mois = echantillons.shape[1]
+    facteurs = (1 + taux_actualisation) ** (-np.arange(1, nb_mois + 1) / 12)
+    rendements = (1 + np.einsum('t,stn->sn', facteurs, echantillons) / nb_mois) ** 12 - 1
+    ecarts = echantillons - echantillons.mean(axis=1, keepdims=True)
+    covariances = np.einsum('stn,stm->snm', ecarts, ecarts) / (nb_mois - 1) * 12
+    return rendements, covariances
+
+def frontiere_par_rangs(annual_returns, cov_matrix, bounds, num_portfolios):
+    """
+    Frontière efficiente à num_portfolios rangs équidistants en rendement, du portefeuille de variance
+    minimale au portefeuille de rendement maximal, afin que les rangs de différents échantillons soient comparables.
+
+    Les portefeuilles critiques sont calculés une seule fois par l'algorithme de la ligne critique ;
+    en cas d'échec, la frontière est obtenue par optimisation numérique.
+
+    Returns:
+        np.ndarray: Matrice (rangs x actifs) des poids, ou None si la frontière n'a pas pu être calculée.
+    """
+    try:
+        points = frontiere.points_critiques(annual_returns, cov_matrix, bounds)
+        cibles = np.linspace(points[-1] @ annual_returns, points[0] @ annual_returns, num_portfolios)
+        resultat = frontiere.frontiere_cla(annual_returns, cov_matrix, bounds, cibles, points=points)
+    except (ValueError, np.linalg.LinAlgError):
+        variance_minimale = frontiere.frontiere_numerique(annual_returns, cov_matrix, bounds, [annual_returns.min()])
+        if len(variance_minimale.poids) == 0:
+            return None
+        cibles = np.linspace(variance_minimale.poids[0] @ annual_returns, annual_returns.max(), num_portfolios)
+        resultat = frontiere.frontiere_numerique(annual_returns, cov_matrix, bounds, cibles)
+    return resultat.poids if len(resultat.poids) == num_portfolios else None
+
+# Données en lecture seule des processus de calcul, transmises une seule fois à leur démarrage
+_DONNEES_PARTAGEES = {}
+
+def _initialiser_processus(donnees):
+    global _DONNEES_PARTAGEES
+    _DONNEES_PARTAGEES = donnees
+
+def _resoudre_bloc(graine, nb_echantillons):
+    """
+    Tire un bloc d'échantillons avec sa propre graine et retourne la somme des poids par rang,
+    la somme de leurs carrés et le nombre de frontières calculées.
+    """
+    d = _DONNEES_PARTAGEES
+    echantillons = tirer_echantillons(d['valeurs'], nb_echantillons, np.random.default_rng(graine), d['methode'])
+    rendements, covariances = estimations_echantillons(echantillons, d['taux'])
+    if d['estimateur'] != 'echantillon':
+        # Les covariances empiriques du tenseur sont remplacées par celles de l'estimateur, historique par historique
+        covariances = [covariance.estimer_covariance(pd.DataFrame(echantillon, columns=d['colonnes']), d['estimateur'])
+                       for echantillon in echantillons]
+    somme = np.zeros((d['num_portfolios'], d['valeurs'].shape[1]))
+    somme_carres = np.zeros_like(somme)
+    nb = 0
+    for annual_returns, cov_matrix in zip(rendements, covariances):
+        poids = frontiere_par_rangs(annual_returns, cov_matrix, d['bounds'], d['num_portfolios'])
+        if poids is not None:
+            somme += poids
+            somme_carres += poids ** 2
+            nb += 1
+    return somme, somme_carres, nb
+
+def frontiere_reechantillonnee(rendements, risk_free_rate, bounds, nb_echantillons=2000, num_portfolios=100,
+                               methode='bootstrap', graine=42, n_jobs=None, taille_bloc=50, estimateur='echantillon'):
+    """
+    Frontière rééchantillonnée de Michaud : les frontières d'un grand nombre d'historiques simulés sont
+    calculées puis leurs poids sont moyennés rang par rang, ce qui lisse l'effet des erreurs d'estimation.
+
+    Les échantillons sont tirés par blocs (tenseurs NumPy) ; chaque bloc reçoit une graine dérivée de
+    `graine` (np.random.SeedSequence), si bien que le résultat est identique quel que soit n_jobs.
+
+    Args:
+        rendements (pd.DataFrame): Les rendements mensuels des actifs.
+        risk_free_rate (float): Le taux sans risque (taux d'actualisation des rendements moyens).
+        bounds (list): Bornes (min, max) des poids de chaque actif.
+        nb_echantillons (int): Nombre d'historiques simulés.
+        num_portfolios (int): Nombre de rangs de la frontière.
+        methode (str): 'bootstrap' ou 'parametrique'.
+        graine (int): Graine du générateur aléatoire.
+        n_jobs (int): Nombre de processus (None pour tout calculer dans le processus courant).
+        taille_bloc (int): Nombre d'échantillons tirés et résolus par tâche.
+        estimateur: L'estimateur de covariance appliqué à chaque historique simulé et à l'historique d'origine
+            (voir covariance.ESTIMATEURS), ou une fonction rendements -> covariance, qui doit pouvoir être
+            transmise aux processus si n_jobs > 1. La covariance empirique est calculée pour tous les
+            échantillons à la fois.
+
+    Returns:
+        FrontiereReechantillonnee: La frontière des portefeuilles moyens, évaluée avec les estimations d'origine.
+    """
+    if isinstance(estimateur, str) and estimateur not in covariance.ESTIMATEURS:
+        raise ValueError(f"Estimateur de covariance inconnu : {estimateur}. Valeurs possibles : {list(covariance.ESTIMATEURS)}")
+    valeurs = rendements.to_numpy(dtype=float)
+    donnees = {'valeurs': valeurs, 'taux': risk_free_rate, 'bounds': bounds, 'num_portfolios': num_portfolios,
+               'methode': methode, 'estimateur': estimateur, 'colonnes': list(rendements.columns)}
+    tailles = [min(taille_bloc, nb_echantillons - debut) for debut in range(0, nb_echantillons, taille_bloc)]
+    graines = np.random.SeedSequence(graine).spawn(len(tailles))
+
+    if n_jobs is not None and n_jobs > 1 and len(tailles) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_initialiser_processus, initargs=(donnees,)) as executor:
+            blocs = list(executor.map(_resoudre_bloc, graines, tailles))
+    else:
+        _initialiser_processus(donnees)
+        blocs = [_resoudre_bloc(g, n) for g, n in zip(graines, tailles)]
+
+    nb = sum(b[2] for b in blocs)
+    if nb == 0:
+        raise ValueError("Aucune frontière n'a pu être calculée sur les échantillons tirés.")
+    poids = sum(b[0] for b in blocs) / nb
+    dispersion = np.sqrt(np.maximum(sum(b[1] for b in blocs) / nb - poids ** 2, 0.0))
+
+    # Évaluation des portefeuilles moyens avec les estimations d'origine
+    annual_returns, _ = estimations_echantillons(valeurs[None], risk_free_rate)
+    cov_matrix = covariance.estimer_covariance(rendements, estimateur)
+    rendements_frontiere = poids @ annual_returns[0]
+    volatilites = np.sqrt(np.maximum(np.einsum('ij,ji->i', poids, cov_matrix @ poids.T), 0.0))
+    return FrontiereReechantillonnee(frontiere.Frontiere(rendements_frontiere, volatilites, poids), nb, dispersion)
@@ -0,0 +1,19 @@
+import os
+import sys
+import streamlit as st
+
+# Application multipage : les deux applications sont des pages d'un même serveur Streamlit, et partagent
+# donc les modules importés, le magasin de données et les caches (ATV, prix, rendus) d'un même processus
+RACINE = os.path.dirname(os.path.abspath(__file__))
+for dossier in ('Liquidity', 'Markowitz'):
+    chemin = os.path.join(RACINE, dossier)
+    if chemin not in sys.path:
+        sys.path.append(chemin)
+
+pages = [
+    st.Page(os.path.join(RACINE, 'Markowitz', 'markowitz_app.py'), title="Allocation d'actifs (Markowitz)",
+            url_path='markowitz', default=True),
+    st.Page(os.path.join(RACINE, 'Liquidity', 'liquidity_management_app.py'), title="Gestion de la liquidité",
+            url_path='liquidite'),
+]
+st.navigation(pages).run()
@@ -0,0 +1,249 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([RACINE, os.path.join(RACINE, 'Liquidity'), os.path.join(RACINE, 'Markowitz')])
+from common import rendu
+import atv_index
+import data_store
+import liquidity_management
+import markowitz
+import generateurs
+
+# Tailles des entrées par échelle :
+# - panels : (nombre de tickers, nombre d'années) des panels de marché (calculer_atv, pretraitement) ;
+# - horizons : (nombre d'actifs, délai de liquidation en jours) des portefeuilles (échéanciers et graphiques) ;
+# - markowitz : (nombre d'actifs, nombre d'années de rendements mensuels) des frontières efficientes.
+ECHELLES = {
+    'rapide': {
+        'panels': [(10, 1)],
+        'horizons': [(10, 10)],
+        'markowitz': [(10, 5)],
+    },
+    'standard': {
+        'panels': [(10, 1), (100, 10), (1000, 1)],
+        'horizons': [(10, 1), (100, 100), (1000, 1000)],
+        'markowitz': [(10, 5), (100, 20), (300, 50)],
+    },
+    'complete': {
+        'panels': [(10, 1), (100, 10), (1000, 1), (100, 50), (1000, 50)],
+        'horizons': [(10, 1), (10, 1000), (100, 100), (1000, 1000)],
+        'markowitz': [(10, 5), (100, 20), (300, 50), (1000, 50)],
+    },
+}
+
+GRAPHIQUES = [
+    'plot_cumulative_liquidated_quantities',
+    'plot_poids_temps_courbe',
+    'plot_poids_temps_hist',
+    'plot_valeur_temps_courbe',
+    'plot_valeur_totale_temps_courbe',
+]
+
+def chronometrer(fonction, repetitions: int = 3, preparer=None) -> list:
+    """
+    Mesure la durée de fonction(*preparer()) sur plusieurs répétitions ; la préparation n'est pas mesurée.
+
+    :param fonction: La fonction mesurée.
+    :param repetitions: Le nombre de mesures.
+    :param preparer: Une fonction sans argument retournant les arguments de chaque appel.
+    :return: La liste des durées, en secondes.
+    """
+    durees = []
+    for _ in range(repetitions):
+        arguments = preparer() if preparer is not None else ()
+        gc.collect()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+def _resultat(etape: str, parametres: dict, durees: list) -> dict:
+    return {'etape': etape, 'parametres': parametres, 'min': min(durees),
+            'mediane': statistics.median(durees), 'repetitions': len(durees)}
+
+def cle_resultat(resultat: dict) -> str:
+    """
+    Identifie une mesure par son étape et ses paramètres, pour la comparer d'une exécution à l'autre.
+    """
+    parametres = ', '.join(f'{k}={v}' for k, v in sorted(resultat['parametres'].items()))
+    return f"{resultat['etape']}({parametres})"
+
+def mesurer_liquidite(panels: list, repetitions: int, journal=print) -> list:
+    """
+    Mesure nettoyer_donnees + calculer_atv sur des panels en mémoire, puis pretraitement sur un magasin
+    de données temporaire : à froid (panel des ATV recalculé) et à chaud (panel des ATV en cache).
+    """
+    resultats = []
+    for nb_tickers, nb_annees in panels:
+        parametres = {'tickers': nb_tickers, 'annees': nb_annees}
+        journal(f"liquidité : {parametres}")
+        univers_actifs = generateurs.univers_synthetique(nb_tickers)
+        panel = generateurs.panel_marche(nb_tickers, nb_annees * generateurs.JOURS_PAR_AN)
+        date = panel['Date'].iloc[-1]
+
+        volumes = liquidity_management.nettoyer_donnees(panel, univers_actifs)
+        resultats.append(_resultat('calculer_atv', parametres, chronometrer(
+            lambda: liquidity_management.calculer_atv(volumes, univers_actifs), repetitions)))
+
+        dossier = tempfile.mkdtemp(prefix='benchmark_magasin_')
+        try:
+            data_store.ecrire_partie(panel, dossier)
+            del panel, volumes
+
+            def a_froid():
+                atv_index._INDEX_EN_MEMOIRE.clear()
+                chemin_index = os.path.join(dossier, atv_index.FICHIER_INDEX)
+                if os.path.exists(chemin_index):
+                    os.remove(chemin_index)
+                return ()
+
+            traiter = lambda: liquidity_management.pretraitement(date, 0.2, 1.0, univers_actifs, dossier)
+            resultats.append(_resultat('pretraitement_froid', parametres, chronometrer(traiter, repetitions, a_froid)))
+            resultats.append(_resultat('pretraitement', parametres, chronometrer(traiter, repetitions)))
+        finally:
+            atv_index._INDEX_EN_MEMOIRE.clear()
+            shutil.rmtree(dossier, ignore_errors=True)
+    return resultats
+
+def mesurer_echeanciers(horizons: list, repetitions: int, journal=print) -> list:
+    """
+    Mesure les échéanciers de liquidation (avec et sans déformations) et le rendu PNG de chaque graphique.
+    """
+    resultats = []
+    for nb_actifs, horizon in horizons:
+        parametres = {'actifs': nb_actifs, 'horizon': horizon}
+        journal(f"échéanciers : {parametres}")
+        portefeuille = generateurs.portefeuille_synthetique(nb_actifs, horizon)
+        for etape in ('avec_deformations', 'sans_deformations'):
+            fonction = getattr(liquidity_management, etape)
+            resultats.append(_resultat(etape, parametres, chronometrer(lambda: fonction(portefeuille), repetitions)))
+
+        schedule = liquidity_management.avec_deformations(portefeuille)
+        for etape in GRAPHIQUES:
+            fonction = getattr(liquidity_management, etape)
+            resultats.append(_resultat(etape, parametres, chronometrer(
+                lambda: rendu.figure_en_octets(fonction(schedule)), repetitions)))
+    return resultats
+
+def mesurer_markowitz(tailles: list, repetitions: int, journal=print) -> list:
+    """
+    Mesure calculate_efficient_frontier (calcul et tracé) avec et sans contraintes de poids.
+    La covariance empirique est singulière lorsque l'historique compte moins de mois que d'actifs :
+    l'estimateur de Ledoit-Wolf est alors utilisé.
+    """
+    resultats = []
+    for nb_actifs, nb_annees in tailles:
+        estimateur = 'echantillon' if 12 * nb_annees > nb_actifs else 'ledoit_wolf'
+        rendements = generateurs.rendements_synthetiques(nb_actifs, nb_annees)
+        for contraintes in (True, False):
+            parametres = {'actifs': nb_actifs, 'annees': nb_annees, 'contraintes': contraintes, 'estimateur': estimateur}
+            journal(f"markowitz : {parametres}")
+
+            def frontiere():
+                fig, _ = markowitz.calculate_efficient_frontier(rendements, 0.02, contraintes=contraintes,
+                                                                estimateur=estimateur)
+                rendu.figure_en_octets(fig)
+
+            resultats.append(_resultat('calculate_efficient_frontier', parametres,
+                                       chronometrer(frontiere, repetitions)))
+    return resultats
+
+def executer(echelle: str = 'rapide', repetitions: int = 3, etapes: tuple = ('liquidite', 'echeanciers', 'markowitz'),
+             journal=print) -> dict:
+    """
+    Exécute les mesures d'une échelle et retourne le rapport (métadonnées et résultats).
+    """
+    tailles = ECHELLES[echelle]
+    resultats = []
+    if 'liquidite' in etapes:
+        resultats += mesurer_liquidite(tailles['panels'], repetitions, journal)
+    if 'echeanciers' in etapes:
+        resultats += mesurer_echeanciers(tailles['horizons'], repetitions, journal)
+    if 'markowitz' in etapes:
+        resultats += mesurer_markowitz(tailles['markowitz'], repetitions, journal)
+    return {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'echelle': echelle,
+            'repetitions': repetitions,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.platform(),
+            'processeurs': os.cpu_count(),
+        },
+        'resultats': resultats,
+    }
+
+def comparer(rapport: dict, reference: dict, seuil: float = 1.25, marge: float = 0.005) -> list:
+    """
+    Compare les durées minimales d'un rapport à celles d'un rapport de référence.
+
+    :param rapport: Le rapport courant (voir executer).
+    :param reference: Le rapport de référence.
+    :param seuil: Le rapport de durées au-delà duquel une mesure est une régression.
+    :param marge: L'écart absolu minimal (en secondes) pour signaler une régression, afin d'ignorer le bruit
+                  des mesures très courtes.
+    :return: La liste des comparaisons (clé, durée de référence, durée courante, rapport, régression).
+    """
+    references = {cle_resultat(r): r['min'] for r in reference['resultats']}
+    comparaisons = []
+    for resultat in rapport['resultats']:
+        cle = cle_resultat(resultat)
+        if cle not in references:
+            continue
+        avant, apres = references[cle], resultat['min']
+        rapport_durees = apres / avant if avant > 0 else float('inf')
+        regression = rapport_durees > seuil and apres - avant > marge
+        comparaisons.append((cle, avant, apres, rapport_durees, regression))
+    return comparaisons
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Mesure hors ligne des étapes coûteuses des modules Liquidity et Markowitz sur des données synthétiques.")
+    parser.add_argument('--echelle', choices=list(ECHELLES), default='rapide', help="Tailles des entrées mesurées.")
+    parser.add_argument('--repetitions', type=int, default=3, help="Nombre de mesures par étape (la durée minimale est retenue).")
+    parser.add_argument('--etapes', nargs='+', choices=['liquidite', 'echeanciers', 'markowitz'],
+                        default=['liquidite', 'echeanciers', 'markowitz'], help="Groupes d'étapes mesurés.")
+    parser.add_argument('--sortie', default=None, help="Fichier JSON des résultats (par défaut, benchmarks/resultats/<date>.json).")
+    parser.add_argument('--reference', default=None, help="Fichier JSON d'une exécution précédente à comparer.")
+    parser.add_argument('--seuil', type=float, default=1.25, help="Rapport de durées signalé comme régression.")
+    args = parser.parse_args(arguments)
+
+    rapport = executer(args.echelle, args.repetitions, tuple(args.etapes))
+    sortie = args.sortie or os.path.join(RACINE, 'benchmarks', 'resultats',
+                                         f"{datetime.now():%Y%m%d-%H%M%S}-{args.echelle}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+
+    for resultat in rapport['resultats']:
+        print(f"{cle_resultat(resultat):<90} {resultat['min'] * 1000:>10.1f} ms")
+    print(f"Résultats enregistrés dans {sortie}")
+
+    if args.reference is None:
+        return 0
+    with open(args.reference, encoding='utf-8') as f:
+        comparaisons = comparer(rapport, json.load(f), args.seuil)
+    regressions = [c for c in comparaisons if c[4]]
+    for cle, avant, apres, rapport_durees, regression in comparaisons:
+        print(f"{'RÉGRESSION ' if regression else ''}{cle:<90} {avant * 1000:>10.1f} -> {apres * 1000:>10.1f} ms (x{rapport_durees:.2f})")
+    print(f"{len(regressions)} régression(s) sur {len(comparaisons)} mesure(s) comparée(s).")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
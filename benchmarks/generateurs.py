@@ -0,0 +1,98 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([RACINE, os.path.join(RACINE, 'Liquidity')])
+from common import univers
+import liquidity_management
+
+JOURS_PAR_AN = 252
+
+def univers_synthetique(nb_tickers: int, nom: str = 'synthetique') -> univers.Univers:
+    """
+    Retourne un univers de nb_tickers tickers fictifs ("T0000.PA" -> "Société 0000").
+    """
+    return univers.Univers(nom, {f'T{i:04d}.PA': f'Société {i:04d}' for i in range(nb_tickers)})
+
+def panel_marche(nb_tickers: int, nb_jours: int, graine: int = 0, debut: str = '2000-01-03',
+                 taux_manquants: float = 0.0) -> pd.DataFrame:
+    """
+    Génère un panel de marché au format de data.xlsx : une colonne 'Date' (jours ouvrés) puis, pour chaque
+    ticker, les colonnes "<ticker>_Close", "_High", "_Low", "_Open" (prix à deux décimales, marche aléatoire
+    géométrique) et "_Volume" (volumes entiers log-normaux). Le panel ne dépend que de ses paramètres.
+
+    :param nb_tickers: Le nombre de tickers (voir univers_synthetique).
+    :param nb_jours: Le nombre de séances.
+    :param graine: La graine du générateur aléatoire.
+    :param debut: La première séance.
+    :param taux_manquants: La proportion de séances sans données (NaN) pour chaque ticker.
+    :return: Le panel au format large.
+    """
+    rng = np.random.default_rng(graine)
+    tickers = univers_synthetique(nb_tickers).tickers
+    forme = (nb_jours, nb_tickers)
+
+    prix_initiaux = rng.uniform(10, 500, nb_tickers)
+    close = prix_initiaux * np.exp(np.cumsum(rng.normal(0.0002, 0.02, forme), axis=0))
+    ouverture = close * np.exp(rng.normal(0, 0.005, forme))
+    haut = np.maximum(close, ouverture) * (1 + np.abs(rng.normal(0, 0.01, forme)))
+    bas = np.minimum(close, ouverture) * (1 - np.abs(rng.normal(0, 0.01, forme)))
+    volumes = np.floor(np.exp(rng.normal(np.log(rng.uniform(1e5, 5e6, nb_tickers)), 0.4, forme)))
+
+    champs = {'Close': close, 'High': haut, 'Low': bas, 'Open': ouverture, 'Volume': volumes}
+    manquants = rng.random(forme) < taux_manquants if taux_manquants else None
+    colonnes = {'Date': pd.bdate_range(debut, periods=nb_jours)}
+    for j, ticker in enumerate(tickers):
+        for champ, valeurs in champs.items():
+            colonne = valeurs[:, j] if champ == 'Volume' else np.round(valeurs[:, j], 2)
+            if manquants is not None:
+                colonne = np.where(manquants[:, j], np.nan, colonne)
+            colonnes[f'{ticker}_{champ}'] = colonne
+    return pd.DataFrame(colonnes)
+
+def rendements_synthetiques(nb_actifs: int, nb_annees: int, graine: int = 0, nb_facteurs: int = 3) -> pd.DataFrame:
+    """
+    Génère des rendements mensuels au format de markowitz.extract_rendements : une colonne par actif,
+    un index entier, sans valeur manquante. Les rendements suivent un modèle à nb_facteurs facteurs
+    plus un bruit spécifique, ce qui donne des corrélations réalistes entre actifs.
+
+    :param nb_actifs: Le nombre d'actifs.
+    :param nb_annees: Le nombre d'années d'historique (12 rendements par an).
+    :param graine: La graine du générateur aléatoire.
+    :param nb_facteurs: Le nombre de facteurs communs.
+    :return: Le DataFrame des rendements mensuels.
+    """
+    rng = np.random.default_rng(graine)
+    nb_mois = 12 * nb_annees
+    facteurs = rng.normal(0.005, 0.03, (nb_mois, nb_facteurs))
+    chargements = rng.normal(0.8, 0.4, (nb_facteurs, nb_actifs)) / np.sqrt(nb_facteurs)
+    specifiques = rng.normal(0, rng.uniform(0.02, 0.08, nb_actifs), (nb_mois, nb_actifs))
+    derives = rng.normal(0.003, 0.004, nb_actifs)
+    return pd.DataFrame(facteurs @ chargements + specifiques + derives,
+                        columns=[f'Actif {i:04d}' for i in range(nb_actifs)])
+
+def portefeuille_synthetique(nb_actifs: int, horizon: int, graine: int = 0) -> pd.DataFrame:
+    """
+    Génère un portefeuille au format de liquidity_management.pretraitement dont le délai de liquidation
+    maximal vaut exactement horizon jours (les délais des actifs sont tirés entre 1 et horizon).
+
+    :param nb_actifs: Le nombre d'actifs du portefeuille.
+    :param horizon: Le délai de liquidation du portefeuille, en jours.
+    :param graine: La graine du générateur aléatoire.
+    :return: Le DataFrame du portefeuille (une ligne par actif).
+    """
+    rng = np.random.default_rng(graine)
+    delais = rng.integers(1, horizon + 1, nb_actifs)
+    delais[0] = horizon
+    liquidable = rng.integers(1_000, 100_000, nb_actifs)
+    quantites = liquidable * (delais - 1) + rng.integers(1, liquidable + 1)
+    data = pd.DataFrame({
+        'Average Traded Volume 3 mois': liquidable * 5,
+        'Quantité initiale portefeuille': quantites,
+        'Quantité liquidable 1 jour': liquidable,
+        'Délai de liquidation': np.ceil(quantites / liquidable).astype(int),
+    }, index=univers_synthetique(nb_actifs).noms)
+    prix = pd.DataFrame({'Prix': np.round(rng.uniform(5, 300, nb_actifs), 2)}, index=data.index)
+    return liquidity_management.fusionner_donnees(prix, data)
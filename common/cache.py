@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+import pandas as pd
+
+class CachePrix:
+    """
+    Cache des historiques de prix, indexé par (ticker, interval, start, end).
+
+    Le premier niveau est un cache mémoire LRU de taille bornée. Un second niveau optionnel stocke
+    les historiques sur disque (format pickle). Les deux niveaux partagent une durée de validité (TTL),
+    comptée depuis le téléchargement de l'historique. Une requête portant sur une sous-période
+    d'un historique déjà en cache est servie par découpage, sans téléchargement.
+    """
+
+    def __init__(self, taille_max: int = 256, dossier: str = None, ttl: float = 24 * 3600):
+        """
+        :param taille_max: Le nombre maximal d'historiques conservés en mémoire.
+        :param dossier: Le dossier du cache disque, ou None pour un cache uniquement en mémoire.
+        :param ttl: La durée de validité (en secondes) des historiques, en mémoire comme sur disque.
+        """
+        self.taille_max = taille_max
+        self.dossier = dossier
+        self.ttl = ttl
+        self._memoire = OrderedDict()
+        self._verrou = threading.Lock()
+        if dossier is not None:
+            os.makedirs(dossier, exist_ok=True)
+
+    @staticmethod
+    def _cle(ticker, interval, start, end) -> tuple:
+        return (ticker, interval, pd.Timestamp(start), pd.Timestamp(end))
+
+    @staticmethod
+    def _decouper(data: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        return data[(data.index >= start) & (data.index < end)]
+
+    def _fichier(self, cle: tuple) -> str:
+        ticker, interval, start, end = cle
+        nom = "__".join([quote(ticker, safe=''), interval, start.strftime('%Y%m%d'), end.strftime('%Y%m%d')])
+        return os.path.join(self.dossier, f"{nom}.pkl")
+
+    def _cles_disque(self, ticker: str, interval: str) -> list:
+        prefixe = f"{quote(ticker, safe='')}__{interval}__"
+        cles = []
+        for nom in os.listdir(self.dossier):
+            if nom.startswith(prefixe) and nom.endswith('.pkl'):
+                _, _, start, end = nom[:-4].split('__')
+                cles.append((ticker, interval, pd.Timestamp(start), pd.Timestamp(end)))
+        return cles
+
+    def _chercher_memoire(self, cle: tuple):
+        ticker, interval, start, end = cle
+        # Les historiques périmés sont retirés avant la recherche
+        limite = time.time() - self.ttl
+        perimees = [c for c, (horodatage, _) in self._memoire.items() if horodatage < limite]
+        for c in perimees:
+            del self._memoire[c]
+        if cle in self._memoire:
+            self._memoire.move_to_end(cle)
+            return self._memoire[cle][1]
+        for (t, i, s, e), (_, data) in self._memoire.items():
+            if t == ticker and i == interval and s <= start and e >= end:
+                self._memoire.move_to_end((t, i, s, e))
+                return self._decouper(data, start, end)
+        return None
+
+    def _chercher_disque(self, cle: tuple):
+        ticker, interval, start, end = cle
+        for candidate in self._cles_disque(ticker, interval):
+            _, _, s, e = candidate
+            if s <= start and e >= end:
+                fichier = self._fichier(candidate)
+                if time.time() - os.path.getmtime(fichier) > self.ttl:
+                    os.remove(fichier)
+                    continue
+                data = pd.read_pickle(fichier)
+                self._ajouter_memoire(candidate, data, os.path.getmtime(fichier))
+                return self._decouper(data, start, end)
+        return None
+
+    def _ajouter_memoire(self, cle: tuple, data: pd.DataFrame, horodatage: float = None):
+        self._memoire[cle] = (time.time() if horodatage is None else horodatage, data)
+        self._memoire.move_to_end(cle)
+        while len(self._memoire) > self.taille_max:
+            self._memoire.popitem(last=False)
+
+    def obtenir(self, ticker: str, interval: str, start, end):
+        """
+        Retourne l'historique en cache couvrant la période demandée, ou None s'il est absent.
+        """
+        cle = self._cle(ticker, interval, start, end)
+        with self._verrou:
+            data = self._chercher_memoire(cle)
+            if data is None and self.dossier is not None:
+                data = self._chercher_disque(cle)
+        return None if data is None else data.copy()
+
+    def stocker(self, ticker: str, interval: str, start, end, data: pd.DataFrame):
+        """
+        Stocke un historique en mémoire et, si un dossier est configuré, sur disque.
+        """
+        cle = self._cle(ticker, interval, start, end)
+        with self._verrou:
+            self._ajouter_memoire(cle, data.copy())
+            if self.dossier is not None:
+                data.to_pickle(self._fichier(cle))
+
+    def vider(self, disque: bool = False):
+        """
+        Vide le cache mémoire et, si disque est True, le cache disque.
+        """
+        with self._verrou:
+            self._memoire.clear()
+            if disque and self.dossier is not None:
+                for nom in os.listdir(self.dossier):
+                    if nom.endswith('.pkl'):
+                        os.remove(os.path.join(self.dossier, nom))
+
+    def __len__(self):
+        return len(self._memoire)
+
+# Cache partagé par les deux applications, configurable par variables d'environnement
+CACHE_PRIX = CachePrix(
+    taille_max=int(os.environ.get('INTERFACES_CACHE_TAILLE', 256)),
+    dossier=os.environ.get('INTERFACES_CACHE_DOSSIER'),
+    ttl=float(os.environ.get('INTERFACES_CACHE_TTL', 24 * 3600)),
+)
+
+def configurer_cache(taille_max: int = 256, dossier: str = None, ttl: float = 24 * 3600) -> CachePrix:
+    """
+    Remplace la configuration du cache partagé CACHE_PRIX (le contenu en mémoire est conservé).
+    """
+    CACHE_PRIX.taille_max = taille_max
+    CACHE_PRIX.dossier = dossier
+    CACHE_PRIX.ttl = ttl
+    if dossier is not None:
+        os.makedirs(dossier, exist_ok=True)
+    return CACHE_PRIX
@@ -0,0 +1,180 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import yfinance as yf
+
+COLONNES_OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def source_yfinance(ticker: str, start_date, end_date, interval: str = "1d") -> pd.DataFrame:
+    """
+    Télécharge l'historique d'un ticker depuis Yahoo Finance.
+    yf.Ticker.history est utilisé plutôt que yf.download, qui partage un état global entre threads.
+
+    :param ticker: Le symbole du ticker (ex: "AIR.PA").
+    :param start_date: La date de début.
+    :param end_date: La date de fin (exclue).
+    :param interval: La fréquence des barres ("1d", "1mo", ...).
+    :return: Un DataFrame indexé par 'Date' avec les colonnes Open, High, Low, Close, Volume.
+    """
+    data = yf.Ticker(ticker).history(start=start_date, end=end_date, interval=interval)
+    if data.empty:
+        return pd.DataFrame(columns=COLONNES_OHLCV)
+    data = data[[col for col in COLONNES_OHLCV if col in data.columns]]
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    data.index.name = 'Date'
+    return data
+
+def avec_reessais(fonction, *args, tentatives: int = 3, delai_initial: float = 0.5, **kwargs):
+    """
+    Appelle une fonction en la relançant en cas d'exception, avec un délai doublé à chaque essai.
+
+    :param fonction: La fonction à appeler.
+    :param tentatives: Le nombre maximal d'appels.
+    :param delai_initial: Le délai (en secondes) avant le premier nouvel essai.
+    :return: Le résultat de la fonction. La dernière exception est relevée si tous les essais échouent.
+    """
+    for essai in range(tentatives):
+        try:
+            return fonction(*args, **kwargs)
+        except Exception:
+            if essai == tentatives - 1:
+                raise
+            time.sleep(delai_initial * 2 ** essai)
+
+def telecharger(tickers: list, start_date, end_date, interval: str = "1d", source=source_yfinance,
+                max_workers: int = 8, tentatives: int = 3, delai_initial: float = 0.5, cache=None) -> dict:
+    """
+    Télécharge plusieurs tickers en parallèle avec un nombre borné de threads.
+
+    :param tickers: La liste des tickers à télécharger.
+    :param start_date: La date de début.
+    :param end_date: La date de fin (exclue).
+    :param interval: La fréquence des barres.
+    :param source: La source de données (ticker, start_date, end_date, interval) -> DataFrame,
+                   remplaçable par une source locale pour les tests.
+    :param max_workers: Le nombre maximal de téléchargements simultanés.
+    :param tentatives: Le nombre maximal d'essais par ticker.
+    :param delai_initial: Le délai (en secondes) avant le premier nouvel essai.
+    :param cache: Un CachePrix (voir common.cache) consulté avant tout téléchargement, ou None.
+                  Le cache ne distinguant pas les sources, il ne doit être partagé qu'entre appels
+                  utilisant la même source.
+    :return: Un dictionnaire ticker -> DataFrame, dans l'ordre des tickers demandés.
+             Les tickers en échec ou sans données sont omis.
+    """
+    if not tickers:
+        return {}
+
+    # Les tickers déjà en cache (y compris sur une période englobante) ne sont pas téléchargés
+    en_cache = {}
+    if cache is not None:
+        for ticker in tickers:
+            data = cache.obtenir(ticker, interval, start_date, end_date)
+            if data is not None:
+                en_cache[ticker] = data
+    a_telecharger = [ticker for ticker in tickers if ticker not in en_cache]
+
+    def telecharger_un(ticker):
+        return avec_reessais(source, ticker, start_date, end_date, interval,
+                             tentatives=tentatives, delai_initial=delai_initial)
+
+    telecharges = {}
+    if a_telecharger:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(a_telecharger))) as executor:
+            futures = {ticker: executor.submit(telecharger_un, ticker) for ticker in a_telecharger}
+            for ticker, future in futures.items():
+                try:
+                    data = future.result()
+                except Exception as e:
+                    print(f"Erreur lors du téléchargement des données pour {ticker} : {e}")
+                    continue
+                if data is None or data.empty:
+                    print(f"Aucune donnée trouvée pour le ticker {ticker} entre {start_date} et {end_date}.")
+                    continue
+                if cache is not None:
+                    cache.stocker(ticker, interval, start_date, end_date, data)
+                telecharges[ticker] = data
+
+    resultats = {}
+    for ticker in tickers:
+        if ticker in en_cache:
+            resultats[ticker] = en_cache[ticker]
+        elif ticker in telecharges:
+            resultats[ticker] = telecharges[ticker]
+    return resultats
+
+def telecharger_en_flux(tickers: list, start_date, end_date, interval: str = "1d", source=source_yfinance,
+                        max_workers: int = 4, tentatives: int = 3, delai_initial: float = 0.5):
+    """
+    Télécharge plusieurs tickers en parallèle et les restitue un par un, dans l'ordre demandé.
+    Au plus max_workers téléchargements sont en cours ou en attente de consommation, si bien que
+    la mémoire reste bornée quel que soit le nombre de tickers.
+
+    :param tickers: La liste des tickers à télécharger.
+    :param start_date: La date de début.
+    :param end_date: La date de fin (exclue).
+    :param interval: La fréquence des barres.
+    :param source: La source de données (ticker, start_date, end_date, interval) -> DataFrame.
+    :param max_workers: Le nombre maximal de téléchargements simultanés.
+    :param tentatives: Le nombre maximal d'essais par ticker.
+    :param delai_initial: Le délai (en secondes) avant le premier nouvel essai.
+    :return: Un générateur de couples (ticker, DataFrame). Les tickers en échec ou sans données sont omis.
+    """
+    tickers = iter(tickers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        en_cours = deque()
+
+        def soumettre():
+            ticker = next(tickers, None)
+            if ticker is not None:
+                en_cours.append((ticker, executor.submit(avec_reessais, source, ticker, start_date, end_date, interval,
+                                                         tentatives=tentatives, delai_initial=delai_initial)))
+
+        for _ in range(max_workers):
+            soumettre()
+        while en_cours:
+            ticker, future = en_cours.popleft()
+            soumettre()
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Erreur lors du téléchargement des données pour {ticker} : {e}")
+                continue
+            if data is None or data.empty:
+                print(f"Aucune donnée trouvée pour le ticker {ticker} entre {start_date} et {end_date}.")
+                continue
+            yield ticker, data
+
+def aligner(donnees: dict, how: str = 'inner') -> pd.DataFrame:
+    """
+    Aligne toutes les séries sur un index de dates commun en une seule passe :
+    l'index est d'abord calculé, puis chaque série est réindexée une seule fois.
+
+    :param donnees: Un dictionnaire nom -> pd.Series ou pd.DataFrame indexés par date.
+    :param how: 'inner' pour ne garder que les dates communes, 'outer' pour toutes les dates.
+    :return: Un DataFrame avec une colonne par série (ou par colonne de chaque DataFrame).
+    """
+    if how not in ('inner', 'outer'):
+        raise ValueError("Le paramètre 'how' doit valoir 'inner' ou 'outer'.")
+    if not donnees:
+        return pd.DataFrame()
+
+    index = None
+    for data in donnees.values():
+        if index is None:
+            index = data.index
+        elif how == 'inner':
+            index = index.intersection(data.index)
+        else:
+            index = index.union(data.index)
+    index = index.sort_values()
+
+    colonnes = {}
+    for nom, data in donnees.items():
+        if isinstance(data, pd.DataFrame):
+            for col in data.columns:
+                colonnes[col] = data[col].reindex(index)
+        else:
+            colonnes[nom] = data.reindex(index)
+    return pd.DataFrame(colonnes, index=index)
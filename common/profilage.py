@@ -0,0 +1,253 @@
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+
+# Profilage activé pour tout le processus : INTERFACES_PROFILAGE=1 (durées, compteurs et pic mémoire)
+# ou INTERFACES_PROFILAGE=temps (sans suivi de la mémoire, dont le coût est élevé)
+_VARIABLE = os.environ.get('INTERFACES_PROFILAGE', '').strip().lower()
+PROFILAGE_ACTIF = _VARIABLE not in ('', '0', 'false', 'non')
+MEMOIRE_PAR_DEFAUT = _VARIABLE != 'temps'
+MAX_ETAPES_PAR_DEFAUT = 1000
+
+class Etape:
+    """
+    Une étape mesurée : durée, pic mémoire (octets alloués au-delà de l'utilisation au début de l'étape),
+    compteurs (lignes traitées, itérations, échecs, ...), détails et sous-étapes.
+    """
+
+    def __init__(self, nom: str, details: dict):
+        self.nom = nom
+        self.details = details
+        self.compteurs = {}
+        self.enfants = []
+        self.duree = None
+        self.memoire_pic = None
+        self._debut = None
+        self._memoire_debut = None
+        self._pic_observe = 0
+
+    def compter(self, cle: str, n=1):
+        """
+        Ajoute n au compteur cle de l'étape.
+        """
+        self.compteurs[cle] = self.compteurs.get(cle, 0) + n
+
+    def definir(self, **details):
+        """
+        Ajoute des détails à l'étape (ex: mode de calcul retenu).
+        """
+        self.details.update(details)
+
+    def vers_dict(self) -> dict:
+        return {'nom': self.nom, 'duree': self.duree, 'memoire_pic': self.memoire_pic, 'compteurs': dict(self.compteurs),
+                'details': dict(self.details), 'enfants': [enfant.vers_dict() for enfant in self.enfants]}
+
+class _EtapeNulle:
+    """
+    Étape retournée lorsque le profilage est désactivé : toutes les opérations sont sans effet.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def compter(self, cle, n=1):
+        pass
+
+    def definir(self, **details):
+        pass
+
+_ETAPE_NULLE = _EtapeNulle()
+
+class Trace:
+    """
+    Trace structurée d'une exécution : l'arbre des étapes mesurées.
+    """
+
+    def __init__(self, memoire: bool = MEMOIRE_PAR_DEFAUT, max_etapes: int = None):
+        """
+        :param memoire: Si True, le pic mémoire de chaque étape est mesuré avec tracemalloc.
+        :param max_etapes: Le nombre maximal d'étapes de premier niveau conservées (les plus anciennes
+                           sont oubliées), None pour toutes les conserver.
+        """
+        self.memoire = memoire
+        self.etapes = deque(maxlen=max_etapes)
+        self._pile = []
+        self._utilise_tracemalloc = False
+
+    def vers_dict(self) -> list:
+        return [etape.vers_dict() for etape in self.etapes]
+
+    def vers_dataframe(self) -> pd.DataFrame:
+        """
+        Retourne la trace à plat, une ligne par étape (dans l'ordre d'exécution), avec son chemin et sa profondeur.
+        """
+        lignes = []
+
+        def parcourir(etape, chemin, profondeur):
+            chemin = f'{chemin}/{etape.nom}' if chemin else etape.nom
+            lignes.append({'Étape': chemin, 'Profondeur': profondeur,
+                           'Durée (ms)': None if etape.duree is None else etape.duree * 1000,
+                           'Pic mémoire (Mo)': None if etape.memoire_pic is None else etape.memoire_pic / 1e6,
+                           **etape.compteurs, **{f'{cle}': str(valeur) for cle, valeur in etape.details.items()}})
+            for enfant in etape.enfants:
+                parcourir(enfant, chemin, profondeur + 1)
+
+        for etape in self.etapes:
+            parcourir(etape, '', 0)
+        return pd.DataFrame(lignes)
+
+    def duree_totale(self) -> float:
+        return sum(etape.duree or 0.0 for etape in self.etapes)
+
+class _ContexteEtape:
+    def __init__(self, trace: Trace, etape: Etape):
+        self.trace = trace
+        self.etape = etape
+
+    def __enter__(self):
+        trace, etape = self.trace, self.etape
+        (trace._pile[-1].enfants if trace._pile else trace.etapes).append(etape)
+        trace._pile.append(etape)
+        if trace.memoire and tracemalloc.is_tracing():
+            etape._memoire_debut, pic = tracemalloc.get_traced_memory()
+            if len(trace._pile) > 1:
+                parent = trace._pile[-2]
+                parent._pic_observe = max(parent._pic_observe, pic)
+            tracemalloc.reset_peak()
+        etape._debut = time.perf_counter()
+        return etape
+
+    def __exit__(self, *exc):
+        trace, etape = self.trace, self.etape
+        etape.duree = time.perf_counter() - etape._debut
+        if etape._memoire_debut is not None and tracemalloc.is_tracing():
+            # reset_peak efface le pic des étapes englobantes : le pic observé avant chaque sous-étape
+            # et le pic absolu de chaque sous-étape sont remontés au parent
+            pic_absolu = max(tracemalloc.get_traced_memory()[1], etape._pic_observe)
+            etape.memoire_pic = pic_absolu - etape._memoire_debut
+            if len(trace._pile) > 1:
+                parent = trace._pile[-2]
+                parent._pic_observe = max(parent._pic_observe, pic_absolu)
+        trace._pile.pop()
+        return False
+
+_local = threading.local()
+
+# tracemalloc est global au processus : il est démarré par le premier utilisateur (trace mesurant la mémoire)
+# et arrêté par le dernier, s'il n'avait pas été démarré en dehors de ce module. Les pics mémoire des
+# traces ouvertes simultanément dans plusieurs threads incluent les allocations des autres threads.
+_verrou_tracemalloc = threading.Lock()
+_utilisateurs_tracemalloc = 0
+_tracemalloc_demarre = False
+_tracemalloc_processus = False
+
+def _acquerir_tracemalloc():
+    global _utilisateurs_tracemalloc, _tracemalloc_demarre
+    with _verrou_tracemalloc:
+        if _utilisateurs_tracemalloc == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_demarre = True
+        _utilisateurs_tracemalloc += 1
+
+def _liberer_tracemalloc():
+    global _utilisateurs_tracemalloc, _tracemalloc_demarre
+    with _verrou_tracemalloc:
+        _utilisateurs_tracemalloc -= 1
+        if _utilisateurs_tracemalloc == 0 and _tracemalloc_demarre:
+            tracemalloc.stop()
+            _tracemalloc_demarre = False
+
+def trace_courante():
+    """
+    Retourne la trace ouverte dans le thread courant (voir demarrer), la trace par défaut du thread
+    si INTERFACES_PROFILAGE est défini, ou None si le profilage est désactivé.
+    La trace par défaut est propre au thread et disparaît avec lui (Streamlit exécute chaque session dans son thread).
+    """
+    global _tracemalloc_processus
+    trace = getattr(_local, 'trace', None)
+    if trace is None and PROFILAGE_ACTIF:
+        trace = getattr(_local, 'trace_par_defaut', None)
+        if trace is None:
+            trace = _local.trace_par_defaut = Trace(max_etapes=MAX_ETAPES_PAR_DEFAUT)
+            if trace.memoire and not _tracemalloc_processus:
+                # Le profilage du processus garde tracemalloc actif : sa référence n'est jamais libérée
+                _tracemalloc_processus = True
+                _acquerir_tracemalloc()
+    return trace
+
+def demarrer(memoire: bool = MEMOIRE_PAR_DEFAUT) -> Trace:
+    """
+    Ouvre une nouvelle trace pour le thread courant (remplaçant la précédente) et la retourne.
+    Préférer profiler, qui ferme la trace même en cas d'exception.
+
+    :param memoire: Si True, le pic mémoire de chaque étape est mesuré avec tracemalloc (coût élevé).
+    """
+    precedente = getattr(_local, 'trace', None)
+    if precedente is not None and precedente._utilise_tracemalloc:
+        _liberer_tracemalloc()
+    trace = Trace(memoire)
+    if memoire:
+        _acquerir_tracemalloc()
+        trace._utilise_tracemalloc = True
+    _local.trace = trace
+    return trace
+
+def arreter() -> Trace:
+    """
+    Ferme la trace du thread courant et la retourne (None si aucune trace n'était ouverte).
+    """
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is not None and trace._utilise_tracemalloc:
+        trace._utilise_tracemalloc = False
+        _liberer_tracemalloc()
+    return trace
+
+@contextmanager
+def profiler(memoire: bool = MEMOIRE_PAR_DEFAUT):
+    """
+    Profile un bloc de code : with profiler() as trace: ...
+    """
+    trace = demarrer(memoire)
+    try:
+        yield trace
+    finally:
+        arreter()
+
+def etape(nom: str, **details):
+    """
+    Mesure une étape : with etape('charger_donnees', colonnes=10) as e: ...; e.compter('lignes', len(df)).
+    Sans trace ouverte, une étape nulle est retournée et le coût se réduit à une recherche d'attribut.
+    """
+    trace = getattr(_local, 'trace', None) or (trace_courante() if PROFILAGE_ACTIF else None)
+    if trace is None:
+        return _ETAPE_NULLE
+    return _ContexteEtape(trace, Etape(nom, details))
+
+def mesurer(nom: str = None):
+    """
+    Décorateur mesurant chaque appel d'une fonction comme une étape (par défaut, du nom de la fonction).
+    """
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            with etape(nom or fonction.__name__):
+                return fonction(*args, **kwargs)
+        return enveloppe
+    return decorateur
+
+def compter(cle: str, n=1):
+    """
+    Ajoute n au compteur cle de l'étape en cours (sans effet hors profilage ou hors étape).
+    """
+    trace = getattr(_local, 'trace', None) or (trace_courante() if PROFILAGE_ACTIF else None)
+    if trace is not None and trace._pile:
+        trace._pile[-1].compter(cle, n)
@@ -0,0 +1,156 @@
+import dataclasses
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from common import profilage
+
+def _alimenter(h, objet):
+    """
+    Ajoute à l'empreinte h le contenu d'un objet : les DataFrame, Series et tableaux NumPy sont hachés
+    par leurs valeurs, les conteneurs et objets (dataclasses, classes simples) récursivement.
+    """
+    h.update(type(objet).__qualname__.encode())
+    if isinstance(objet, (pd.DataFrame, pd.Series)):
+        h.update(repr(list(objet.columns) if isinstance(objet, pd.DataFrame) else objet.name).encode())
+        h.update(repr(list(map(str, objet.dtypes)) if isinstance(objet, pd.DataFrame) else str(objet.dtype)).encode())
+        h.update(pd.util.hash_pandas_object(objet, index=True).to_numpy().tobytes())
+    elif isinstance(objet, pd.Index):
+        h.update(pd.util.hash_pandas_object(objet).to_numpy().tobytes())
+    elif isinstance(objet, np.ndarray):
+        h.update(f'{objet.dtype}{objet.shape}'.encode())
+        if objet.dtype == object:
+            h.update(pd.util.hash_array(objet.ravel().astype(str)).tobytes())
+        else:
+            h.update(np.ascontiguousarray(objet).tobytes())
+    elif isinstance(objet, dict):
+        for cle, valeur in objet.items():
+            _alimenter(h, cle)
+            _alimenter(h, valeur)
+    elif isinstance(objet, (list, tuple)):
+        h.update(str(len(objet)).encode())
+        for valeur in objet:
+            _alimenter(h, valeur)
+    elif callable(objet) and hasattr(objet, '__qualname__'):
+        h.update(f'{objet.__module__}.{objet.__qualname__}'.encode())
+    elif dataclasses.is_dataclass(objet):
+        for champ in dataclasses.fields(objet):
+            _alimenter(h, getattr(objet, champ.name))
+    elif hasattr(objet, '__dict__'):
+        _alimenter(h, vars(objet))
+    else:
+        h.update(repr(objet).encode())
+
+def empreinte(*objets) -> str:
+    """
+    Calcule l'empreinte (SHA-1) du contenu des objets donnés, indépendante de leur identité en mémoire :
+    deux DataFrame égaux (valeurs, index, colonnes et types) ont la même empreinte.
+    """
+    h = hashlib.sha1()
+    for objet in objets:
+        _alimenter(h, objet)
+    return h.hexdigest()
+
+def figure_en_octets(fig: Figure, format: str = 'png', dpi: int = 100) -> bytes:
+    """
+    Exporte une figure en PNG ou SVG puis la ferme, même en cas d'erreur, afin que pyplot ne la conserve pas.
+
+    :param fig: La figure matplotlib.
+    :param format: Le format de sortie ('png' ou 'svg').
+    :param dpi: La résolution des images PNG.
+    :return: Le contenu du fichier image.
+    """
+    try:
+        tampon = io.BytesIO()
+        fig.savefig(tampon, format=format, dpi=dpi, bbox_inches='tight')
+        return tampon.getvalue()
+    finally:
+        plt.close(fig)
+
+class CacheRendu:
+    """
+    Cache des figures rendues, indexé par la fonction de tracé, ses arguments (par empreinte de leur contenu),
+    le format et la résolution. Seules les images (PNG ou SVG) sont conservées, avec une éviction LRU :
+    un nouveau rendu avec des données inchangées ne fait plus appel à matplotlib.
+    """
+
+    def __init__(self, taille_max: int = 64, format: str = 'png', dpi: int = 100):
+        """
+        :param taille_max: Le nombre maximal de rendus conservés.
+        :param format: Le format par défaut des images ('png' ou 'svg').
+        :param dpi: La résolution par défaut des images PNG.
+        """
+        self.taille_max = taille_max
+        self.format = format
+        self.dpi = dpi
+        self.succes = 0
+        self.echecs = 0
+        self._rendus = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def rendre(self, fonction, *args, format: str = None, dpi: int = None, **kwargs):
+        """
+        Retourne le rendu de fonction(*args, **kwargs), depuis le cache si les arguments n'ont pas changé.
+
+        La fonction retourne une figure, ou un tuple dont le premier élément est une figure (par exemple
+        calculate_efficient_frontier) : les autres éléments sont alors mis en cache avec l'image.
+
+        :param fonction: La fonction de tracé.
+        :param format: Le format de l'image (par défaut, celui du cache).
+        :param dpi: La résolution de l'image (par défaut, celle du cache).
+        :return: Les octets de l'image, ou un tuple (octets, autres éléments retournés par la fonction).
+        """
+        format = format or self.format
+        dpi = dpi or self.dpi
+        with profilage.etape('rendu', fonction=fonction.__qualname__) as etape:
+            cle = (f'{fonction.__module__}.{fonction.__qualname__}', format, dpi, empreinte(args, kwargs))
+            with self._verrou:
+                if cle in self._rendus:
+                    self._rendus.move_to_end(cle)
+                    self.succes += 1
+                    etape.definir(cache='succes')
+                    return self._rendus[cle]
+
+            etape.definir(cache='echec')
+            resultat = fonction(*args, **kwargs)
+            with profilage.etape('matplotlib', format=format):
+                if isinstance(resultat, tuple):
+                    rendu = (figure_en_octets(resultat[0], format, dpi),) + tuple(resultat[1:])
+                else:
+                    rendu = figure_en_octets(resultat, format, dpi)
+
+        with self._verrou:
+            self.echecs += 1
+            self._rendus[cle] = rendu
+            self._rendus.move_to_end(cle)
+            while len(self._rendus) > self.taille_max:
+                self._rendus.popitem(last=False)
+        return rendu
+
+    def vider(self):
+        """
+        Vide le cache.
+        """
+        with self._verrou:
+            self._rendus.clear()
+
+    def __len__(self):
+        return len(self._rendus)
+
+# Cache partagé par les deux applications, configurable par variables d'environnement
+CACHE_RENDU = CacheRendu(
+    taille_max=int(os.environ.get('INTERFACES_RENDU_TAILLE', 64)),
+    format=os.environ.get('INTERFACES_RENDU_FORMAT', 'png'),
+    dpi=int(os.environ.get('INTERFACES_RENDU_DPI', 100)),
+)
+
+def rendre(fonction, *args, **kwargs):
+    """
+    Rend une figure avec le cache partagé CACHE_RENDU (voir CacheRendu.rendre).
+    """
+    return CACHE_RENDU.rendre(fonction, *args, **kwargs)
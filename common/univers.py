@@ -0,0 +1,170 @@
+import os
+import pandas as pd
+
+class Univers:
+    """
+    Univers d'actifs : correspondance ticker -> nom affiché -> colonnes des données, avec un index
+    par dictionnaire pour des recherches en O(1).
+
+    Les listes de colonnes d'un champ (ex: tous les "<ticker>_Close") sont construites une seule fois
+    puis réutilisées, si bien que les fonctions de traitement ne parcourent plus les noms de colonnes.
+    """
+
+    def __init__(self, nom: str, actifs: dict, source: str = None):
+        """
+        :param nom: Le nom de l'univers (ex: "liquidite", "cac40").
+        :param actifs: Un dictionnaire ordonné ticker -> nom affiché.
+        :param source: Le fichier dont l'univers a été chargé, le cas échéant.
+        """
+        self.nom = nom
+        self.source = source
+        self.tickers = list(actifs)
+        self.noms = list(actifs.values())
+        if len(set(self.noms)) != len(self.noms):
+            raise ValueError(f"Les noms affichés de l'univers {nom} doivent être uniques.")
+        self.noms_par_ticker = dict(actifs)
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._tickers_par_nom = {nom_actif: ticker for ticker, nom_actif in actifs.items()}
+        self._colonnes = {}
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._positions
+
+    def position(self, ticker: str) -> int:
+        """
+        Retourne la position d'un ticker dans l'univers.
+        """
+        return self._positions[ticker]
+
+    def nom_affiche(self, ticker: str) -> str:
+        """
+        Retourne le nom affiché d'un ticker.
+        """
+        return self.noms_par_ticker[ticker]
+
+    def ticker(self, nom: str) -> str:
+        """
+        Retourne le ticker correspondant à un nom affiché.
+        """
+        return self._tickers_par_nom[nom]
+
+    def tickers_par_nom(self) -> dict:
+        """
+        Retourne le dictionnaire nom affiché -> ticker, dans l'ordre de l'univers.
+        """
+        return dict(self._tickers_par_nom)
+
+    def colonnes(self, champ: str) -> list:
+        """
+        Retourne les colonnes "<ticker>_<champ>" de tous les tickers, dans l'ordre de l'univers.
+
+        :param champ: Le champ recherché (ex: "Close", "Volume", "Volume_ATV_3M").
+        """
+        if champ not in self._colonnes:
+            self._colonnes[champ] = [f'{ticker}_{champ}' for ticker in self.tickers]
+        return self._colonnes[champ]
+
+    def colonne(self, ticker: str, champ: str) -> str:
+        """
+        Retourne la colonne d'un champ pour un ticker.
+        """
+        return self.colonnes(champ)[self._positions[ticker]]
+
+    def positions(self, colonnes: pd.Index, champ: str):
+        """
+        Retourne les positions, dans un index de colonnes, des colonnes d'un champ de tous les tickers,
+        par recherche dans la table de hachage de l'index.
+
+        :param colonnes: Les colonnes d'un DataFrame (df.columns).
+        :param champ: Le champ recherché.
+        :return: Un tableau d'entiers, un par ticker de l'univers.
+        :raises KeyError: Si des colonnes de l'univers sont absentes (une position -1 désignerait
+                          sinon la dernière colonne avec iloc).
+        """
+        attendues = self.colonnes(champ)
+        positions = pd.Index(colonnes).get_indexer(attendues)
+        if (positions < 0).any():
+            absentes = [colonne for colonne, position in zip(attendues, positions) if position < 0]
+            raise KeyError(f"Colonnes absentes des données : {absentes}")
+        return positions
+
+    def sous_univers(self, tickers: list, nom: str = None) -> 'Univers':
+        """
+        Retourne l'univers restreint aux tickers donnés, dans leur ordre.
+        """
+        return Univers(nom or self.nom, {ticker: self.noms_par_ticker[ticker] for ticker in tickers}, self.source)
+
+    @classmethod
+    def depuis_fichier(cls, chemin: str, nom: str = None) -> 'Univers':
+        """
+        Charge un univers depuis un fichier CSV à deux colonnes 'Ticker' et 'Nom'.
+
+        :param chemin: Le chemin du fichier CSV.
+        :param nom: Le nom de l'univers (par défaut, le nom du fichier).
+        """
+        df = pd.read_csv(chemin, dtype=str)
+        nom = nom or os.path.splitext(os.path.basename(chemin))[0]
+        return cls(nom, dict(zip(df['Ticker'], df['Nom'])), source=chemin)
+
+_ACTIONS_LIQUIDITE = {
+    'AIR.PA': 'Airbus',
+    'MC.PA': 'L\'Oréal',
+    'BNP.PA': 'BNP Paribas',
+    'SAN.PA': 'Sanofi',
+    'ENGI.PA': 'Engie',
+    'OR.PA': 'LVMH',
+    'DG.PA': 'Danone',
+    'HO.PA': 'TotalEnergies',
+    'VIV.PA': 'Vivendi',
+    'RI.PA': 'Roche'
+}
+
+_ACTIFS_MARKOWITZ = {
+    "^GSPC": "S&P500",
+    "^FCHI": "CAC40",
+    "^GDAXI": "DAX",
+    "^N225": "NIKKEI",
+    "^FTSE": "FTSE",
+    "EURUSD=X": "EUR/USD",
+    "GC=F": "GOLD",
+    "BTC-USD": "BITCOIN",
+    "CL=F": "PETROLE",
+    "^FVX": "US 5Y Treasury Bonds",
+    "^TNX": "US 10Y Treasury Bonds",
+    "^TYX": "US 30Y Treasury Bonds"
+}
+
+_UNIVERS = {}
+
+def enregistrer_univers(univers: Univers) -> Univers:
+    """
+    Enregistre (ou remplace) un univers dans le registre.
+    """
+    _UNIVERS[univers.nom] = univers
+    return univers
+
+def obtenir_univers(nom: str) -> Univers:
+    """
+    Retourne un univers du registre.
+
+    Un univers peut être remplacé sans modifier le code par un fichier CSV (colonnes 'Ticker' et 'Nom')
+    désigné par la variable d'environnement INTERFACES_UNIVERS_<NOM> (ex: INTERFACES_UNIVERS_LIQUIDITE).
+    """
+    chemin = os.environ.get(f'INTERFACES_UNIVERS_{nom.upper()}')
+    if chemin and (nom not in _UNIVERS or _UNIVERS[nom].source != chemin):
+        enregistrer_univers(Univers.depuis_fichier(chemin, nom))
+    if nom not in _UNIVERS:
+        raise KeyError(f"Univers inconnu : {nom}. Univers disponibles : {list(_UNIVERS)}")
+    return _UNIVERS[nom]
+
+# Univers par défaut : les actions du portefeuille de liquidité, les actions suivies avec l'indice
+# CAC 40 (téléchargement des données) et les actifs de l'application Markowitz
+enregistrer_univers(Univers('liquidite', _ACTIONS_LIQUIDITE))
+enregistrer_univers(Univers('cac40', {**_ACTIONS_LIQUIDITE, '^FCHI': 'CAC 40'}))
+enregistrer_univers(Univers('markowitz', _ACTIFS_MARKOWITZ))
@@ -1,9 +1,154 @@
+import argparse
+import os
+import signal
 import subprocess
 import sys
+import time
 
-def main():
-    process = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "Markowitz/markowitz_app.py"])
-    process = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "Liquidity/liquidity_management_app.py"])
+RACINE = os.path.dirname(os.path.abspath(__file__))
+APPLICATION = os.path.join(RACINE, 'application.py')
+sys.path.extend([RACINE, os.path.join(RACINE, 'Liquidity'), os.path.join(RACINE, 'Markowitz')])
+
+# Vue affichée à l'ouverture de la page de liquidité (premières valeurs des sélections de l'application)
+DATE_PAR_DEFAUT = '2023-01-02'
+SEUIL_ATV_PAR_DEFAUT = 0.2
+SEUIL_QUANTITE_PAR_DEFAUT = 1.0
+
+def prechauffer(journal=print) -> dict:
+    """
+    Prépare le processus avant la première connexion : importe les bibliothèques lourdes (pandas, matplotlib,
+    seaborn, scipy, yfinance), charge le magasin de données et le panel des ATV (recalculé et enregistré
+    sur disque s'il est absent ou périmé), exécute une fois le solveur de frontière efficiente et rend
+    dans le cache des rendus les graphiques de la vue par défaut de la page de liquidité.
+    Chaque étape est indépendante : un échec est signalé sans interrompre les suivantes.
+
+    :param journal: La fonction d'affichage des messages.
+    :return: La durée (en secondes) de chaque étape, None pour une étape en échec.
+    """
+    durees = {}
+
+    def executer(nom, fonction):
+        debut = time.perf_counter()
+        try:
+            fonction()
+        except Exception as erreur:
+            durees[nom] = None
+            journal(f"préchauffage : {nom} en échec ({type(erreur).__name__}: {erreur})")
+            return
+        durees[nom] = time.perf_counter() - debut
+        journal(f"préchauffage : {nom} ({durees[nom] * 1000:.0f} ms)")
+
+    def importer():
+        import matplotlib
+        matplotlib.use('Agg')
+        import liquidity_management
+        import markowitz
+        import taille_fonds
+
+    def liquidite():
+        import liquidity_management
+        from common import rendu
+        df = liquidity_management.pretraitement(DATE_PAR_DEFAUT, SEUIL_ATV_PAR_DEFAUT, SEUIL_QUANTITE_PAR_DEFAUT)
+        data = liquidity_management.avec_deformations(df)
+        for fonction in (liquidity_management.plot_cumulative_liquidated_quantities,
+                         liquidity_management.plot_poids_temps_courbe,
+                         liquidity_management.plot_poids_temps_hist,
+                         liquidity_management.plot_valeur_temps_courbe,
+                         liquidity_management.plot_valeur_totale_temps_courbe):
+            rendu.rendre(fonction, data)
+
+    def frontiere():
+        import numpy as np
+        import pandas as pd
+        import markowitz
+        from common import rendu
+        rng = np.random.default_rng(0)
+        rendements = pd.DataFrame(rng.normal(0.006, 0.05, (60, 5)), columns=[f'Actif {i}' for i in range(5)])
+        fig, _ = markowitz.calculate_efficient_frontier(rendements, 0.02)
+        rendu.figure_en_octets(fig)
+
+    executer('imports', importer)
+    executer('liquidité', liquidite)
+    executer('frontière efficiente', frontiere)
+    return durees
+
+def servir(options_streamlit: list, prechauffage: bool = True) -> int:
+    """
+    Processus serveur : préchauffe le processus, puis y démarre le serveur Streamlit de l'application
+    multipage. Les modules préchauffés et leurs caches sont ceux utilisés par les pages.
+
+    :param options_streamlit: Les options transmises à "streamlit run" (ex: ['--server.port', '8501']).
+    :param prechauffage: Si False, le serveur démarre sans préchauffage.
+    """
+    if prechauffage:
+        prechauffer()
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', APPLICATION, *options_streamlit]
+    return cli.main()
+
+def superviser(commande: list, max_redemarrages: int = 5, duree_stable: float = 300.0, journal=print) -> int:
+    """
+    Lance le processus serveur et le redémarre s'il s'arrête en erreur, avec un délai croissant
+    (1, 2, 4, ... secondes, au plus 30). Le compteur de redémarrages est remis à zéro lorsque le serveur
+    a fonctionné au moins duree_stable secondes. Les signaux d'arrêt sont transmis au serveur.
+
+    :param commande: La commande du processus serveur.
+    :param max_redemarrages: Le nombre maximal de redémarrages consécutifs.
+    :param duree_stable: La durée de fonctionnement (en secondes) au-delà de laquelle un arrêt n'est plus consécutif.
+    :param journal: La fonction d'affichage des messages.
+    :return: Le code de sortie du dernier processus serveur.
+    """
+    processus = None
+    arret = False
+
+    def arreter(signum, frame):
+        nonlocal arret
+        arret = True
+        if processus is not None and processus.poll() is None:
+            processus.send_signal(signum)
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, arreter)
+
+    redemarrages = 0
+    while True:
+        debut = time.monotonic()
+        processus = subprocess.Popen(commande)
+        code = processus.wait()
+        if arret or code == 0:
+            return code
+        if time.monotonic() - debut >= duree_stable:
+            redemarrages = 0
+        if redemarrages >= max_redemarrages:
+            journal(f"Le serveur s'est arrêté (code {code}) : abandon après {redemarrages} redémarrage(s).")
+            return code
+        delai = min(2 ** redemarrages, 30)
+        redemarrages += 1
+        journal(f"Le serveur s'est arrêté (code {code}) : redémarrage {redemarrages}/{max_redemarrages} dans {delai} s.")
+        time.sleep(delai)
+        if arret:
+            return code
+
+def main(arguments=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Lance les applications Liquidity et Markowitz comme pages d'un même serveur Streamlit supervisé.")
+    parser.add_argument('--port', type=int, default=8501, help="Port du serveur.")
+    parser.add_argument('--prechauffage', action='store_true',
+                        help="Préchauffe les données et les caches sur disque sans démarrer le serveur, puis quitte.")
+    parser.add_argument('--sans-prechauffage', action='store_true', help="Démarre le serveur sans préchauffage.")
+    parser.add_argument('--max-redemarrages', type=int, default=5, help="Nombre maximal de redémarrages consécutifs du serveur.")
+    parser.add_argument('--serveur', action='store_true', help=argparse.SUPPRESS)
+    args, options_streamlit = parser.parse_known_args(arguments)
+
+    if args.prechauffage:
+        durees = prechauffer()
+        return 1 if None in durees.values() else 0
+    if args.serveur:
+        return servir(['--server.port', str(args.port), '--server.headless', 'true', *options_streamlit],
+                      not args.sans_prechauffage)
+    commande = [sys.executable, os.path.abspath(__file__), '--serveur', '--port', str(args.port),
+                *(['--sans-prechauffage'] if args.sans_prechauffage else []), *options_streamlit]
+    return superviser(commande, args.max_redemarrages)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
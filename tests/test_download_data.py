@@ -0,0 +1,86 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([RACINE, os.path.join(RACINE, 'Liquidity')])
+import data_store
+import download_data
+
+TICKERS = ['AAA.PA', 'BBB.PA']
+
+class FournisseurLocal:
+    """
+    Fournisseur de prix local au format de extract_stock_data (colonnes préfixées par le ticker) :
+    un historique fixe par ticker, sur les jours ouvrés. Chaque appel est enregistré.
+    """
+
+    def __init__(self):
+        self.appels = []
+
+    @staticmethod
+    def historique(ticker, start, end):
+        dates = pd.bdate_range(start, end, inclusive='left', name='Date')
+        decalage = TICKERS.index(ticker) * 100 if ticker in TICKERS else 0
+        jours = (dates - pd.Timestamp('2023-01-02')).days.to_numpy()
+        return pd.DataFrame({'Close': np.round(10 + decalage + jours * 0.25, 2), 'Volume': 1000 + jours},
+                            index=dates).add_prefix(f'{ticker}_')
+
+    def __call__(self, ticker, start_date, end_date):
+        self.appels.append((ticker, pd.Timestamp(start_date), pd.Timestamp(end_date)))
+        return self.historique(ticker, start_date, end_date)
+
+@pytest.fixture
+def magasin(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_data, 'TICKERS_CAC40', TICKERS)
+    return str(tmp_path / 'data')
+
+def lire_close(dossier, tickers=TICKERS):
+    df = data_store.charger_donnees([f'{ticker}_Close' for ticker in tickers], dossier).set_index('Date')
+    return {ticker: df[f'{ticker}_Close'].dropna() for ticker in tickers}
+
+def test_premiere_execution_stocke_toute_la_periode(magasin):
+    fetch = FournisseurLocal()
+    bilan = download_data.merge_cac40_data('2023-01-02', '2023-02-01', incremental=True, fetch=fetch, dossier=magasin)
+
+    attendu = FournisseurLocal.historique(TICKERS[0], '2023-01-02', '2023-02-01')
+    assert bilan['Lignes ajoutées'].tolist() == [len(attendu)] * len(TICKERS)
+    assert sorted(fetch.appels) == [(ticker, pd.Timestamp('2023-01-02'), pd.Timestamp('2023-02-01')) for ticker in TICKERS]
+    for ticker, close in lire_close(magasin).items():
+        reference = FournisseurLocal.historique(ticker, '2023-01-02', '2023-02-01')[f'{ticker}_Close']
+        np.testing.assert_array_equal(close.index, reference.index)
+        np.testing.assert_allclose(close.to_numpy(dtype=float), reference.to_numpy(), rtol=0, atol=1e-6)
+    assert data_store.derniere_date_par_ticker(TICKERS, magasin) == {ticker: pd.Timestamp('2023-01-31') for ticker in TICKERS}
+
+def test_execution_suivante_ne_telecharge_que_les_nouvelles_dates(magasin):
+    # Le premier ticker est stocké jusqu'au 31 janvier, le second seulement jusqu'au 13
+    download_data.actualiser_cac40_data('2023-01-16', '2023-01-02', TICKERS[1:], fetch=FournisseurLocal(), dossier=magasin)
+    download_data.actualiser_cac40_data('2023-02-01', '2023-01-02', TICKERS[:1], fetch=FournisseurLocal(), dossier=magasin)
+
+    fetch = FournisseurLocal()
+    bilan = download_data.merge_cac40_data('2023-01-02', '2023-02-15', incremental=True, fetch=fetch, dossier=magasin)
+
+    # Chaque ticker reprend au lendemain de sa propre dernière date stockée
+    debuts = {ticker: debut for ticker, debut, _ in fetch.appels}
+    assert debuts == {'AAA.PA': pd.Timestamp('2023-02-01'), 'BBB.PA': pd.Timestamp('2023-01-14')}
+    assert all(fin == pd.Timestamp('2023-02-15') for _, _, fin in fetch.appels)
+    lignes = dict(zip(bilan['Ticker'], bilan['Lignes ajoutées']))
+    assert lignes == {'AAA.PA': len(pd.bdate_range('2023-02-01', '2023-02-14')),
+                      'BBB.PA': len(pd.bdate_range('2023-01-16', '2023-02-14'))}
+
+    # Le magasin contient l'historique complet, sans doublon
+    for ticker, close in lire_close(magasin).items():
+        reference = FournisseurLocal.historique(ticker, '2023-01-02', '2023-02-15')[f'{ticker}_Close']
+        np.testing.assert_array_equal(close.index, reference.index)
+        np.testing.assert_allclose(close.to_numpy(dtype=float), reference.to_numpy(), rtol=0, atol=1e-6)
+
+def test_relance_avec_la_meme_date_de_fin_n_ajoute_rien(magasin):
+    download_data.merge_cac40_data('2023-01-02', '2023-02-01', incremental=True, fetch=FournisseurLocal(), dossier=magasin)
+    parties = data_store.lister_parties(magasin)
+
+    bilan = download_data.merge_cac40_data('2023-01-02', '2023-02-01', incremental=True, fetch=FournisseurLocal(),
+                                           dossier=magasin)
+    assert bilan['Lignes ajoutées'].tolist() == [0] * len(TICKERS)
+    assert data_store.lister_parties(magasin) == parties
@@ -0,0 +1,83 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([RACINE, os.path.join(RACINE, 'Liquidity')])
+import liquidity_management
+
+def avec_deformations_reference(df):
+    """
+    Version d'origine de avec_deformations : boucle jour par jour sur la vue large.
+    """
+    data = df.copy()
+    for i in range(1, max(data['Délai de liquidation'])+1):
+        # Calculer la quantité liquidée
+        if i == 1:
+            data[f'Quantité liquidée jour {i}'] = np.minimum(
+                data['Quantité initiale portefeuille'],
+                data['Quantité liquidable 1 jour']
+            ).astype(int)
+        else:
+            previous_liquidated_quantity = data[[f'Quantité liquidée jour {j}' for j in range(1, i)]].sum(axis=1)
+            data[f'Quantité liquidée jour {i}'] = np.minimum(
+                data['Quantité initiale portefeuille'] - previous_liquidated_quantity,
+                data['Quantité liquidable 1 jour']
+            ).astype(int)
+
+        # Calculer la valeur du portefeuille
+        data[f'Valeur portefeuille jour {i}'] = (
+            (data['Quantité initiale portefeuille'] - data[[f'Quantité liquidée jour {j}' for j in range(1, i+1)]].sum(axis=1)) * data['Prix']
+        ).astype(int)
+
+        # Calcul des poids
+        data[f'Poids portefeuille jour {i}'] = round((
+            data[f'Valeur portefeuille jour {i}'] / data[f'Valeur portefeuille jour {i}'].sum(axis=0)
+        ).fillna(0).astype(float), 2)
+    return data
+
+def sans_deformations_reference(df):
+    """
+    Version d'origine de sans_deformations : boucle jour par jour sur la vue large.
+    """
+    data = df.copy()
+    delai_liquidation_max = data['Délai de liquidation'].max()
+
+    for i in range(1, delai_liquidation_max + 1):
+        # Calculer les quantités liquidés
+        data[f'Quantité liquidée jour {i}'] = data['Quantité initiale portefeuille'] / delai_liquidation_max
+
+        # Calculer la valeur du portefeuille
+        data[f'Valeur portefeuille jour {i}'] = (
+            (data['Quantité initiale portefeuille'] - data[[f'Quantité liquidée jour {j}' for j in range(1, i+1)]].sum(axis=1)) * data['Prix']
+        ).astype(int)
+
+        # Calcul des poids
+        data[f'Poids portefeuille jour {i}'] = round((
+            data[f'Valeur portefeuille jour {i}'] / data[f'Valeur portefeuille jour {i}'].sum(axis=0)
+        ).fillna(0).astype(float), 2)
+    return data
+
+def portefeuille_synthetique(seuil_atv, seuil_quantite):
+    """
+    Petit portefeuille au format de pretraitement, construit avec les fonctions du module à partir d'ATV
+    et de prix fixes : les délais de liquidation vont de 1 à plusieurs jours selon les actifs.
+    """
+    noms = ['Actif A', 'Actif B', 'Actif C', 'Actif D', 'Actif E', 'Actif F']
+    atv = pd.DataFrame({'Average Traded Volume 3 mois': [1.2e6, 3.4e5, 8.9e4, 2.75e6, 5.1e5, 6.6e4]}, index=noms)
+    prix = pd.DataFrame({'Prix': [152.37, 41.08, 9.99, 63.5, 287.12, 18.45]}, index=noms)
+    data = liquidity_management.generer_statistiques_liquidite(atv, seuil_atv, seuil_quantite)
+    return liquidity_management.fusionner_donnees(prix, data)
+
+# La boucle d'origine insère les colonnes une à une
+@pytest.mark.filterwarnings('ignore::pandas.errors.PerformanceWarning')
+@pytest.mark.parametrize('seuil_quantite', [0.2, 1.0, 3.0])
+@pytest.mark.parametrize('seuil_atv', [0.2, 0.1], ids=['normale', 'stressee'])
+def test_echeancier_identique_a_la_boucle_d_origine(seuil_atv, seuil_quantite):
+    df = portefeuille_synthetique(seuil_atv, seuil_quantite)
+    assert df['Délai de liquidation'].nunique() >= 3
+
+    pd.testing.assert_frame_equal(liquidity_management.avec_deformations(df).to_frame(), avec_deformations_reference(df))
+    pd.testing.assert_frame_equal(liquidity_management.sans_deformations(df).to_frame(), sans_deformations_reference(df))
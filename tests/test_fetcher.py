@@ -0,0 +1,76 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RACINE)
+from common import fetcher
+
+def historique(ticker, start_date, end_date, interval="1d"):
+    """
+    Source locale au format de fetcher.source_yfinance : un historique fixe par ticker.
+    """
+    dates = pd.bdate_range(start_date, end_date, inclusive='left', name='Date')
+    return pd.DataFrame({'Close': np.arange(len(dates)) + 10.0 * len(ticker), 'Volume': 1000}, index=dates)
+
+class SourceInstable:
+    """
+    Source locale qui échoue `echecs` fois par ticker avant de répondre. Les appels sont comptés par ticker.
+    """
+
+    def __init__(self, echecs: dict):
+        self.echecs = echecs
+        self.appels = {}
+
+    def __call__(self, ticker, start_date, end_date, interval="1d"):
+        self.appels[ticker] = self.appels.get(ticker, 0) + 1
+        if self.appels[ticker] <= self.echecs.get(ticker, 0):
+            raise ConnectionError(f"échec simulé pour {ticker}")
+        return historique(ticker, start_date, end_date, interval)
+
+def test_reessai_puis_succes():
+    source = SourceInstable({'AAA.PA': 2})
+    data = fetcher.avec_reessais(source, 'AAA.PA', '2023-01-02', '2023-02-01', '1d', tentatives=3, delai_initial=0)
+    assert source.appels == {'AAA.PA': 3}
+    pd.testing.assert_frame_equal(data, historique('AAA.PA', '2023-01-02', '2023-02-01'))
+
+def test_abandon_apres_toutes_les_tentatives():
+    source = SourceInstable({'AAA.PA': 5})
+    with pytest.raises(ConnectionError):
+        fetcher.avec_reessais(source, 'AAA.PA', '2023-01-02', '2023-02-01', '1d', tentatives=3, delai_initial=0)
+    assert source.appels == {'AAA.PA': 3}
+
+def test_un_ticker_en_echec_n_interrompt_pas_le_lot():
+    tickers = ['AAA.PA', 'BB.PA', 'C.PA', 'DDDD.PA']
+    source = SourceInstable({'BB.PA': 10, 'C.PA': 1})
+    resultats = fetcher.telecharger(tickers, '2023-01-02', '2023-02-01', source=source, max_workers=2,
+                                    tentatives=2, delai_initial=0)
+
+    # Le ticker toujours en échec est omis après ses deux essais, les autres sont restitués dans l'ordre demandé
+    assert list(resultats) == ['AAA.PA', 'C.PA', 'DDDD.PA']
+    assert source.appels == {'AAA.PA': 1, 'BB.PA': 2, 'C.PA': 2, 'DDDD.PA': 1}
+    for ticker, data in resultats.items():
+        pd.testing.assert_frame_equal(data, historique(ticker, '2023-01-02', '2023-02-01'))
+
+def test_aligner_inner_identique_aux_fusions_successives():
+    # Séries de rendements sur des dates différentes (historiques de longueurs et de trous différents)
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2020-01-01', periods=36, freq='MS', name='Date')
+    series = {
+        'Actif A': pd.Series(rng.normal(size=36), index=dates),
+        'Actif B': pd.Series(rng.normal(size=30), index=dates[4:34]),
+        'Actif C': pd.Series(rng.normal(size=33), index=dates.delete([10, 11, 20])),
+    }
+
+    # Version d'origine de extract_rendements : fusions successives sur la colonne 'Date'
+    df_merged = None
+    for name, data in series.items():
+        data = data.rename(name).reset_index()
+        df_merged = data if df_merged is None else pd.merge(df_merged, data, on='Date', how='inner')
+    reference = df_merged.set_index('Date')
+
+    aligne = fetcher.aligner(series, how='inner')
+    pd.testing.assert_frame_equal(aligne, reference, check_names=False, check_freq=False)
+    assert len(aligne) == 27
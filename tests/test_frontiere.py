@@ -0,0 +1,73 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([RACINE, os.path.join(RACINE, 'Markowitz')])
+import frontiere
+import markowitz
+
+TAUX_SANS_RISQUE = 0.02
+
+def rendements_fixes(nb_actifs, nb_mois, graine):
+    """
+    Rendements mensuels synthétiques reproductibles (un facteur commun et un bruit spécifique).
+    """
+    rng = np.random.default_rng(graine)
+    marche = rng.normal(0.006, 0.04, (nb_mois, 1))
+    valeurs = marche * rng.uniform(0.5, 1.5, nb_actifs) + rng.normal(0.002, 0.05, (nb_mois, nb_actifs))
+    return pd.DataFrame(valeurs, columns=[f'Actif {i}' for i in range(nb_actifs)])
+
+def frontiere_reference(annual_returns, cov_matrix, bounds, target_returns):
+    """
+    Frontière de la version d'origine de calculate_efficient_frontier : minimisation de la volatilité
+    par SLSQP pour chaque rendement cible, depuis des poids égaux et sans gradient.
+    """
+    num_assets = len(annual_returns)
+    volatilites = {}
+    for target in target_returns:
+        result = minimize(
+            lambda weights: np.sqrt(weights @ cov_matrix @ weights),
+            x0=np.ones(num_assets) / num_assets,
+            constraints=[{'type': 'eq', 'fun': lambda weights: np.sum(weights) - 1},
+                         {'type': 'ineq', 'fun': lambda weights, target=target: weights @ annual_returns - target}],
+            bounds=bounds,
+            method='SLSQP'
+        )
+        if result.success:
+            volatilites[target] = result.fun
+    return volatilites
+
+@pytest.fixture(scope='module', params=[(6, 120, 0), (10, 240, 1)], ids=['6_actifs', '10_actifs'])
+def donnees(request):
+    rendements = rendements_fixes(*request.param)
+    annual_returns = np.array(markowitz.calcul_rendements_annuels_actualises(rendements, TAUX_SANS_RISQUE))
+    cov_matrix = np.array(rendements.cov() * 12)
+    target_returns = np.linspace(annual_returns.min(), annual_returns.max(), 100)
+    return annual_returns, cov_matrix, target_returns
+
+@pytest.mark.parametrize('bornes', [(0, 1), (-1, 1)], ids=['sans_short', 'avec_short'])
+@pytest.mark.parametrize('calcul', ['numerique', 'exacte'])
+def test_frontiere_identique_a_la_reference(donnees, bornes, calcul):
+    annual_returns, cov_matrix, target_returns = donnees
+    bounds = [bornes] * len(annual_returns)
+    reference = frontiere_reference(annual_returns, cov_matrix, bounds, target_returns)
+    if calcul == 'numerique':
+        resultat = frontiere.frontiere_numerique(annual_returns, cov_matrix, bounds, target_returns)
+    else:
+        resultat = frontiere.frontiere_exacte(annual_returns, cov_matrix, bounds, target_returns)
+    volatilites = dict(zip(resultat.rendements, resultat.volatilites))
+
+    # Chaque point de la référence est retrouvé, avec la même volatilité minimale
+    assert len(reference) > 0.9 * len(target_returns)
+    assert set(reference) <= set(volatilites)
+    cibles = sorted(reference)
+    np.testing.assert_allclose([volatilites[c] for c in cibles], [reference[c] for c in cibles], rtol=0, atol=1e-5)
+
+    # Les poids respectent le budget, les bornes et le rendement cible
+    np.testing.assert_allclose(resultat.poids.sum(axis=1), 1, atol=1e-8)
+    assert np.all(resultat.poids >= bornes[0] - 1e-8) and np.all(resultat.poids <= bornes[1] + 1e-8)
+    assert np.all(resultat.poids @ annual_returns >= resultat.rendements - 1e-8)